@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20240615_01"
+down_revision = "20240531_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+  op.create_table(
+    "ingest_watermarks",
+    sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+    sa.Column("query_key", sa.String(length=64), nullable=False, unique=True),
+    sa.Column("search_query", sa.Text(), nullable=False),
+    sa.Column("last_updated_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("seen_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column("pending_updated_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("pending_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column("cursor_start", sa.Integer(), nullable=True),
+    sa.Column("cursor_updated_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("cursor_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+  )
+
+
+def downgrade() -> None:
+  op.drop_table("ingest_watermarks")
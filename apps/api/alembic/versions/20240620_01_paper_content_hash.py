@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20240620_01"
+down_revision = "20240615_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+  op.add_column("papers", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+  op.drop_column("papers", "content_hash")
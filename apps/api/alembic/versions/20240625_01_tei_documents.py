@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20240625_01"
+down_revision = "20240620_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+  op.create_table(
+    "tei_documents",
+    sa.Column("checksum", sa.String(length=64), primary_key=True),
+    sa.Column("codec", sa.String(length=16), nullable=False),
+    sa.Column("payload", sa.LargeBinary(), nullable=False),
+    sa.Column("raw_size", sa.Integer(), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+  )
+
+
+def downgrade() -> None:
+  op.drop_table("tei_documents")
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20240701_01"
+down_revision = "20240625_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+  op.create_table(
+    "vector_collections",
+    sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+    sa.Column("alias", sa.String(length=128), nullable=False),
+    sa.Column("collection", sa.String(length=255), nullable=False, unique=True),
+    sa.Column("embed_model", sa.String(length=128), nullable=False),
+    sa.Column("embed_dimensions", sa.Integer(), nullable=False),
+    sa.Column("status", sa.String(length=32), nullable=False, server_default="building"),
+    sa.Column("checkpoint_id", sa.Integer(), nullable=True),
+    sa.Column("points", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("recall", sa.Numeric(5, 4), nullable=True),
+    sa.Column("activated_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("retired_at", sa.DateTime(timezone=True), nullable=True),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+  )
+  op.create_index("ix_vector_collections_alias", "vector_collections", ["alias"])
+
+
+def downgrade() -> None:
+  op.drop_index("ix_vector_collections_alias", table_name="vector_collections")
+  op.drop_table("vector_collections")
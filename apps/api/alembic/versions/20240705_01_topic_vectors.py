@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20240705_01"
+down_revision = "20240701_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+  op.create_table(
+    "topic_vectors",
+    sa.Column(
+      "topic_id",
+      sa.Integer(),
+      sa.ForeignKey("topics.id", ondelete="CASCADE"),
+      primary_key=True,
+      nullable=False,
+    ),
+    sa.Column("embed_model", sa.String(length=128), nullable=False),
+    sa.Column("embed_dimensions", sa.Integer(), nullable=False),
+    sa.Column("input_hash", sa.String(length=64), nullable=False),
+    sa.Column("vector", sa.LargeBinary(), nullable=False),
+    sa.Column("topic_updated_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+  )
+  # Hot anchor caches reload only rows touched since their last load.
+  op.create_index("ix_topic_vectors_updated_at", "topic_vectors", ["updated_at"])
+  op.create_index("ix_topics_updated_at", "topics", ["updated_at"])
+
+
+def downgrade() -> None:
+  op.drop_index("ix_topics_updated_at", table_name="topics")
+  op.drop_index("ix_topic_vectors_updated_at", table_name="topic_vectors")
+  op.drop_table("topic_vectors")
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20240710_01"
+down_revision = "20240705_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+  op.add_column("papers", sa.Column("source_version", sa.Integer(), nullable=True))
+  # arXiv rows were keyed on the versioned id. Re-key the highest version of each paper on its
+  # base id; older versions keep their versioned ids so no row or foreign key has to move.
+  op.execute(
+    """
+    UPDATE papers AS p
+    SET source_version = substring(p.source_id FROM 'v([0-9]+)$')::integer,
+        source_id = regexp_replace(p.source_id, 'v[0-9]+$', '')
+    WHERE p.source = 'arxiv'
+      AND p.source_id ~ 'v[0-9]+$'
+      AND NOT EXISTS (
+        SELECT 1 FROM papers AS q
+        WHERE q.source = 'arxiv'
+          AND q.id <> p.id
+          AND q.source_id ~ 'v[0-9]+$'
+          AND regexp_replace(q.source_id, 'v[0-9]+$', '') = regexp_replace(p.source_id, 'v[0-9]+$', '')
+          AND substring(q.source_id FROM 'v([0-9]+)$')::integer
+            > substring(p.source_id FROM 'v([0-9]+)$')::integer
+      )
+    """
+  )
+
+
+def downgrade() -> None:
+  op.execute(
+    """
+    UPDATE papers
+    SET source_id = source_id || 'v' || source_version
+    WHERE source_version IS NOT NULL
+    """
+  )
+  op.drop_column("papers", "source_version")
@@ -0,0 +1,77 @@
+"""Indexing throughput and candidate counts of the MinHash LSH citation index.
+
+Run from `apps/api`: `python benchmarks/bench_citations.py [papers]`. Synthetic papers cite
+~40 works drawn Zipf-style from a pool of 500,000, spread over twelve months. Queries are
+new papers that reuse 0-80% of an indexed paper's references; the report shows how many
+candidates each one touches against the size of the corpus.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from trendsurf_api.analysis.citations import CitationIndex, CitedPaper
+
+POOL = 500_000
+BATCH = 1000
+
+
+def reference(work: int) -> str:
+  letters = "".join(chr(ord("a") + int(digit)) for digit in str(work))
+  return f"On the {letters} problem in learning systems. Doe J. ICML 2022"
+
+
+def cited_works(count: int, rng: np.random.Generator) -> np.ndarray:
+  return (rng.zipf(1.3, size=(count, 40)) * 7919 + rng.integers(0, POOL, size=(count, 1))) % POOL
+
+
+def main(count: int) -> None:
+  rng = np.random.default_rng(3)
+  works = cited_works(count, rng)
+  now = datetime(2024, 12, 20, tzinfo=timezone.utc)
+  with tempfile.TemporaryDirectory() as root:
+    index = CitationIndex(root, window_months=12)
+    elapsed = 0.0
+    for offset in range(0, count, BATCH):
+      batch = [
+        CitedPaper(i, [reference(w) for w in works[i]], datetime(2024, 1 + i % 12, 10, tzinfo=timezone.utc))
+        for i in range(offset, min(count, offset + BATCH))
+      ]
+      started = time.perf_counter()
+      index.update(batch)
+      elapsed += time.perf_counter() - started
+    print(f"indexed {count:,} papers in {elapsed:.1f}s ({count / elapsed:,.0f}/s)")
+
+    started = time.perf_counter()
+    reloaded = CitationIndex(root, window_months=12)
+    print(f"loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for shared in (0.0, 0.2, 0.5, 0.8):
+      sources = rng.integers(0, count, size=200)
+      queries = []
+      for source in sources.tolist():
+        kept = int(40 * shared)
+        fresh = rng.integers(0, POOL, size=40 - kept)
+        queries.append([reference(w) for w in works[source][:kept].tolist() + fresh.tolist()])
+      started = time.perf_counter()
+      results = reloaded.score(queries, now=now)
+      elapsed = (time.perf_counter() - started) * 1000
+      candidates = statistics.mean(result.candidates for result in results)
+      found = statistics.mean(
+        any(paper_id == source for paper_id, _ in result.neighbours)
+        for result, source in zip(results, sources.tolist(), strict=True)
+      )
+      print(
+        f"{shared:>4.0%} shared: {candidates:8.1f} candidates/paper of {count:,}, "
+        f"source found {found:5.0%}, {elapsed / len(queries):5.2f} ms/paper"
+      )
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,110 @@
+"""Compare per-call `embed_texts` with the cross-request `EmbeddingBatcher` under concurrency.
+
+Run from `apps/api`: `python benchmarks/bench_embed_batcher.py [callers] [requests_per_caller]`.
+A local stub speaks Ollama's `/api/embed` and, like a single GPU, serves one request at a
+time with a fixed per-request overhead plus a small per-text cost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REQUEST_OVERHEAD_S = 0.010
+PER_TEXT_S = 0.0002
+DIMENSIONS = 8
+
+
+class StubEmbedHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  lock = threading.Lock()
+  requests = 0
+
+  def do_POST(self) -> None:  # noqa: N802 - http.server API
+    body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+    texts = body["input"]
+    with StubEmbedHandler.lock:
+      StubEmbedHandler.requests += 1
+      time.sleep(REQUEST_OVERHEAD_S + PER_TEXT_S * len(texts))
+    payload = json.dumps(
+      {"embeddings": [[float(len(text))] * DIMENSIONS for text in texts]}
+    ).encode()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(payload)))
+    self.end_headers()
+    self.wfile.write(payload)
+
+  def log_message(self, *args) -> None:
+    pass
+
+
+class StubServer(ThreadingHTTPServer):
+  daemon_threads = True
+  request_queue_size = 256
+
+
+def start_stub() -> ThreadingHTTPServer:
+  server = StubServer(("127.0.0.1", 0), StubEmbedHandler)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+
+async def run_mode(name: str, embed, callers: int, per_caller: int) -> None:
+  latencies: list[float] = []
+
+  async def caller(index: int) -> None:
+    for request in range(per_caller):
+      started = time.perf_counter()
+      vectors = await embed([f"caller {index} query {request}"])
+      latencies.append(time.perf_counter() - started)
+      if len(vectors) != 1 or len(vectors[0]) != DIMENSIONS:
+        raise RuntimeError(f"{name}: unexpected embedding shape for caller {index}")
+
+  StubEmbedHandler.requests = 0
+  started = time.perf_counter()
+  await asyncio.gather(*(caller(i) for i in range(callers)))
+  elapsed = time.perf_counter() - started
+  latencies.sort()
+  total = callers * per_caller
+  print(
+    f"{name:>10}: {total / elapsed:8.1f} texts/s  "
+    f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+    f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms  "
+    f"provider requests {StubEmbedHandler.requests}"
+  )
+
+
+async def main(callers: int, per_caller: int) -> None:
+  from trendsurf_api.core.http import close_http_clients
+  from trendsurf_api.providers.embed_batcher import EmbeddingBatcher
+  from trendsurf_api.providers.embed_client import embed_texts
+  from trendsurf_api.providers.embed_engine import EmbeddingEngine
+
+  await run_mode("direct", embed_texts, callers, per_caller)
+  batcher = EmbeddingBatcher(engine=EmbeddingEngine(cache=False))
+  await run_mode("coalesced", batcher.embed, callers, per_caller)
+  print(f"flushes {batcher.stats.flushes}, largest {batcher.stats.largest_flush} texts")
+  await close_http_clients()
+
+
+if __name__ == "__main__":
+  callers = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+  per_caller = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+  server = start_stub()
+  os.environ.update(
+    EMBED_PROVIDER="ollama",
+    EMBED_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}",
+    EMBED_MODEL="stub",
+    EMBED_DIMENSIONS=str(DIMENSIONS),
+    EMBED_CACHE_DIR="",
+  )
+  print(f"{callers} concurrent callers x {per_caller} single-text requests")
+  asyncio.run(main(callers, per_caller))
+  server.shutdown()
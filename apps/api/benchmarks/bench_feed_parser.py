@@ -0,0 +1,110 @@
+"""Compare the streaming Atom parser against the previous `ET.fromstring` implementation.
+
+Run from `apps/api`: `python benchmarks/bench_feed_parser.py [entries]`.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Callable, Iterable
+
+from trendsurf_api.ingestion.arxiv_client import FEED_NS, iter_feed, parse_datetime
+
+CHUNK_SIZE = 64 * 1024
+
+
+def build_feed(entries: int) -> bytes:
+  abstract = "We study scalable methods for learning representations. " * 30
+  items = []
+  for i in range(entries):
+    items.append(
+      f"""<entry>
+  <id>http://arxiv.org/abs/2406.{i:05d}v1</id>
+  <updated>2024-06-01T12:00:00Z</updated>
+  <published>2024-06-01T12:00:00Z</published>
+  <title>Paper number {i}</title>
+  <summary>{abstract}</summary>
+  <author><name>Author A</name></author>
+  <author><name>Author B</name></author>
+  <link href="http://arxiv.org/abs/2406.{i:05d}v1" rel="alternate" type="text/html"/>
+  <link title="pdf" href="http://arxiv.org/pdf/2406.{i:05d}v1" rel="related" type="application/pdf"/>
+  <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.LG"/>
+  <category term="cs.LG"/>
+  <category term="cs.AI"/>
+</entry>"""
+    )
+  body = "\n".join(items)
+  return (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    f'<feed xmlns="http://www.w3.org/2005/Atom">\n{body}\n</feed>'
+  ).encode("utf-8")
+
+
+def legacy_parse_feed(xml_text: str) -> Iterable[dict]:
+  """The pre-streaming parser: whole-document tree plus a duplicated `raw` dict."""
+  ns = FEED_NS
+  root = ET.fromstring(xml_text)
+  for entry in root.findall("atom:entry", ns):
+    arxiv_id = entry.findtext("atom:id", default="", namespaces=ns)
+    title = entry.findtext("atom:title", default="", namespaces=ns).strip()
+    summary = entry.findtext("atom:summary", default="", namespaces=ns).strip()
+    published = parse_datetime(entry.findtext("atom:published", namespaces=ns))
+    updated = parse_datetime(entry.findtext("atom:updated", namespaces=ns))
+    primary_category = entry.find("arxiv:primary_category", ns)
+    categories = [elem.get("term") for elem in entry.findall("atom:category", ns) if elem.get("term")]
+    authors = [elem.findtext("atom:name", default="", namespaces=ns).strip() for elem in entry.findall("atom:author", ns)]
+    pdf_url = None
+    html_url = None
+    for link in entry.findall("atom:link", ns):
+      if link.get("rel") == "alternate" and link.get("href"):
+        html_url = link.get("href")
+      if link.get("type") == "application/pdf" and link.get("href"):
+        pdf_url = link.get("href")
+    yield {
+      "source_id": arxiv_id.split("/")[-1],
+      "title": title,
+      "summary": summary,
+      "published_at": published,
+      "updated_at": updated,
+      "authors": [author for author in authors if author],
+      "pdf_url": pdf_url,
+      "html_url": html_url,
+      "primary_category": primary_category.get("term") if primary_category is not None else None,
+      "categories": categories,
+      "raw": {"id": arxiv_id, "title": title, "summary": summary},
+    }
+
+
+def measure(label: str, run: Callable[[], Iterable[object]]) -> None:
+  tracemalloc.start()
+  started = time.perf_counter()
+  first: float | None = None
+  kept = []
+  for item in run():
+    if first is None:
+      first = time.perf_counter() - started
+    kept.append(item)
+  total = time.perf_counter() - started
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  print(
+    f"{label:<10} entries={len(kept):>5} total={total * 1000:8.1f} ms "
+    f"first={(first or 0) * 1000:7.2f} ms peak={peak / 1024 / 1024:7.2f} MiB"
+  )
+
+
+def main() -> None:
+  entries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+  feed = build_feed(entries)
+  chunks = [feed[i : i + CHUNK_SIZE] for i in range(0, len(feed), CHUNK_SIZE)]
+  print(f"feed size {len(feed) / 1024 / 1024:.2f} MiB, {len(chunks)} chunks")
+  # The legacy path needs the full body before it can start; streaming consumes chunks.
+  measure("legacy", lambda: list(legacy_parse_feed(b"".join(chunks).decode("utf-8"))))
+  measure("streaming", lambda: iter_feed(chunks))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,67 @@
+"""Update throughput, disk footprint, load time and delta latency of the keyword index.
+
+Run from `apps/api`: `python benchmarks/bench_keyword_index.py [papers]`. Synthetic abstracts
+draw ~120 words from a 30,000-word Zipf vocabulary and are spread over twelve months, indexed
+in ingest-sized batches. A topic centroid is built from 500 papers and a batch of 200 new
+papers is scored against it.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from trendsurf_api.analysis.keyword_index import KeywordIndex, TermDocument
+
+VOCABULARY = [f"w{i:05d}" for i in range(30_000)]
+BATCH = 500
+
+
+def build_texts(count: int, rng: np.random.Generator) -> list[str]:
+  ranks = np.minimum(rng.zipf(1.1, size=(count, 120)), len(VOCABULARY)) - 1
+  return [" ".join(VOCABULARY[i] for i in row) for row in ranks.tolist()]
+
+
+def main(count: int) -> None:
+  rng = np.random.default_rng(5)
+  texts = build_texts(count, rng)
+  now = datetime(2024, 12, 20, tzinfo=timezone.utc)
+  with tempfile.TemporaryDirectory() as root:
+    index = KeywordIndex(root, window_months=12)
+    started = time.perf_counter()
+    for offset in range(0, count, BATCH):
+      index.update(
+        TermDocument(paper_id, texts[paper_id], datetime(2024, 1 + paper_id % 12, 10, tzinfo=timezone.utc))
+        for paper_id in range(offset, min(count, offset + BATCH))
+      )
+    elapsed = time.perf_counter() - started
+    size = sum(path.stat().st_size for path in Path(root).rglob("*") if path.is_file())
+    print(
+      f"indexed {count:,} papers in {elapsed:.1f}s ({count / elapsed:,.0f}/s); "
+      f"{len(index.terms):,} terms, {size / 1024:,.0f} KiB on disk ({size / count:.0f} B/paper)"
+    )
+
+    started = time.perf_counter()
+    reloaded = KeywordIndex(root, window_months=12)
+    print(f"loaded {len(reloaded):,} papers in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    centroid = reloaded.centroid(range(500), now=now)
+    print(f"centroid over {centroid.documents} papers in {(time.perf_counter() - started) * 1000:.1f} ms")
+    batch = build_texts(200, rng)
+    latencies = []
+    for _ in range(20):
+      started = time.perf_counter()
+      reloaded.deltas(batch, centroid, now=now)
+      latencies.append(time.perf_counter() - started)
+    print(f"deltas for {len(batch)} papers  p50 {statistics.median(latencies) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
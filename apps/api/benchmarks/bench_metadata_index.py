@@ -0,0 +1,70 @@
+"""Candidate-set size and lookup latency of the metadata index.
+
+Run from `apps/api`: `python benchmarks/bench_metadata_index.py [papers]`. Synthetic papers
+get one of 150 categories (Zipf-skewed, like arXiv) and a few of 2,000 tracked keywords. A
+narrow topic (one category plus two keywords) and a broad one (three popular categories)
+are resolved to candidate ids and compared against the full corpus.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from trendsurf_api.ingestion.metadata_index import IndexedPaper, MetadataIndex
+
+CATEGORIES = [f"cat.{i:03d}" for i in range(150)]
+KEYWORDS = [f"term{i:04d}" for i in range(2000)]
+
+
+def build_papers(count: int, rng: np.random.Generator):
+  weights = 1 / np.arange(1, len(CATEGORIES) + 1)
+  weights /= weights.sum()
+  categories = rng.choice(len(CATEGORIES), size=(count, 2), p=weights).tolist()
+  keywords = rng.integers(0, len(KEYWORDS), size=(count, 3)).tolist()
+  for paper_id, (cats, kws) in enumerate(zip(categories, keywords, strict=True), start=1):
+    text = " ".join(KEYWORDS[i] for i in kws)
+    yield IndexedPaper(paper_id, frozenset(CATEGORIES[i] for i in cats), f"a study of {text}")
+
+
+def time_lookup(index: MetadataIndex, repeats: int = 50, **filters) -> tuple[float, int]:
+  latencies = []
+  for _ in range(repeats):
+    started = time.perf_counter()
+    ids = index.candidates(**filters)
+    latencies.append(time.perf_counter() - started)
+  return statistics.median(latencies) * 1000, len(ids)
+
+
+def main(count: int) -> None:
+  rng = np.random.default_rng(11)
+  with tempfile.TemporaryDirectory() as root:
+    index = MetadataIndex(root)
+    with index._db:
+      index._db.executemany("INSERT INTO keywords (keyword) VALUES (?)", [(kw,) for kw in KEYWORDS])
+    started = time.perf_counter()
+    index.update(build_papers(count, rng))
+    elapsed = time.perf_counter() - started
+    stats = index.stats()
+    print(
+      f"indexed {count:,} papers in {elapsed:.1f}s ({count / elapsed:,.0f}/s); "
+      f"{stats['terms']:,} terms, {stats['postings']:,} postings, {stats['bytes'] / 1024:,.0f} KiB "
+      f"({stats['bytes'] / stats['postings']:.2f} B/posting)"
+    )
+    cases = {
+      "narrow": {"categories": ["cat.040"], "keywords": ["term0007", "term1234"]},
+      "one category": {"categories": ["cat.040"]},
+      "broad": {"categories": ["cat.000", "cat.001", "cat.002"]},
+    }
+    for label, filters in cases.items():
+      p50, size = time_lookup(index, **filters)
+      print(f"{label:<13} {size:>9,} candidates ({count / max(size, 1):>8,.0f}x fewer)  p50 {p50:6.2f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,60 @@
+"""Measure bulk paper upsert throughput against the configured Postgres database.
+
+Run from `apps/api` with `DATABASE_URL` pointing at a migrated scratch database:
+`python benchmarks/bench_paper_upsert.py [papers]`. Rows are written under a dedicated
+`source` and removed afterwards.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+
+from trendsurf_api.core.database import session_scope
+from trendsurf_api.ingestion.arxiv_client import ArxivPaper
+from trendsurf_api.ingestion.paper_writer import upsert_papers
+from trendsurf_api.models.tables import Paper
+
+SOURCE = "bench"
+
+
+def synthetic_papers(count: int) -> list[ArxivPaper]:
+  now = datetime.now(timezone.utc)
+  return [
+    ArxivPaper(
+      source_id=f"bench.{i:06d}",
+      title=f"Synthetic paper {i}",
+      summary="An abstract about representation learning. " * 20,
+      published_at=now,
+      updated_at=now,
+      authors=["Author A", "Author B", "Author C"],
+      pdf_url=f"https://arxiv.org/pdf/bench.{i:06d}",
+      html_url=f"https://arxiv.org/abs/bench.{i:06d}",
+      primary_category="cs.LG",
+      categories=["cs.LG", "cs.AI"],
+    )
+    for i in range(count)
+  ]
+
+
+def main() -> None:
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+  papers = synthetic_papers(count)
+  edited = [replace(p, title=p.title + " (v2)") if i % 10 == 0 else p for i, p in enumerate(papers)]
+  try:
+    for label, batch in (("insert", papers), ("unchanged", papers), ("10% changed", edited)):
+      report = upsert_papers(batch, source=SOURCE)
+      print(
+        f"{label:<12} new={len(report.new):>6} changed={len(report.changed):>6} "
+        f"unchanged={len(report.unchanged):>6} {report.rows_per_sec:10.0f} rows/s"
+      )
+  finally:
+    with session_scope() as session:
+      session.execute(delete(Paper).where(Paper.source == SOURCE))
+
+
+if __name__ == "__main__":
+  main()
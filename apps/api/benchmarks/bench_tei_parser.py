@@ -0,0 +1,118 @@
+"""Compare the single-pass TEI parser with the previous multi-pass `ET.fromstring` parser.
+
+Run from `apps/api`: `python benchmarks/bench_tei_parser.py [documents] [sections]`. Each
+parser runs in a fresh process over the same generated fixture set so `ru_maxrss` reflects
+that parser alone.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from trendsurf_api.parsing.tei_parser import TEI_NS, ParsedDocument, Section, parse_tei
+
+PARAGRAPH = (
+  "Transformer models scale predictably with compute <ref type=\"bibr\" target=\"#b1\">[1]</ref> "
+  "and data, yet the interaction with optimisation remains poorly understood. "
+) * 6
+
+
+def build_tei(sections: int, references: int) -> str:
+  divs = "".join(
+    f"<div><head>Section {i}</head>" + "".join(f"<p>{PARAGRAPH}</p>" for _ in range(8)) + "</div>"
+    for i in range(sections)
+  )
+  bibl = "".join(
+    f'<biblStruct xml:id="b{i}"><analytic><title level="a">Reference {i}</title>'
+    f"<author><persName><forename>A</forename><surname>Author{i}</surname></persName></author>"
+    f'</analytic><monogr><title level="j">Journal</title><imprint><date when="2020"/></imprint>'
+    f'</monogr><idno type="DOI">10.1000/{i}</idno></biblStruct>'
+    for i in range(references)
+  )
+  return (
+    '<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader><fileDesc><titleStmt>'
+    "<title>Benchmark Paper</title></titleStmt></fileDesc><profileDesc><abstract><div>"
+    f"<p>{PARAGRAPH}</p></div></abstract></profileDesc></teiHeader><text><body>{divs}</body>"
+    f"<back><div><listBibl>{bibl}</listBibl></div></back></text></TEI>"
+  )
+
+
+def legacy_parse_tei(tei_xml: str) -> ParsedDocument:
+  def iter_text(nodes):
+    for node in nodes:
+      parts = [node.text or ""]
+      parts.extend(child.tail or "" for child in node)
+      yield " ".join("".join(parts).split())
+
+  def first_text(nodes):
+    for node in nodes:
+      text = " ".join((node.text or "").split())
+      if text:
+        return text
+    return None
+
+  root = ET.fromstring(tei_xml)
+  sections = []
+  for div in root.findall(".//tei:body/tei:div", TEI_NS):
+    paragraphs = [p for p in iter_text(div.findall("tei:p", TEI_NS)) if p]
+    if paragraphs:
+      sections.append(Section(title=first_text(div.findall("tei:head", TEI_NS)), paragraphs=paragraphs))
+  return ParsedDocument(
+    title=first_text(root.findall(".//tei:titleStmt/tei:title", TEI_NS)),
+    abstract="\n".join(iter_text(root.findall(".//tei:abstract//tei:p", TEI_NS))),
+    body=sections,
+    references=[ref for ref in iter_text(root.findall(".//tei:listBibl/tei:biblStruct", TEI_NS)) if ref],
+  )
+
+
+def _run(name: str, paths: list[str], queue: multiprocessing.Queue) -> None:
+  started = time.perf_counter()
+  total_bytes = 0
+  for path in paths:
+    total_bytes += Path(path).stat().st_size
+    if name == "streaming":
+      with open(path, "rb") as handle:
+        parse_tei(handle)
+    elif name == "legacy":
+      legacy_parse_tei(Path(path).read_text(encoding="utf-8"))
+  elapsed = time.perf_counter() - started
+  queue.put((elapsed, total_bytes, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def main() -> None:
+  documents = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+  sections = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+  with tempfile.TemporaryDirectory() as tmp:
+    paths = []
+    for i in range(documents):
+      path = Path(tmp) / f"doc{i}.tei.xml"
+      path.write_text(build_tei(sections, references=sections), encoding="utf-8")
+      paths.append(str(path))
+    size_mb = sum(Path(path).stat().st_size for path in paths) / 1024 / 1024
+    print(f"{documents} documents, {size_mb / documents:.1f} MiB each")
+
+    ctx = multiprocessing.get_context("spawn")
+    # "baseline" only imports the modules, so its RSS is the floor both parsers start from.
+    for name in ("baseline", "legacy", "streaming"):
+      queue = ctx.Queue()
+      process = ctx.Process(target=_run, args=(name, paths, queue))
+      process.start()
+      elapsed, total_bytes, maxrss_kb = queue.get()
+      process.join()
+      if name == "baseline":
+        print(f"{name:<10} peak RSS {maxrss_kb / 1024:7.1f} MiB")
+        continue
+      print(
+        f"{name:<10} {documents / elapsed:7.1f} docs/s {total_bytes / 1024 / 1024 / elapsed:7.1f} MiB/s "
+        f"peak RSS {maxrss_kb / 1024:7.1f} MiB"
+      )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,61 @@
+"""Latency of matching a batch of papers against thousands of topics.
+
+Run from `apps/api`: `python benchmarks/bench_topic_matcher.py [topics] [papers]`. Each
+synthetic topic has a 256-d anchor, one of 20 categories and two keywords drawn from a
+2,000-word vocabulary; papers carry 200 random words. The plan budget for 3,000 topics
+against an 800-paper ingest batch is one second.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from trendsurf_api.matching.engine import CandidatePaper, TopicAnchor, TopicMatcher
+
+WORDS = [f"term{i}" for i in range(2000)]
+
+
+def build(topics: int, papers: int, rng: np.random.Generator):
+  anchors = [
+    TopicAnchor(
+      i,
+      vector,
+      threshold=0.1,
+      categories=frozenset({f"cs.{i % 20}"}),
+      keywords=frozenset({f"{WORDS[i % 2000]} {WORDS[(i * 7) % 2000]}", WORDS[(i * 13) % 2000]}),
+    )
+    for i, vector in enumerate(rng.standard_normal((topics, 256), dtype=np.float32))
+  ]
+  candidates = [
+    CandidatePaper(i, vector, frozenset({f"cs.{i % 20}"}), " ".join(rng.choice(WORDS, 200)))
+    for i, vector in enumerate(rng.standard_normal((papers, 256), dtype=np.float32))
+  ]
+  return anchors, candidates
+
+
+def main(topics: int, papers: int) -> None:
+  anchors, candidates = build(topics, papers, np.random.default_rng(3))
+  started = time.perf_counter()
+  matcher = TopicMatcher(anchors, top_k=None)
+  print(f"built matcher for {topics:,} topics in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+  latencies = []
+  for _ in range(5):
+    started = time.perf_counter()
+    matches = matcher.match(candidates)
+    latencies.append(time.perf_counter() - started)
+  print(
+    f"matched {papers:,} papers: {statistics.median(latencies) * 1000:.0f} ms median, "
+    f"{len(matches):,} matches"
+  )
+
+
+if __name__ == "__main__":
+  main(
+    int(sys.argv[1]) if len(sys.argv) > 1 else 3000,
+    int(sys.argv[2]) if len(sys.argv) > 2 else 800,
+  )
@@ -0,0 +1,83 @@
+"""Query latency of the local memory-mapped vector store, optionally against Qdrant.
+
+Run from `apps/api`: `python benchmarks/bench_vector_store.py [dims] [queries]`. Each corpus
+size (10k and 100k random unit vectors) is timed for unfiltered top-10 and for a top-10
+restricted to ~10% of points by a category filter. Set `QDRANT_URL` to also load the same
+points into a scratch Qdrant collection and time identical queries there.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from trendsurf_api.vectors.store import LocalVectorStore, QdrantVectorStore, VectorStore
+
+SIZES = (10_000, 100_000)
+CATEGORIES = [f"cs.{i:02d}" for i in range(10)]
+
+
+def build_records(size: int, dims: int, rng: np.random.Generator):
+  vectors = rng.standard_normal((size, dims), dtype=np.float32)
+  for point_id, vector in enumerate(vectors):
+    yield point_id, vector, {"categories": [CATEGORIES[point_id % len(CATEGORIES)]]}
+
+
+def time_queries(store: VectorStore, queries: np.ndarray, filters: dict | None) -> tuple[float, float]:
+  latencies = []
+  for query in queries:
+    started = time.perf_counter()
+    store.search(query, limit=10, filters=filters)
+    latencies.append(time.perf_counter() - started)
+  latencies.sort()
+  return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.95) - 1] * 1000
+
+
+def report(name: str, size: int, store: VectorStore, queries: np.ndarray) -> None:
+  for label, filters in (("top-10", None), ("top-10 filtered", {"categories": "cs.03"})):
+    p50, p95 = time_queries(store, queries, filters)
+    print(f"{name:>7} {size:>7,} {label:<16} p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+
+
+def main(dims: int, query_count: int) -> None:
+  rng = np.random.default_rng(7)
+  queries = rng.standard_normal((query_count, dims), dtype=np.float32)
+  print(f"{dims} dims, {query_count} queries per case")
+  for size in SIZES:
+    with tempfile.TemporaryDirectory() as root:
+      local = LocalVectorStore(root, dimensions=dims, initial_capacity=size)
+      started = time.perf_counter()
+      local.upsert(build_records(size, dims, rng))
+      print(f"  local {size:>7,} load {size / (time.perf_counter() - started):10.0f} points/s")
+      report("local", size, local, queries)
+      local.close()
+
+    if os.environ.get("QDRANT_URL"):
+      from qdrant_client.http import models as qmodels
+
+      from trendsurf_api.vectors.client import get_qdrant_client
+
+      client = get_qdrant_client()
+      name = f"bench_vectors_{size}"
+      if client.collection_exists(name):
+        client.delete_collection(name)
+      client.create_collection(
+        collection_name=name,
+        vectors_config=qmodels.VectorParams(size=dims, distance=qmodels.Distance.COSINE),
+      )
+      client.create_payload_index(name, "categories", qmodels.PayloadSchemaType.KEYWORD)
+      qdrant = QdrantVectorStore(name, client=client)
+      qdrant.upsert(build_records(size, dims, rng))
+      report("qdrant", size, qdrant, queries)
+      client.delete_collection(name)
+
+
+if __name__ == "__main__":
+  dims = int(sys.argv[1]) if len(sys.argv) > 1 else 768
+  query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+  main(dims, query_count)
@@ -0,0 +1,26 @@
+from .citations import CitationIndex, CitationOverlap, CitedPaper, get_citation_index
+from .keyword_index import (
+  KeywordDelta,
+  KeywordIndex,
+  TermCentroid,
+  TermDocument,
+  document_text,
+  get_keyword_index,
+)
+from .novelty import NoveltyIndex, NoveltyScore, get_novelty_index
+
+__all__ = [
+  "CitationIndex",
+  "CitationOverlap",
+  "CitedPaper",
+  "document_text",
+  "get_citation_index",
+  "get_keyword_index",
+  "get_novelty_index",
+  "KeywordDelta",
+  "KeywordIndex",
+  "NoveltyIndex",
+  "NoveltyScore",
+  "TermCentroid",
+  "TermDocument",
+]
@@ -0,0 +1,534 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import structlog
+
+from ..core.settings import get_settings
+from ..parsing.tei_parser import ParsedDocument
+from .novelty import month_key
+from .scoring import KEYWORD_POINTS
+
+logger = structlog.get_logger()
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z][a-z0-9]+")
+_MONTH_DIR = re.compile(r"^\d{4}-\d{2}$")
+_SEGMENT_FILE = re.compile(r"^\d{6}\.npz$")
+# Every update appends one small segment to each month it touches; past this many they merge.
+_MAX_SEGMENTS = 8
+_MAX_COUNT = np.iinfo(np.uint16).max
+_STOPWORDS = frozenset(
+  """
+  a about above after again against all also am an and any are as at be because been before
+  being below between both but by can could did do does doing down during each few for from
+  further had has have having he her here hers him his how however i if in into is it its
+  itself just may me more most must my no nor not now of off on once only or other our ours out
+  over own same she should so some such than that the their theirs them then there these they
+  this those through thus to too under until up upon us very via was we were what when where
+  which while who whom why will with within without would yet you your
+  al et fig figure table section paper propose proposed show shows shown use used using
+  """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+  return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def document_text(title: str | None, abstract: str | None, parsed: ParsedDocument | None = None) -> str:
+  """Text indexed for a paper: title and abstract, plus the body once GROBID has parsed it."""
+  parts = [title or "", abstract or ""]
+  if parsed is not None:
+    parts.append(parsed.concatenated_body)
+  return "\n\n".join(part for part in parts if part)
+
+
+@dataclass(slots=True)
+class TermDocument:
+  paper_id: int
+  text: str
+  published_at: datetime
+
+
+@dataclass(slots=True)
+class TermCentroid:
+  """Mean BM25 term weights of a topic's papers, truncated to the heaviest terms."""
+
+  term_ids: np.ndarray
+  weights: np.ndarray
+  documents: int
+
+
+@dataclass(slots=True)
+class KeywordDelta:
+  score: float
+  similarity: float
+  points: float
+  distinctive_terms: list[str]
+
+
+@dataclass(slots=True)
+class Segment:
+  """Doc-major postings for one batch: CSR offsets into per-document term ids and counts."""
+
+  paper_ids: np.ndarray
+  offsets: np.ndarray
+  term_ids: np.ndarray
+  counts: np.ndarray
+  alive: np.ndarray
+
+  def row(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+    start, end = self.offsets[index], self.offsets[index + 1]
+    return self.term_ids[start:end], self.counts[start:end]
+
+  def live_postings(self) -> tuple[np.ndarray, np.ndarray]:
+    if self.alive.all():
+      return self.term_ids, self.counts
+    mask = np.repeat(self.alive, np.diff(self.offsets))
+    return self.term_ids[mask], self.counts[mask]
+
+
+@dataclass(slots=True)
+class MonthTerms:
+  segments: list[Segment] = field(default_factory=list)
+  df: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+  documents: int = 0
+  length: int = 0
+  next_segment: int = 0
+
+
+@dataclass(slots=True)
+class _WindowStats:
+  df: np.ndarray
+  documents: int
+  average_length: float
+
+
+class KeywordIndex:
+  """Incremental BM25 term index over the trailing 12 months of papers.
+
+  Terms map to ids through an append-only dictionary (`terms.txt`). Each publication month
+  keeps doc-major postings in small immutable segments (`<month>/<seq>.npz`) and per-term
+  document frequencies rebuilt with one `bincount` on load, so an update writes only the new
+  documents and expiring a month deletes its directory. Re-indexing a paper (the parsed body
+  arrives after the abstract) tombstones the old row until the month is compacted. BM25
+  statistics are summed over the live window at query time.
+  """
+
+  def __init__(
+    self,
+    root: str | Path,
+    *,
+    window_months: int | None = None,
+    max_terms_per_doc: int | None = None,
+  ) -> None:
+    settings = get_settings()
+    self.root = Path(root)
+    self.root.mkdir(parents=True, exist_ok=True)
+    self.window_months = window_months or settings.novelty_window_months
+    self.max_terms_per_doc = max_terms_per_doc or settings.keyword_max_terms_per_doc
+    self.terms: list[str] = []
+    self._term_ids: dict[str, int] = {}
+    self._months: dict[str, MonthTerms] = {}
+    self._locations: dict[int, tuple[str, int, int]] = {}
+    self._lock = threading.Lock()
+    self._load()
+
+  @property
+  def months(self) -> list[str]:
+    return sorted(self._months)
+
+  def __contains__(self, paper_id: int) -> bool:
+    return paper_id in self._locations
+
+  def __len__(self) -> int:
+    return len(self._locations)
+
+  def update(self, documents: Iterable[TermDocument]) -> int:
+    """Index documents, replacing earlier versions of the same papers; costs O(new documents)."""
+    by_month: dict[str, dict[int, list[tuple[str, int]]]] = {}
+    for document in documents:
+      terms = self._count(document.text)
+      by_month.setdefault(month_key(document.published_at), {})[document.paper_id] = terms
+    indexed = 0
+    with self._lock:
+      size = len(self.terms)
+      touched = {self._forget(paper_id) for rows in by_month.values() for paper_id in rows}
+      segments = {month: self._build_segment(rows) for month, rows in by_month.items()}
+      if len(self.terms) > size:
+        self._save_terms(size)
+      for month, segment in segments.items():
+        self._append(month, segment)
+        indexed += len(segment.paper_ids)
+      for month in touched - {None} - set(by_month):
+        self._save_tombstones(month)
+    return indexed
+
+  def expire(self, *, now: datetime | None = None) -> list[str]:
+    """Drop months that fell out of the window; returns the expired months."""
+    oldest = min(self._window(now))
+    expired: list[str] = []
+    with self._lock:
+      for month in list(self._months):
+        if month >= oldest:
+          continue
+        for segment in self._months.pop(month).segments:
+          for paper_id in segment.paper_ids[segment.alive].tolist():
+            self._locations.pop(paper_id, None)
+        directory = self.root / month
+        for path in directory.iterdir():
+          path.unlink()
+        directory.rmdir()
+        expired.append(month)
+    if expired:
+      logger.info("keyword_index.expire", months=expired)
+    return expired
+
+  def centroid(
+    self, paper_ids: Iterable[int], *, now: datetime | None = None, top_terms: int = 256
+  ) -> TermCentroid:
+    """Mean BM25 weight vector of the indexed papers among `paper_ids` (a topic's matches)."""
+    live = set(self._window(now))
+    stats = self._stats(live)
+    rows: list[tuple[np.ndarray, np.ndarray]] = []
+    with self._lock:
+      for paper_id in paper_ids:
+        location = self._locations.get(paper_id)
+        if location is not None and location[0] in live:
+          month, segment, row = location
+          rows.append(self._months[month].segments[segment].row(row))
+    if not rows:
+      return TermCentroid(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), 0)
+    term_ids = np.concatenate([ids for ids, _ in rows]).astype(np.int64)
+    counts = np.concatenate([counts for _, counts in rows]).astype(np.float64)
+    lengths = np.repeat([counts.sum() for _, counts in rows], [ids.size for ids, _ in rows])
+    totals = np.bincount(term_ids, _bm25(term_ids, counts, lengths, stats), minlength=len(self.terms))
+    totals /= len(rows)
+    keep = np.argsort(totals)[::-1][: min(top_terms, np.count_nonzero(totals))]
+    return TermCentroid(keep, totals[keep], len(rows))
+
+  def deltas(
+    self,
+    texts: Sequence[str],
+    centroid: TermCentroid,
+    *,
+    now: datetime | None = None,
+    top_terms: int = 5,
+  ) -> list[KeywordDelta]:
+    """Score new papers' terms against a topic centroid and list their most distinctive terms.
+
+    `score` is the BM25 dot product with the unit-length centroid and `similarity` its cosine;
+    `points` scales the dissimilarity onto the keyword share of the novelty score. The whole
+    batch is laid out as flat arrays with per-paper offsets and reduced in one pass. Terms the
+    index has never seen count as maximally rare.
+    """
+    started = time.perf_counter()
+    stats = self._stats(set(self._window(now)))
+    dense = np.zeros(len(self.terms) + 1, dtype=np.float64)  # last slot: unseen terms
+    dense[centroid.term_ids] = centroid.weights
+    norm = np.linalg.norm(centroid.weights)
+    query = dense / norm if norm else dense
+
+    terms, term_ids, counts, offsets = self._vectorize(texts)
+    lengths = np.repeat(_segment_sum(counts, offsets), np.diff(offsets))
+    weights = _bm25(term_ids, counts, lengths, stats)
+    scores = _segment_sum(weights * query[term_ids], offsets)
+    norms = np.sqrt(_segment_sum(weights**2, offsets))
+    similarity = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+    lift = weights - dense[term_ids]
+
+    results = []
+    for index, (start, end) in enumerate(zip(offsets[:-1].tolist(), offsets[1:].tolist(), strict=True)):
+      order = start + np.argsort(-lift[start:end], kind="stable")[:top_terms]
+      results.append(
+        KeywordDelta(
+          score=round(float(scores[index]), 4),
+          similarity=round(float(similarity[index]), 4),
+          points=round(KEYWORD_POINTS * (1.0 - float(np.clip(similarity[index], 0.0, 1.0))), 2),
+          distinctive_terms=[terms[i] for i in order.tolist() if lift[i] > 0],
+        )
+      )
+    logger.info(
+      "keyword_index.deltas",
+      papers=len(texts),
+      centroid_terms=len(centroid.term_ids),
+      elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    return results
+
+  def bm25(self, query: str, paper_ids: Sequence[int], *, now: datetime | None = None) -> np.ndarray:
+    """BM25 of a free-text query against indexed papers (0 for papers outside the window)."""
+    live = set(self._window(now))
+    stats = self._stats(live)
+    wanted = np.asarray(sorted({self._term_ids[t] for t in tokenize(query) if t in self._term_ids}))
+    scores = np.zeros(len(paper_ids), dtype=np.float64)
+    if wanted.size == 0:
+      return scores
+    with self._lock:
+      for index, paper_id in enumerate(paper_ids):
+        location = self._locations.get(paper_id)
+        if location is None or location[0] not in live:
+          continue
+        month, segment, row = location
+        term_ids, counts = self._months[month].segments[segment].row(row)
+        hit = np.isin(term_ids, wanted)
+        length = np.full(int(hit.sum()), counts.sum(), dtype=np.float64)
+        scores[index] = _bm25(term_ids[hit].astype(np.int64), counts[hit], length, stats).sum()
+    return scores
+
+  def _count(self, text: str) -> list[tuple[str, int]]:
+    return Counter(tokenize(text)).most_common(self.max_terms_per_doc)
+
+  def _vectorize(self, texts: Sequence[str]) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+    unseen = len(self.terms)
+    terms: list[str] = []
+    counts: list[int] = []
+    offsets = [0]
+    for text in texts:
+      for term, count in self._count(text):
+        terms.append(term)
+        counts.append(count)
+      offsets.append(len(terms))
+    term_ids = np.fromiter((self._term_ids.get(term, unseen) for term in terms), dtype=np.int64, count=len(terms))
+    return terms, term_ids, np.asarray(counts, dtype=np.float64), np.asarray(offsets, dtype=np.int64)
+
+  def _stats(self, months: set[str]) -> _WindowStats:
+    # One extra zero slot so unseen terms (id == len(terms)) read a document frequency of 0.
+    df = np.zeros(len(self.terms) + 1, dtype=np.int64)
+    documents = length = 0
+    with self._lock:
+      for month in months & self._months.keys():
+        terms = self._months[month]
+        df[: terms.df.size] += terms.df
+        documents += terms.documents
+        length += terms.length
+    return _WindowStats(df=df, documents=documents, average_length=length / documents if documents else 0.0)
+
+  def _build_segment(self, rows: dict[int, list[tuple[str, int]]]) -> Segment:
+    postings = [posting for terms in rows.values() for posting in terms]
+    for term, _ in postings:
+      if term not in self._term_ids:
+        self._term_ids[term] = len(self.terms)
+        self.terms.append(term)
+    term_ids = np.fromiter((self._term_ids[term] for term, _ in postings), dtype=np.uint32, count=len(postings))
+    counts = np.fromiter((count for _, count in postings), dtype=np.int64, count=len(postings))
+    return Segment(
+      paper_ids=np.fromiter(rows, dtype=np.int64, count=len(rows)),
+      offsets=np.concatenate([[0], np.cumsum([len(terms) for terms in rows.values()])]).astype(np.int64),
+      term_ids=term_ids,
+      counts=np.minimum(counts, _MAX_COUNT).astype(np.uint16),
+      alive=np.ones(len(rows), dtype=bool),
+    )
+
+  def _append(self, month: str, segment: Segment) -> None:
+    terms = self._months.setdefault(month, MonthTerms())
+    (self.root / month).mkdir(exist_ok=True)
+    _save_segment(self.root / month / f"{terms.next_segment:06d}.npz", segment)
+    terms.next_segment += 1
+    self._add_segment(month, terms, segment)
+    if len(terms.segments) > _MAX_SEGMENTS:
+      self._compact(month, terms)
+    else:
+      self._save_tombstones(month)
+
+  def _add_segment(self, month: str, terms: MonthTerms, segment: Segment) -> None:
+    index = len(terms.segments)
+    terms.segments.append(segment)
+    term_ids, counts = segment.live_postings()
+    if terms.df.size < len(self.terms):
+      terms.df = np.concatenate([terms.df, np.zeros(len(self.terms) - terms.df.size, dtype=np.int64)])
+    terms.df += np.bincount(term_ids, minlength=terms.df.size)
+    terms.documents += int(segment.alive.sum())
+    terms.length += int(counts.sum(dtype=np.int64))
+    for row in np.flatnonzero(segment.alive).tolist():
+      self._locations[int(segment.paper_ids[row])] = (month, index, row)
+
+  def _forget(self, paper_id: int) -> str | None:
+    location = self._locations.pop(paper_id, None)
+    if location is None:
+      return None
+    month, index, row = location
+    terms = self._months[month]
+    segment = terms.segments[index]
+    term_ids, counts = segment.row(row)
+    terms.df[term_ids] -= 1
+    terms.documents -= 1
+    terms.length -= int(counts.sum(dtype=np.int64))
+    segment.alive[row] = False
+    return month
+
+  def _compact(self, month: str, terms: MonthTerms) -> None:
+    started = time.perf_counter()
+    directory = self.root / month
+    old = [path for path in directory.iterdir() if _SEGMENT_FILE.match(path.name)]
+    merged = _merge_segments(terms.segments)
+    _save_segment(directory / f"{terms.next_segment:06d}.npz", merged)
+    for path in old:
+      path.unlink()
+    (directory / "tombstones.npy").unlink(missing_ok=True)
+    compacted = self._months[month] = MonthTerms(next_segment=terms.next_segment + 1)
+    self._add_segment(month, compacted, merged)
+    logger.info(
+      "keyword_index.compact",
+      month=month,
+      segments=len(old),
+      documents=compacted.documents,
+      elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+  def _save_terms(self, start: int) -> None:
+    # New terms reach disk before any segment that uses their ids: a crash can leave unused
+    # terms behind, never a segment pointing past the end of the dictionary.
+    with open(self.root / "terms.txt", "a", encoding="utf-8") as handle:
+      handle.write("".join(f"{term}\n" for term in self.terms[start:]))
+      handle.flush()
+      os.fsync(handle.fileno())
+
+  def _save_tombstones(self, month: str) -> None:
+    # Dead rows are recorded per month as (segment, row) pairs, since a re-indexed paper keeps
+    # its id; segments stay immutable and compaction drops the rows.
+    dead = np.asarray(
+      [
+        (index, row)
+        for index, segment in enumerate(self._months[month].segments)
+        for row in np.flatnonzero(~segment.alive).tolist()
+      ],
+      dtype=np.int64,
+    )
+    path = self.root / month / "tombstones.npy"
+    if dead.size == 0:
+      path.unlink(missing_ok=True)
+      return
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, dead)
+    os.replace(tmp, path)
+
+  def _window(self, now: datetime | None) -> list[str]:
+    now = now or datetime.now(timezone.utc)
+    index = now.year * 12 + now.month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(index - self.window_months + 1, index + 1)]
+
+  def _load(self) -> None:
+    started = time.perf_counter()
+    vocabulary = self.root / "terms.txt"
+    if vocabulary.exists():
+      text = vocabulary.read_text(encoding="utf-8")
+      if text and not text.endswith("\n"):
+        # A line torn by a crash mid-append; no segment was written that uses it.
+        text = text[: text.rfind("\n") + 1]
+        vocabulary.write_text(text, encoding="utf-8")
+      self.terms = text.splitlines()
+      self._term_ids = {term: i for i, term in enumerate(self.terms)}
+    for directory in sorted(self.root.iterdir()):
+      if not (directory.is_dir() and _MONTH_DIR.match(directory.name)):
+        continue
+      paths = sorted(path for path in directory.iterdir() if _SEGMENT_FILE.match(path.name))
+      if not paths:
+        continue
+      tombstones = directory / "tombstones.npy"
+      dead = np.load(tombstones).reshape(-1, 2) if tombstones.exists() else np.empty((0, 2), dtype=np.int64)
+      terms = self._months[directory.name] = MonthTerms(next_segment=int(paths[-1].stem) + 1)
+      for index, path in enumerate(paths):
+        segment = _load_segment(path)
+        segment.alive[dead[dead[:, 0] == index, 1]] = False
+        self._add_segment(directory.name, terms, segment)
+    logger.info(
+      "keyword_index.load",
+      months=len(self._months),
+      documents=len(self._locations),
+      terms=len(self.terms),
+      elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@lru_cache
+def get_keyword_index() -> KeywordIndex | None:
+  settings = get_settings()
+  if not settings.keyword_index_dir:
+    return None
+  return KeywordIndex(settings.keyword_index_dir)
+
+
+def _bm25(term_ids: np.ndarray, counts: np.ndarray, lengths: np.ndarray, stats: _WindowStats) -> np.ndarray:
+  counts = np.asarray(counts, dtype=np.float64)
+  df = stats.df[term_ids]
+  idf = np.log1p((stats.documents - df + 0.5) / (df + 0.5))
+  average = stats.average_length or (float(np.mean(lengths)) if len(lengths) else 1.0) or 1.0
+  saturation = BM25_K1 * (1.0 - BM25_B + BM25_B * np.asarray(lengths, dtype=np.float64) / average)
+  return idf * counts * (BM25_K1 + 1.0) / (counts + saturation)
+
+
+def _segment_sum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+  # `np.add.reduceat` misreads empty segments, so only non-empty ones are reduced.
+  sums = np.zeros(offsets.size - 1, dtype=np.float64)
+  filled = np.diff(offsets) > 0
+  if filled.any():
+    sums[filled] = np.add.reduceat(values, offsets[:-1][filled])
+  return sums
+
+
+def _merge_segments(segments: list[Segment]) -> Segment:
+  paper_ids, term_ids, counts = [], [], []
+  lengths = []
+  for segment in segments:
+    live = np.flatnonzero(segment.alive)
+    mask = np.repeat(segment.alive, np.diff(segment.offsets))
+    paper_ids.append(segment.paper_ids[live])
+    lengths.append(np.diff(segment.offsets)[live])
+    term_ids.append(segment.term_ids[mask])
+    counts.append(segment.counts[mask])
+  lengths = np.concatenate(lengths)
+  return Segment(
+    paper_ids=np.concatenate(paper_ids),
+    offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+    term_ids=np.concatenate(term_ids),
+    counts=np.concatenate(counts),
+    alive=np.ones(lengths.size, dtype=bool),
+  )
+
+
+def _save_segment(path: Path, segment: Segment) -> None:
+  # Stored uncompressed in the narrowest dtype that fits: zlib made compaction the bottleneck,
+  # while uint16 term ids and uint8 counts already bring a posting down to ~3 bytes.
+  tmp = path.with_suffix(".tmp.npz")
+  np.savez(
+    tmp,
+    paper_ids=segment.paper_ids,
+    offsets=_narrow(segment.offsets),
+    term_ids=_narrow(segment.term_ids),
+    counts=_narrow(segment.counts),
+  )
+  os.replace(tmp, path)
+
+
+def _narrow(values: np.ndarray) -> np.ndarray:
+  top = int(values.max()) if values.size else 0
+  for dtype in (np.uint8, np.uint16, np.uint32):
+    if top <= np.iinfo(dtype).max:
+      return values.astype(dtype, copy=False)
+  return values
+
+
+def _load_segment(path: Path) -> Segment:
+  with np.load(path) as data:
+    paper_ids = data["paper_ids"]
+    return Segment(
+      paper_ids=paper_ids,
+      offsets=data["offsets"].astype(np.int64),
+      term_ids=data["term_ids"],
+      counts=data["counts"],
+      alive=np.ones(paper_ids.size, dtype=bool),
+    )
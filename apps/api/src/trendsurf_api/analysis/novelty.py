@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import structlog
+
+from ..core.settings import get_settings
+from .scoring import SEMANTIC_POINTS
+
+logger = structlog.get_logger()
+
+_NEAREST_CENTROIDS = 3
+_BUCKET_FILE = re.compile(r"^(\d{4})-(\d{2})\.npz$")
+
+
+@dataclass(slots=True)
+class NoveltyScore:
+  centroid_distance: float
+  neighbour_distance: float
+  distance: float
+  points: float
+
+
+@dataclass(slots=True)
+class MonthBucket:
+  """Mini-batch k-means state and an exemplar reservoir for one publication month."""
+
+  month: str
+  centroids: np.ndarray
+  counts: np.ndarray
+  exemplars: np.ndarray
+  seen: int = 0
+
+  @classmethod
+  def empty(cls, month: str, dimensions: int) -> MonthBucket:
+    return cls(
+      month=month,
+      centroids=np.empty((0, dimensions), dtype=np.float32),
+      counts=np.empty(0, dtype=np.float64),
+      exemplars=np.empty((0, dimensions), dtype=np.float32),
+    )
+
+  def update(self, vectors: np.ndarray, *, clusters: int, exemplars: int, rng: np.random.Generator) -> None:
+    """Fold a batch into the centroids and the exemplar reservoir without revisiting old points.
+
+    Assignments use cosine similarity on unit vectors; each centroid moves to the running mean
+    of everything assigned to it, which is the mini-batch k-means update with a 1/count
+    learning rate applied per batch.
+    """
+    self._sample(vectors, exemplars, rng)
+    vectors = self._seed(vectors, clusters)
+    if vectors.size:
+      nearest = np.argmax(vectors @ self.centroids.T, axis=1)
+      assignment = np.zeros((len(self.centroids), len(vectors)), dtype=np.float32)
+      assignment[nearest, np.arange(len(vectors))] = 1.0
+      sums = assignment @ vectors
+      added = np.bincount(nearest, minlength=len(self.centroids))
+      moved = added > 0
+      totals = self.counts + added
+      updated = (self.centroids[moved] * self.counts[moved, None] + sums[moved]) / totals[moved, None]
+      self.centroids[moved] = _normalize_rows(updated)
+      self.counts = totals
+
+  def _seed(self, vectors: np.ndarray, clusters: int) -> np.ndarray:
+    # Until the bucket has `clusters` centroids, the points least covered by the existing ones
+    # become new centroids (a greedy k-means++ without the sampling).
+    missing = clusters - len(self.centroids)
+    if missing <= 0 or vectors.size == 0:
+      return vectors
+    if len(self.centroids):
+      coverage = (vectors @ self.centroids.T).max(axis=1)
+      order = np.argsort(coverage)
+    else:
+      order = np.arange(len(vectors))
+    picked = order[:missing]
+    self.centroids = np.vstack([self.centroids, vectors[picked]]).astype(np.float32)
+    self.counts = np.concatenate([self.counts, np.ones(len(picked))])
+    return np.delete(vectors, picked, axis=0)
+
+  def _sample(self, vectors: np.ndarray, capacity: int, rng: np.random.Generator) -> None:
+    # Reservoir sampling (algorithm R), vectorised over the batch.
+    room = max(0, capacity - len(self.exemplars))
+    if room:
+      self.exemplars = np.vstack([self.exemplars, vectors[:room]]).astype(np.float32)
+    rest = vectors[room:]
+    positions = self.seen + room + np.arange(len(rest))
+    slots = (rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+    keep = slots < capacity
+    self.exemplars[slots[keep]] = rest[keep]
+    self.seen += len(vectors)
+
+
+class NoveltyIndex:
+  """Semantic distance of new papers to the trailing 12-month corpus.
+
+  The corpus is summarised per publication month by mini-batch k-means centroids and a fixed
+  size exemplar reservoir, so memory and scoring cost depend on `window_months`, not on the
+  number of papers, and months age out by dropping their bucket. `score` computes similarity
+  against every live centroid and exemplar with two matrix products; the distance blends the
+  nearest centroids (where a paper sits among the clusters) with the mean of its top-k
+  exemplar neighbours (how crowded its immediate surroundings are). Buckets are persisted as
+  one `.npz` per month under `root`.
+  """
+
+  def __init__(
+    self,
+    root: str | Path,
+    *,
+    dimensions: int,
+    clusters_per_month: int | None = None,
+    exemplars_per_month: int | None = None,
+    window_months: int | None = None,
+    neighbours: int | None = None,
+    seed: int = 0,
+  ) -> None:
+    settings = get_settings()
+    self.root = Path(root)
+    self.root.mkdir(parents=True, exist_ok=True)
+    self.dimensions = dimensions
+    self.clusters_per_month = clusters_per_month or settings.novelty_clusters_per_month
+    self.exemplars_per_month = exemplars_per_month or settings.novelty_exemplars_per_month
+    self.window_months = window_months or settings.novelty_window_months
+    self.neighbours = neighbours or settings.novelty_neighbours
+    self.centroid_weight = settings.novelty_centroid_weight
+    self.distance_floor = settings.novelty_distance_floor
+    self.distance_ceiling = settings.novelty_distance_ceiling
+    self._rng = np.random.default_rng(seed)
+    self._buckets: dict[str, MonthBucket] = {}
+    self._stacked: tuple[tuple[str, ...], np.ndarray, np.ndarray] | None = None
+    self._lock = threading.Lock()
+    self._load()
+
+  @property
+  def months(self) -> list[str]:
+    return sorted(self._buckets)
+
+  def update(self, vectors: np.ndarray | Sequence[Sequence[float]], published_at: Sequence[datetime]) -> None:
+    """Fold vectors into the buckets of their publication months and persist those buckets."""
+    vectors = _normalize_rows(vectors)
+    months = np.asarray([month_key(moment) for moment in published_at])
+    with self._lock:
+      for month in np.unique(months).tolist():
+        bucket = self._buckets.get(month) or MonthBucket.empty(month, self.dimensions)
+        bucket.update(
+          vectors[months == month],
+          clusters=self.clusters_per_month,
+          exemplars=self.exemplars_per_month,
+          rng=self._rng,
+        )
+        self._buckets[month] = bucket
+        self._save(bucket)
+      self._stacked = None
+
+  def score(
+    self, vectors: np.ndarray | Sequence[Sequence[float]], *, now: datetime | None = None
+  ) -> list[NoveltyScore]:
+    started = time.perf_counter()
+    vectors = _normalize_rows(vectors)
+    centroids, exemplars = self._matrices(now)
+    if len(centroids) == 0 or len(vectors) == 0:
+      # Nothing to compare against yet: report maximal distance rather than guessing.
+      return [NoveltyScore(1.0, 1.0, 1.0, SEMANTIC_POINTS) for _ in range(len(vectors))]
+
+    centroid_sims = vectors @ centroids.T
+    exemplar_sims = vectors @ exemplars.T
+    centroid_distance = 1.0 - _top_k_mean(centroid_sims, _NEAREST_CENTROIDS)
+    neighbour_distance = 1.0 - _top_k_mean(exemplar_sims, self.neighbours)
+    distance = np.clip(
+      self.centroid_weight * centroid_distance + (1.0 - self.centroid_weight) * neighbour_distance,
+      0.0,
+      1.0,
+    )
+    span = max(self.distance_ceiling - self.distance_floor, 1e-6)
+    points = SEMANTIC_POINTS * np.clip((distance - self.distance_floor) / span, 0.0, 1.0)
+    logger.info(
+      "novelty.score",
+      papers=len(vectors),
+      centroids=centroid_sims.shape[1],
+      exemplars=exemplar_sims.shape[1],
+      elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    return [
+      NoveltyScore(round(c, 4), round(n, 4), round(d, 4), round(p, 2))
+      for c, n, d, p in zip(
+        centroid_distance.tolist(),
+        neighbour_distance.tolist(),
+        distance.tolist(),
+        points.tolist(),
+        strict=True,
+      )
+    ]
+
+  def expire(self, *, now: datetime | None = None) -> list[str]:
+    """Drop buckets that fell out of the window; returns the expired months."""
+    window = set(self._window(now))
+    oldest = min(window)
+    expired: list[str] = []
+    with self._lock:
+      for month in list(self._buckets):
+        if month < oldest:
+          del self._buckets[month]
+          (self.root / f"{month}.npz").unlink(missing_ok=True)
+          expired.append(month)
+      self._stacked = None
+    if expired:
+      logger.info("novelty.expire", months=expired)
+    return expired
+
+  def _matrices(self, now: datetime | None) -> tuple[np.ndarray, np.ndarray]:
+    # Stacking a year of exemplars costs more than scoring a small batch, so reuse it until
+    # an update, an expiry or a new month changes the live buckets.
+    with self._lock:
+      months = tuple(month for month in self._window(now) if month in self._buckets)
+      if self._stacked is None or self._stacked[0] != months:
+        live = [self._buckets[month] for month in months]
+        centroids = [bucket.centroids for bucket in live]
+        exemplars = [bucket.exemplars for bucket in live]
+        empty = np.empty((0, self.dimensions), dtype=np.float32)
+        self._stacked = (
+          months,
+          np.vstack(centroids) if centroids else empty,
+          np.vstack(exemplars) if exemplars else empty,
+        )
+      return self._stacked[1], self._stacked[2]
+
+  def _window(self, now: datetime | None) -> list[str]:
+    now = now or datetime.now(timezone.utc)
+    index = now.year * 12 + now.month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(index - self.window_months + 1, index + 1)]
+
+  def _load(self) -> None:
+    for path in self.root.glob("*.npz"):
+      if not _BUCKET_FILE.match(path.name):
+        continue
+      with np.load(path) as data:
+        if data["centroids"].shape[1] != self.dimensions:
+          logger.warning("novelty.bucket_dimension_mismatch", path=str(path))
+          continue
+        self._buckets[path.stem] = MonthBucket(
+          month=path.stem,
+          centroids=data["centroids"],
+          counts=data["counts"],
+          exemplars=data["exemplars"],
+          seen=int(data["seen"]),
+        )
+
+  def _save(self, bucket: MonthBucket) -> None:
+    path = self.root / f"{bucket.month}.npz"
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(
+      tmp,
+      centroids=bucket.centroids,
+      counts=bucket.counts,
+      exemplars=bucket.exemplars,
+      seen=np.asarray(bucket.seen),
+    )
+    os.replace(tmp, path)
+
+
+def month_key(moment: datetime) -> str:
+  return f"{moment.year:04d}-{moment.month:02d}"
+
+
+@lru_cache
+def get_novelty_index() -> NoveltyIndex | None:
+  settings = get_settings()
+  if not settings.novelty_dir:
+    return None
+  return NoveltyIndex(settings.novelty_dir, dimensions=settings.embed_dimensions)
+
+
+def _normalize_rows(matrix: np.ndarray | Sequence[Sequence[float]]) -> np.ndarray:
+  matrix = np.asarray(matrix, dtype=np.float32)
+  if matrix.ndim == 1:
+    matrix = matrix[None, :]
+  norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+  norms[norms == 0] = 1.0
+  return matrix / norms
+
+
+def _top_k_mean(similarities: np.ndarray, k: int) -> np.ndarray:
+  k = min(k, similarities.shape[1])
+  top = np.partition(similarities, similarities.shape[1] - k, axis=1)[:, -k:]
+  return top.mean(axis=1)
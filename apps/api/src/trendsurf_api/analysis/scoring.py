@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+# How the 0-7 algorithmic novelty score splits across its signals (implementation plan §7).
+SEMANTIC_POINTS = 3.0
+KEYWORD_POINTS = 2.0
+CITATION_POINTS = 2.0
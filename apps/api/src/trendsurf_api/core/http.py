@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Coroutine, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from .settings import get_settings
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class HttpClientRegistry:
+  """Process-wide pool of `httpx.AsyncClient` instances, one per origin.
+
+  Clients are bound to the event loop that created them; asking for a client from a
+  different loop (e.g. a fresh `asyncio.run` in a test or job) builds a new one.
+  """
+
+  def __init__(self) -> None:
+    self._clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+  def get(self, url: str) -> httpx.AsyncClient:
+    key = origin_of(url)
+    loop = asyncio.get_running_loop()
+    entry = self._clients.get(key)
+    if entry is not None:
+      owner, client = entry
+      if owner is loop and not client.is_closed:
+        return client
+    client = _build_client()
+    self._clients[key] = (loop, client)
+    logger.info("http.client.created", origin=key, http2=get_settings().http_http2)
+    return client
+
+  async def aclose(self) -> None:
+    loop = asyncio.get_running_loop()
+    clients = list(self._clients.items())
+    self._clients.clear()
+    for key, (owner, client) in clients:
+      if owner is not loop or client.is_closed:
+        continue
+      await client.aclose()
+      logger.info("http.client.closed", origin=key)
+
+
+_registry = HttpClientRegistry()
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+  """Return the pooled client for the origin of `url`; pass absolute URLs to its methods."""
+  return _registry.get(url)
+
+
+async def close_http_clients() -> None:
+  await _registry.aclose()
+
+
+def run_in_worker_loop(coro: Coroutine[Any, Any, T]) -> T:
+  """Run `coro` on a persistent per-process loop so pooled connections survive across jobs."""
+  global _worker_loop
+  if _worker_loop is None or _worker_loop.is_closed():
+    _worker_loop = asyncio.new_event_loop()
+  return _worker_loop.run_until_complete(coro)
+
+
+def shutdown_http_clients() -> None:
+  """Close pooled clients and the worker loop; safe to call from `atexit`."""
+  global _worker_loop
+  if _worker_loop is None or _worker_loop.is_closed():
+    return
+  _worker_loop.run_until_complete(close_http_clients())
+  _worker_loop.close()
+  _worker_loop = None
+
+
+def origin_of(url: str) -> str:
+  parts = urlsplit(url)
+  if not parts.scheme or not parts.netloc:
+    raise ValueError(f"Expected an absolute URL, got {url!r}")
+  return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _build_client() -> httpx.AsyncClient:
+  settings = get_settings()
+  limits = httpx.Limits(
+    max_connections=settings.http_max_connections,
+    max_keepalive_connections=settings.http_max_keepalive_connections,
+    keepalive_expiry=settings.http_keepalive_expiry,
+  )
+  return httpx.AsyncClient(limits=limits, http2=settings.http_http2, timeout=settings.http_timeout)
@@ -25,21 +25,87 @@ class Settings(BaseSettings):
   arxiv_delay_ms: int = 3200
   arxiv_max_results_per_run: int = 40
   pdf_max_mb: int = 40
+  pdf_spool_dir: str | None = None
+  pdf_cache_dir: str | None = None
+  pdf_cache_max_mb: int = 10240
+  pdf_cache_ttl_seconds: float = 86400.0
+  pdf_download_per_host: int = 4
+  pdf_download_delay_ms: int = 250
+  pdf_download_max_inflight_mb: int = 256
+  pdf_download_retries: int = 4
   user_agent: str = "TrendSurfBot/0.1"
 
   qdrant_url: AnyHttpUrl | None = None
   qdrant_api_key: str | None = None
   qdrant_collection_papers: str = "paper_vectors"
   qdrant_collection_topics: str = "topic_vectors"
+  qdrant_prefer_grpc: bool = False
+  qdrant_grpc_port: int = 6334
+  qdrant_timeout: float = 30.0
+  qdrant_upsert_batch_size: int = 256
+  qdrant_upsert_parallel: int = 4
+  qdrant_upsert_retries: int = 3
+  qdrant_quantization: str = "scalar"
+  qdrant_quantization_quantile: float = 0.99
+  qdrant_quantization_always_ram: bool = True
+  qdrant_on_disk_vectors: bool = True
+  qdrant_hnsw_m: int = 32
+  qdrant_hnsw_ef_construct: int = 256
+  qdrant_hnsw_on_disk: bool = False
+  qdrant_search_hnsw_ef: int | None = None
+  qdrant_search_rescore: bool = True
+  qdrant_search_oversampling: float = 2.0
+  qdrant_reindex_batch_size: int = 512
+  qdrant_reindex_min_recall: float = 0.9
+  qdrant_reindex_keep: int = 2
+  match_min_score: float = 0.5
+  match_top_k: int | None = None
+  match_anchor_poll_seconds: float = 2.0
+  metadata_index_dir: str | None = None
+  novelty_dir: str | None = None
+  novelty_window_months: int = 12
+  novelty_clusters_per_month: int = 64
+  novelty_exemplars_per_month: int = 2048
+  novelty_neighbours: int = 10
+  novelty_centroid_weight: float = 0.5
+  novelty_distance_floor: float = 0.2
+  novelty_distance_ceiling: float = 0.6
+  keyword_index_dir: str | None = None
+  keyword_max_terms_per_doc: int = 256
+  citation_index_dir: str | None = None
+  citation_num_perm: int = 128
+  citation_lsh_bands: int = 64
+  citation_neighbours: int = 3
+  citation_overlap_ceiling: float = 0.5
+  vector_backend: str = "qdrant"
+  vector_local_dir: str | None = None
 
   grobid_url: AnyHttpUrl | None = None
   grobid_timeout: float = 60.0
+  grobid_urls: str = ""
+  grobid_concurrency: int = 4
+  parse_workers: int = 0
 
   embed_provider: str | None = None
   embed_base_url: AnyHttpUrl | None = None
   embed_api_key: str | None = None
   embed_model: str | None = None
   embed_dimensions: int = 1536
+  embed_batch_max_items: int = 64
+  embed_batch_max_tokens: int = 8192
+  embed_concurrency: int | None = None
+  embed_coalesce_window_ms: float = 5.0
+  chunk_max_tokens: int = 512
+  chunk_overlap_tokens: int = 64
+  chunk_abstract_weight: float = 2.0
+  embed_cache_dir: str | None = None
+  embed_cache_max_mb: int = 2048
+
+  http_max_connections: int = 100
+  http_max_keepalive_connections: int = 20
+  http_keepalive_expiry: float = 30.0
+  http_timeout: float = 30.0
+  http_http2: bool = False
 
   model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
@@ -47,8 +113,19 @@ class Settings(BaseSettings):
     "ollama_base_url",
     "openai_base_url",
     "qdrant_url",
+    "qdrant_search_hnsw_ef",
     "grobid_url",
     "embed_base_url",
+    "embed_concurrency",
+    "pdf_spool_dir",
+    "pdf_cache_dir",
+    "embed_cache_dir",
+    "vector_local_dir",
+    "match_top_k",
+    "metadata_index_dir",
+    "novelty_dir",
+    "keyword_index_dir",
+    "citation_index_dir",
     mode="before",
   )
   @classmethod
@@ -65,6 +142,13 @@ class Settings(BaseSettings):
       return []
     return [origin.strip() for origin in origins_raw.split(",") if origin.strip()]
 
+  @property
+  def grobid_instance_urls(self) -> list[str]:
+    urls = [url.strip() for url in self.grobid_urls.split(",") if url.strip()]
+    if not urls and self.grobid_url:
+      urls.append(str(self.grobid_url))
+    return urls
+
   @property
   def allowed_llm_models(self) -> dict[str, list[str]]:
     pairs: dict[str, list[str]] = {}
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+import math
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+  """Cheap tokenizer-free estimate (~4 chars per token for English prose)."""
+  return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
@@ -1,11 +1,35 @@
 from .arxiv_client import ArxivClient, ArxivPaper
+from .download_scheduler import DownloadResult, DownloadScheduler
+from .keywords import KeywordSet, keyword_in, normalize_keyword
+from .metadata_index import MetadataIndex, get_metadata_index
+from .paper_writer import UpsertReport, upsert_papers
+from .pdf_cache import PdfCache, get_pdf_cache
 from .pdf_fetcher import fetch_pdf, PdfDocument, PdfDownloadError, PdfTooLargeError
+from .query_planner import PlannedQuery, TopicSpec, iter_planned, plan_queries
+from .watermarks import Watermark, WatermarkStore
 
 __all__ = [
   "ArxivClient",
   "ArxivPaper",
+  "DownloadResult",
+  "DownloadScheduler",
   "fetch_pdf",
+  "get_metadata_index",
+  "get_pdf_cache",
+  "keyword_in",
+  "KeywordSet",
+  "MetadataIndex",
+  "normalize_keyword",
+  "PdfCache",
   "PdfDocument",
   "PdfDownloadError",
   "PdfTooLargeError",
+  "PlannedQuery",
+  "TopicSpec",
+  "UpsertReport",
+  "iter_planned",
+  "plan_queries",
+  "upsert_papers",
+  "Watermark",
+  "WatermarkStore",
 ]
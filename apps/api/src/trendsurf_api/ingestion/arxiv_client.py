@@ -1,20 +1,32 @@
 from __future__ import annotations
 
 import asyncio
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import AsyncIterator, Iterable
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
 import xml.etree.ElementTree as ET
 
-import httpx
+import structlog
 
+from ..core.http import get_http_client
 from ..core.settings import get_settings
 
+if TYPE_CHECKING:
+  from .watermarks import Checkpoint, Watermark
+
+logger = structlog.get_logger()
+
 ARXIV_API_URL = "https://export.arxiv.org/api/query"
 ISO8601 = "%Y-%m-%dT%H:%M:%SZ"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+ARXIV_NS = "http://arxiv.org/schemas/atom"
+FEED_NS = {"atom": ATOM_NS, "arxiv": ARXIV_NS}
+_ENTRY_TAG = f"{{{ATOM_NS}}}entry"
+_VERSION_SUFFIX = re.compile(r"v(\d+)$")
 
 
-@dataclass
+@dataclass(slots=True)
 class ArxivPaper:
   source_id: str
   title: str
@@ -26,7 +38,7 @@ class ArxivPaper:
   html_url: str | None
   primary_category: str | None
   categories: list[str]
-  raw: dict[str, str]
+  entry_id: str = ""
 
 
 class ArxivRateLimiter:
@@ -58,6 +70,12 @@ class ArxivClient:
     self.rate_limiter = ArxivRateLimiter(self.delay_ms)
 
   async def query(self, search_query: str, *, start: int = 0, max_results: int = 100) -> list[ArxivPaper]:
+    return [entry async for entry in self.stream_query(search_query, start=start, max_results=max_results)]
+
+  async def stream_query(
+    self, search_query: str, *, start: int = 0, max_results: int = 100
+  ) -> AsyncIterator[ArxivPaper]:
+    """Yield entries as soon as each `<entry>` element has arrived on the wire."""
     params = {
       "search_query": search_query,
       "start": start,
@@ -66,28 +84,97 @@ class ArxivClient:
       "sortOrder": "descending",
     }
     headers = {"User-Agent": self.user_agent}
+    client = get_http_client(ARXIV_API_URL)
     async with self.rate_limiter:
-      async with httpx.AsyncClient(timeout=30, headers=headers) as client:
-        response = await client.get(ARXIV_API_URL, params=params)
+      async with client.stream("GET", ARXIV_API_URL, params=params, headers=headers, timeout=30) as response:
         response.raise_for_status()
-        return list(parse_feed(response.text))
+        async for entry in aiter_feed(response.aiter_bytes()):
+          yield entry
 
   async def iter_topic(self, filters: dict[str, Iterable[str]], *, page_size: int = 20) -> AsyncIterator[ArxivPaper]:
     search_query = build_search_query(filters)
+    async for entry in self.iter_query(search_query, page_size=page_size):
+      yield entry
+
+  async def iter_query(
+    self, search_query: str, *, max_results: int | None = None, page_size: int = 20
+  ) -> AsyncIterator[ArxivPaper]:
+    limit = max_results or self.max_results_per_run
     fetched = 0
     start = 0
 
-    while fetched < self.max_results_per_run:
-      remaining = self.max_results_per_run - fetched
+    while fetched < limit:
+      remaining = limit - fetched
       batch_size = min(page_size, remaining)
-      entries = await self.query(search_query, start=start, max_results=batch_size)
-      if not entries:
-        break
-      for entry in entries:
+      received = 0
+      async for entry in self.stream_query(search_query, start=start, max_results=batch_size):
+        received += 1
         yield entry
-      fetched += len(entries)
+      if not received:
+        break
+      fetched += received
       start += batch_size
 
+  async def iter_incremental(
+    self,
+    watermark: Watermark,
+    *,
+    max_results: int | None = None,
+    page_size: int = 20,
+    checkpoint: Checkpoint | None = None,
+    until: Callable[[], bool] | None = None,
+  ) -> AsyncIterator[ArxivPaper]:
+    """Yield entries newer than `watermark`, stopping at the first already-ingested one.
+
+    Results are sorted by `lastUpdatedDate` descending, so everything after the first
+    seen entry is known. `checkpoint` is called after every page (and when the iterator is
+    closed early) so an interrupted run resumes from its cursor instead of from `start=0`.
+    Reaching `max_results`, or `until()` returning true once the consumer has handled an
+    entry, is not an interruption: the run completes at the newest entry it saw, like a
+    first run does. Otherwise a backlog larger than the quota would keep every later run
+    resuming below it while new papers pile up on top. Consumers with their own quota pass
+    it as `until` instead of closing the iterator, which would leave a resume cursor.
+    """
+    limit = max_results or self.max_results_per_run
+    start = watermark.cursor_start or 0
+    fetched = 0
+    done = False
+    try:
+      while not done and fetched < limit:
+        entries = await self.query(watermark.search_query, start=start, max_results=page_size)
+        if not entries:
+          watermark.complete()
+          return
+        for offset, entry in enumerate(entries):
+          if watermark.is_seen(entry):
+            watermark.complete()
+            return
+          if watermark.resuming and watermark.already_processed(entry):
+            watermark.cursor_start = start + offset + 1
+            continue
+          yield entry
+          watermark.observe(entry, start + offset)
+          fetched += 1
+          done = until is not None and until()
+          if done or fetched >= limit:
+            break
+        start = watermark.cursor_start or start + len(entries)
+        if checkpoint is not None:
+          checkpoint(watermark)
+      if watermark.last_updated_at is not None:
+        logger.warning(
+          "arxiv.incremental.quota_reached",
+          search_query=watermark.search_query,
+          fetched=fetched,
+          skipped_from=start,
+        )
+      # A first run takes the newest entries as the baseline, not a full backfill; a run that
+      # hit its quota leaves the older remainder behind the same way.
+      watermark.complete()
+    finally:
+      if checkpoint is not None:
+        checkpoint(watermark)
+
 
 def build_search_query(filters: dict[str, Iterable[str]]) -> str:
   parts: list[str] = []
@@ -109,50 +196,90 @@ def _quote_keyword(keyword: str) -> str:
   return keyword.replace(" ", "+")
 
 
-def parse_feed(xml_text: str) -> Iterable[ArxivPaper]:
-  ns = {
-    "atom": "http://www.w3.org/2005/Atom",
-    "arxiv": "http://arxiv.org/schemas/atom",
-  }
-  root = ET.fromstring(xml_text)
-  for entry in root.findall("atom:entry", ns):
-    arxiv_id = entry.findtext("atom:id", default="", namespaces=ns)
-    title = entry.findtext("atom:title", default="", namespaces=ns).strip()
-    summary = entry.findtext("atom:summary", default="", namespaces=ns).strip()
-    published = parse_datetime(entry.findtext("atom:published", namespaces=ns))
-    updated = parse_datetime(entry.findtext("atom:updated", namespaces=ns))
-    primary_category = entry.find("arxiv:primary_category", ns)
-    categories = [elem.get("term") for elem in entry.findall("atom:category", ns) if elem.get("term")]
-    authors = [elem.findtext("atom:name", default="", namespaces=ns).strip() for elem in entry.findall("atom:author", ns)]
-
-    pdf_url = None
-    html_url = None
-    for link in entry.findall("atom:link", ns):
-      rel = link.get("rel")
-      href = link.get("href")
-      mime = link.get("type")
-      if rel == "alternate" and href:
-        html_url = href
-      if mime == "application/pdf" and href:
-        pdf_url = href
-
-    yield ArxivPaper(
-      source_id=arxiv_id.split("/")[-1],
-      title=title,
-      summary=summary,
-      published_at=published,
-      updated_at=updated,
-      authors=[author for author in authors if author],
-      pdf_url=pdf_url,
-      html_url=html_url,
-      primary_category=primary_category.get("term") if primary_category is not None else None,
-      categories=[cat for cat in categories if cat],
-      raw={
-        "id": arxiv_id,
-        "title": title,
-        "summary": summary,
-      },
-    )
+def parse_feed(xml_text: str | bytes) -> Iterable[ArxivPaper]:
+  data = xml_text.encode("utf-8") if isinstance(xml_text, str) else xml_text
+  return iter_feed([data])
+
+
+def iter_feed(chunks: Iterable[bytes]) -> Iterator[ArxivPaper]:
+  """Incrementally parse an Atom feed, discarding each entry once it has been converted."""
+  parser = FeedParser()
+  for chunk in chunks:
+    yield from parser.feed(chunk)
+  yield from parser.close()
+
+
+async def aiter_feed(chunks: AsyncIterable[bytes]) -> AsyncIterator[ArxivPaper]:
+  parser = FeedParser()
+  async for chunk in chunks:
+    for entry in parser.feed(chunk):
+      yield entry
+  for entry in parser.close():
+    yield entry
+
+
+class FeedParser:
+  """Push parser over `ET.XMLPullParser` that emits an `ArxivPaper` per completed entry."""
+
+  def __init__(self) -> None:
+    self._parser = ET.XMLPullParser(events=("end",))
+
+  def feed(self, chunk: bytes) -> Iterator[ArxivPaper]:
+    self._parser.feed(chunk)
+    return self._drain()
+
+  def close(self) -> Iterator[ArxivPaper]:
+    self._parser.close()
+    return self._drain()
+
+  def _drain(self) -> Iterator[ArxivPaper]:
+    for _, elem in self._parser.read_events():
+      if elem.tag != _ENTRY_TAG:
+        continue
+      yield _entry_to_paper(elem)
+      # Only an empty shell stays attached to the feed root once the entry is cleared.
+      elem.clear()
+
+
+def _entry_to_paper(entry: ET.Element) -> ArxivPaper:
+  ns = FEED_NS
+  arxiv_id = entry.findtext("atom:id", default="", namespaces=ns)
+  categories = [elem.get("term") for elem in entry.findall("atom:category", ns) if elem.get("term")]
+  authors = [elem.findtext("atom:name", default="", namespaces=ns).strip() for elem in entry.findall("atom:author", ns)]
+  primary_category = entry.find("arxiv:primary_category", ns)
+
+  pdf_url = None
+  html_url = None
+  for link in entry.findall("atom:link", ns):
+    rel = link.get("rel")
+    href = link.get("href")
+    mime = link.get("type")
+    if rel == "alternate" and href:
+      html_url = href
+    if mime == "application/pdf" and href:
+      pdf_url = href
+
+  return ArxivPaper(
+    source_id=arxiv_id.split("/")[-1],
+    title=entry.findtext("atom:title", default="", namespaces=ns).strip(),
+    summary=entry.findtext("atom:summary", default="", namespaces=ns).strip(),
+    published_at=parse_datetime(entry.findtext("atom:published", namespaces=ns)),
+    updated_at=parse_datetime(entry.findtext("atom:updated", namespaces=ns)),
+    authors=[author for author in authors if author],
+    pdf_url=pdf_url,
+    html_url=html_url,
+    primary_category=primary_category.get("term") if primary_category is not None else None,
+    categories=[cat for cat in categories if cat],
+    entry_id=arxiv_id,
+  )
+
+
+def split_version(arxiv_id: str) -> tuple[str, int | None]:
+  """Split `2401.12345v2` into `("2401.12345", 2)`; an id without a version keeps `None`."""
+  match = _VERSION_SUFFIX.search(arxiv_id)
+  if match is None:
+    return arxiv_id, None
+  return arxiv_id[: match.start()], int(match.group(1))
 
 
 def parse_datetime(value: str | None) -> datetime | None:
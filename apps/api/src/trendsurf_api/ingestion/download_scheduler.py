@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+from urllib.parse import urlsplit
+
+import structlog
+
+from ..core.settings import get_settings
+from .pdf_fetcher import PdfDocument, PdfDownloadError, PdfTooLargeError, fetch_pdf
+
+logger = structlog.get_logger()
+
+# Called as `fetcher(url, on_body_size=hook)`; see `fetch_pdf`.
+Fetcher = Callable[..., Awaitable[PdfDocument]]
+
+
+@dataclass(slots=True)
+class DownloadResult:
+  url: str
+  document: PdfDocument | None
+  error: str | None
+  attempts: int
+  elapsed: float
+
+  @property
+  def ok(self) -> bool:
+    return self.document is not None
+
+  @property
+  def bytes(self) -> int:
+    return self.document.size if self.document is not None else 0
+
+  @property
+  def throughput_bps(self) -> float:
+    return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ByteBudget:
+  """Counting semaphore over bytes so concurrent downloads share a global in-flight cap."""
+
+  def __init__(self, capacity: int) -> None:
+    self.capacity = capacity
+    self.in_flight = 0
+    self._condition = asyncio.Condition()
+
+  async def acquire(self, amount: int) -> int:
+    amount = min(amount, self.capacity)
+    async with self._condition:
+      await self._condition.wait_for(lambda: self.in_flight + amount <= self.capacity)
+      self.in_flight += amount
+    return amount
+
+  async def release(self, amount: int) -> None:
+    async with self._condition:
+      self.in_flight -= amount
+      self._condition.notify_all()
+
+
+class _HostGate:
+  def __init__(self, limit: int, delay: float) -> None:
+    self.semaphore = asyncio.Semaphore(limit)
+    self.delay = delay
+    self._lock = asyncio.Lock()
+    self._last_start = 0.0
+
+  async def wait_turn(self) -> None:
+    async with self._lock:
+      loop = asyncio.get_running_loop()
+      wait = self.delay - (loop.time() - self._last_start)
+      if wait > 0:
+        await asyncio.sleep(wait)
+      self._last_start = loop.time()
+
+
+class DownloadScheduler:
+  """Download batches of PDFs with per-host concurrency, politeness and a byte budget.
+
+  A download reserves `expected_bytes` (about a typical arXiv PDF) of the global budget
+  before its request is sent. Once the response headers arrive, the reservation is swapped
+  for the body's Content-Length, or for `pdf_max_mb` when the server does not send one, and
+  the body is only read after that much budget is free. The budget therefore bounds the
+  bytes being streamed across hosts, while per-host gates keep any single origin (arxiv.org
+  in practice) from being flooded.
+  """
+
+  def __init__(
+    self,
+    *,
+    per_host_limit: int | None = None,
+    host_delay_ms: int | None = None,
+    max_inflight_mb: int | None = None,
+    expected_mb: float = 4.0,
+    retries: int | None = None,
+    backoff_base: float = 1.0,
+    backoff_max: float = 30.0,
+    fetcher: Fetcher | None = None,
+  ) -> None:
+    settings = get_settings()
+    self.per_host_limit = per_host_limit or settings.pdf_download_per_host
+    self.host_delay = (host_delay_ms if host_delay_ms is not None else settings.pdf_download_delay_ms) / 1000
+    self.budget = ByteBudget(int((max_inflight_mb or settings.pdf_download_max_inflight_mb) * 1024 * 1024))
+    self.expected_bytes = int(expected_mb * 1024 * 1024)
+    self.retries = retries or settings.pdf_download_retries
+    self.backoff_base = backoff_base
+    self.backoff_max = backoff_max
+    self.fetcher = fetcher or (lambda url, **kwargs: fetch_pdf(url, retries=1, **kwargs))
+    self._hosts: dict[str, _HostGate] = {}
+
+  async def download_all(self, urls: Iterable[str]) -> list[DownloadResult]:
+    return [result async for result in self.iter_downloads(urls)]
+
+  async def iter_downloads(self, urls: Iterable[str]) -> AsyncIterator[DownloadResult]:
+    """Yield results in completion order, logging aggregate throughput at the end."""
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(self.download(url)) for url in dict.fromkeys(urls)]
+    delivered: set[str] = set()
+    total_bytes = 0
+    failed = 0
+    try:
+      for next_done in asyncio.as_completed(tasks):
+        result = await next_done
+        total_bytes += result.bytes
+        failed += 0 if result.ok else 1
+        delivered.add(result.url)
+        yield result
+    finally:
+      for task in tasks:
+        task.cancel()
+      # A consumer that stops early never sees the downloads that finished meanwhile, so
+      # their spool files are discarded here.
+      for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(outcome, DownloadResult) and outcome.url not in delivered and outcome.ok:
+          outcome.document.discard()
+    elapsed = time.perf_counter() - started
+    logger.info(
+      "pdf_download.batch",
+      downloads=len(tasks),
+      failed=failed,
+      bytes=total_bytes,
+      elapsed_s=round(elapsed, 3),
+      throughput_mbps=round(total_bytes * 8 / 1_000_000 / elapsed, 2) if elapsed > 0 else 0.0,
+    )
+
+  async def download(self, url: str) -> DownloadResult:
+    gate = self._gate(url)
+    started = time.perf_counter()
+    error: str | None = None
+    attempt = 0
+    for attempt in range(1, self.retries + 1):
+      try:
+        async with gate.semaphore:
+          # Reserve bytes only once this host lets us start: downloads queued behind a busy
+          # host would otherwise hold budget that downloads from idle hosts could use.
+          reserved = await self.budget.acquire(self.expected_bytes)
+
+          async def on_body_size(size: int) -> None:
+            nonlocal reserved
+            await self.budget.release(reserved)
+            reserved = 0
+            reserved = await self.budget.acquire(size)
+
+          try:
+            await gate.wait_turn()
+            document = await self.fetcher(url, on_body_size=on_body_size)
+          finally:
+            await self.budget.release(reserved)
+      except PdfTooLargeError as exc:
+        error = str(exc)
+        break
+      except PdfDownloadError as exc:
+        error = str(exc)
+      else:
+        result = DownloadResult(
+          url=url, document=document, error=None, attempts=attempt, elapsed=time.perf_counter() - started
+        )
+        logger.info(
+          "pdf_download.done",
+          url=url,
+          attempts=attempt,
+          bytes=result.bytes,
+          throughput_kbps=round(result.throughput_bps / 1024, 1),
+        )
+        return result
+      if attempt < self.retries:
+        await asyncio.sleep(self._backoff(attempt))
+
+    logger.warning("pdf_download.failed", url=url, attempts=attempt, error=error)
+    return DownloadResult(
+      url=url, document=None, error=error, attempts=attempt, elapsed=time.perf_counter() - started
+    )
+
+  def _backoff(self, attempt: int) -> float:
+    # "Full jitter": spreads retries from many workers instead of synchronising them.
+    return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))  # noqa: S311
+
+  def _gate(self, url: str) -> _HostGate:
+    host = urlsplit(url).netloc.lower()
+    gate = self._hosts.get(host)
+    if gate is None:
+      gate = _HostGate(self.per_host_limit, self.host_delay)
+      self._hosts[host] = gate
+    return gate
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Shorter keyword words are usually acronyms ("ai", "rl", "gan") and must match a whole token,
+# so "rl" does not hit "world"; longer words may prefix a token, so "network" finds "networks".
+MIN_PREFIX_WORD_LEN = 4
+_PREFIX_CACHE_LIMIT = 200_000
+
+
+def normalize_keyword(keyword: str) -> str:
+  return " ".join(keyword.lower().split())
+
+
+def keyword_in(keyword: str, text: str) -> bool:
+  """Whether `keyword` occurs in lowercased `text`, by the same rule as `KeywordSet`.
+
+  arXiv's `all:` search on an unquoted phrase requires every word, not the exact phrase, so
+  each word only has to occur somewhere in the text.
+  """
+  tokens = set(_TOKEN.findall(text))
+  return all(
+    any(_word_matches(word, token) for token in tokens) for word in _TOKEN.findall(keyword)
+  )
+
+
+class KeywordSet:
+  """Find which of many keywords occur in a text.
+
+  A keyword occurs when every one of its words prefixes some token of the text, so "graph
+  network" matches "graph networks"; words shorter than `MIN_PREFIX_WORD_LEN` must equal a
+  whole token, so "ai" does not match "aims". Prefix lookups are cached per distinct token,
+  which keeps thousands of keywords to one pass over the text.
+  """
+
+  def __init__(self, keywords: Iterable[str]) -> None:
+    self.keywords = sorted({normalize_keyword(kw) for kw in keywords if kw.strip()})
+    self._sizes: list[int] = []
+    self._word_keywords: dict[str, list[int]] = {}
+    for i, keyword in enumerate(self.keywords):
+      words = set(_TOKEN.findall(keyword))
+      self._sizes.append(len(words))
+      for word in words:
+        self._word_keywords.setdefault(word, []).append(i)
+    self._word_lengths = sorted({len(word) for word in self._word_keywords})
+    self._prefixes: dict[str, list[str]] = {}
+
+  def __len__(self) -> int:
+    return len(self.keywords)
+
+  def match(self, text: str) -> list[int]:
+    """Return indexes into `keywords` of the keywords found in lowercased `text`."""
+    if len(self._prefixes) > _PREFIX_CACHE_LIMIT:
+      self._prefixes.clear()
+    words: set[str] = set()
+    for token in set(_TOKEN.findall(text)):
+      hits = self._prefixes.get(token)
+      if hits is None:
+        hits = self._prefixes[token] = [
+          token[:size]
+          for size in self._word_lengths
+          if size <= len(token)
+          and token[:size] in self._word_keywords
+          and _word_matches(token[:size], token)
+        ]
+      words.update(hits)
+    found: dict[int, int] = {}
+    for word in words:
+      for keyword in self._word_keywords[word]:
+        found[keyword] = found.get(keyword, 0) + 1
+    return [keyword for keyword, count in found.items() if count == self._sizes[keyword]]
+
+  def found(self, text: str) -> set[str]:
+    """The keywords found in lowercased `text`."""
+    return {self.keywords[i] for i in self.match(text)}
+
+
+def _word_matches(word: str, token: str) -> bool:
+  if len(word) < MIN_PREFIX_WORD_LEN:
+    return token == word
+  return token.startswith(word)
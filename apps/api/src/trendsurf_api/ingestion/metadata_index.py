@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import structlog
+from sqlalchemy import and_, func, select
+
+from ..core.database import session_scope
+from ..core.settings import get_settings
+from ..models.tables import Paper
+from .keywords import KeywordSet, normalize_keyword
+
+logger = structlog.get_logger()
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Postings are split into blocks covering 2**16 consecutive paper ids, so deltas always fit
+# in two bytes and appending new papers rewrites only the newest block of each term.
+_BLOCK_BITS = 16
+# Each batch rewrites every block it touches once, so larger batches amortise dense terms.
+_UPDATE_BATCH = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+  term TEXT NOT NULL,
+  block INTEGER NOT NULL,
+  first_id INTEGER NOT NULL,
+  count INTEGER NOT NULL,
+  width INTEGER NOT NULL,
+  deltas BLOB NOT NULL,
+  PRIMARY KEY (term, block)
+);
+CREATE TABLE IF NOT EXISTS documents (
+  paper_id INTEGER PRIMARY KEY,
+  terms TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keywords (
+  keyword TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS pending_keywords (
+  keyword TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+"""
+
+
+@dataclass(slots=True)
+class IndexedPaper:
+  paper_id: int
+  categories: frozenset[str]
+  text: str
+
+  @classmethod
+  def from_row(cls, paper_id: int, row: Mapping[str, Any]) -> IndexedPaper:
+    """Build from a `paper_row` dict or the equivalent `Paper` columns."""
+    categories = set((row.get("meta_json") or {}).get("categories") or [])
+    if row.get("primary_category"):
+      categories.add(row["primary_category"])
+    text = " ".join([row["title"], row.get("abstract") or "", *(row.get("authors") or [])]).lower()
+    return cls(paper_id, frozenset(categories), text)
+
+
+class MetadataIndex:
+  """Inverted index from categories and topic keywords to sorted, compressed paper-id arrays.
+
+  Used to cut the candidate set before any vector scoring. Postings are delta-encoded per
+  block of ids (one byte per id when the term is dense, two otherwise) in a local SQLite
+  database, and `update` applies only the term differences of each upserted paper. Keyword
+  postings exist only for tracked keywords; `track_keywords` backfills new ones from the
+  database and `candidates` treats an untracked keyword as unrestricted rather than empty.
+  """
+
+  def __init__(self, root: str | Path) -> None:
+    self.root = Path(root)
+    self.root.mkdir(parents=True, exist_ok=True)
+    self._db = sqlite3.connect(self.root / "metadata.sqlite3", check_same_thread=False)
+    self._db.execute("PRAGMA journal_mode = WAL")
+    self._db.executescript(_SCHEMA)
+    self._lock = threading.Lock()
+    self._keyword_set: KeywordSet | None = None
+    self._tracked: frozenset[str] = frozenset()
+    self._keyword_version: str | None = None
+
+  def keywords(self) -> KeywordSet:
+    """Keywords indexed on update: tracked ones plus any whose backfill is still running.
+
+    Rebuilt whenever any process has called `track_keywords` since.
+    """
+    row = self._db.execute("SELECT value FROM meta WHERE key = 'keywords_version'").fetchone()
+    version = row[0] if row else "0"
+    if self._keyword_set is None or version != self._keyword_version:
+      self._tracked = frozenset(row[0] for row in self._db.execute("SELECT keyword FROM keywords"))
+      pending = {row[0] for row in self._db.execute("SELECT keyword FROM pending_keywords")}
+      self._keyword_set = KeywordSet(self._tracked | pending)
+      self._keyword_version = version
+    return self._keyword_set
+
+  def tracked_keywords(self) -> frozenset[str]:
+    """Keywords whose postings are complete, i.e. safe to restrict candidates by."""
+    self.keywords()
+    return self._tracked
+
+  def update(self, papers: Iterable[IndexedPaper]) -> int:
+    """Index new papers or re-index changed ones; returns the number of papers whose terms moved."""
+    keyword_set = self.keywords()
+    changed = 0
+    with self._lock, self._db:
+      iterator = iter(papers)
+      while batch := list(islice(iterator, _UPDATE_BATCH)):
+        previous = self._document_terms([paper.paper_id for paper in batch])
+        adds: dict[str, list[int]] = {}
+        removes: dict[str, list[int]] = {}
+        documents = []
+        for paper in batch:
+          terms = {_category_term(cat) for cat in paper.categories}
+          terms.update(_keyword_term(keyword_set.keywords[i]) for i in keyword_set.match(paper.text))
+          old = previous.get(paper.paper_id, set())
+          if terms == old and paper.paper_id in previous:
+            continue
+          changed += 1
+          for term in terms - old:
+            adds.setdefault(term, []).append(paper.paper_id)
+          for term in old - terms:
+            removes.setdefault(term, []).append(paper.paper_id)
+          documents.append((paper.paper_id, "\n".join(sorted(terms))))
+        for term in adds.keys() | removes.keys():
+          self._apply(term, adds.get(term, ()), removes.get(term, ()))
+        self._db.executemany(
+          "INSERT INTO documents (paper_id, terms) VALUES (?, ?) "
+          "ON CONFLICT (paper_id) DO UPDATE SET terms = excluded.terms",
+          documents,
+        )
+    return changed
+
+  def remove(self, paper_ids: Iterable[int]) -> None:
+    ids = list(paper_ids)
+    with self._lock, self._db:
+      removes: dict[str, list[int]] = {}
+      for paper_id, terms in self._document_terms(ids).items():
+        for term in terms:
+          removes.setdefault(term, []).append(paper_id)
+      for term, term_ids in removes.items():
+        self._apply(term, (), term_ids)
+      self._db.executemany("DELETE FROM documents WHERE paper_id = ?", [(i,) for i in ids])
+
+  def track_keywords(self, keywords: Iterable[str]) -> list[str]:
+    """Start indexing keywords not yet tracked, backfilling their postings from `papers`.
+
+    A keyword is registered as pending before the backfill reads the database, so papers
+    upserted meanwhile are indexed with it by `update`; only once its backfill is applied
+    does `candidates` restrict by it.
+    """
+    tracked = self.tracked_keywords()
+    new = sorted({normalize_keyword(kw) for kw in keywords if kw.strip()} - tracked)
+    for keyword in new:
+      started = time.perf_counter()
+      term = _keyword_term(keyword)
+      with self._lock, self._db:
+        self._db.execute("INSERT OR IGNORE INTO pending_keywords (keyword) VALUES (?)", (keyword,))
+        self._bump_keywords_version()
+      ids = _backfill_keyword(keyword)
+      with self._lock, self._db:
+        self._apply(term, ids, ())
+        # Keep `documents` in step so a later re-index can remove the keyword again; papers
+        # re-indexed during the backfill already carry it.
+        self._db.executemany(
+          "UPDATE documents SET terms = terms || char(10) || ? WHERE paper_id = ?",
+          [
+            (term, paper_id)
+            for paper_id, terms in self._document_terms(ids).items()
+            if term not in terms
+          ],
+        )
+        self._db.execute("INSERT OR IGNORE INTO keywords (keyword) VALUES (?)", (keyword,))
+        self._db.execute("DELETE FROM pending_keywords WHERE keyword = ?", (keyword,))
+        self._bump_keywords_version()
+      logger.info(
+        "metadata_index.keyword_backfill",
+        keyword=keyword,
+        papers=len(ids),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+      )
+    return new
+
+  def sync_from_database(self, *, batch_size: int = 1000) -> int:
+    """Index every paper past the last synced id, e.g. after enabling the index.
+
+    Papers already indexed on upsert are skipped cheaply since their terms do not change.
+    """
+    row = self._db.execute("SELECT value FROM meta WHERE key = 'synced_id'").fetchone()
+    last_id = int(row[0]) if row else 0
+    columns = (Paper.id, Paper.title, Paper.abstract, Paper.authors, Paper.primary_category, Paper.meta_json)
+    indexed = 0
+    while True:
+      with session_scope() as session:
+        rows = session.execute(
+          select(*columns).where(Paper.id > last_id).order_by(Paper.id).limit(batch_size)
+        ).mappings().all()
+      if not rows:
+        return indexed
+      indexed += self.update(IndexedPaper.from_row(row["id"], row) for row in rows)
+      last_id = rows[-1]["id"]
+      with self._db:
+        self._db.execute(
+          "INSERT INTO meta (key, value) VALUES ('synced_id', ?) "
+          "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+          (str(last_id),),
+        )
+
+  def postings(self, term: str) -> np.ndarray:
+    rows = self._db.execute(
+      "SELECT first_id, width, deltas FROM postings WHERE term = ? ORDER BY block", (term,)
+    ).fetchall()
+    if not rows:
+      return np.empty(0, dtype=np.int64)
+    return np.concatenate([_decode(*row) for row in rows])
+
+  def category(self, category: str) -> np.ndarray:
+    return self.postings(_category_term(category))
+
+  def keyword(self, keyword: str) -> np.ndarray:
+    return self.postings(_keyword_term(normalize_keyword(keyword)))
+
+  def candidates(
+    self, *, categories: Iterable[str] = (), keywords: Iterable[str] = ()
+  ) -> np.ndarray | None:
+    """Sorted ids of papers in any of `categories` and matching any of `keywords`.
+
+    Mirrors the topic filters: each group is a union and the groups intersect. Returns None
+    when nothing restricts the set, so callers fall back to an unfiltered search.
+    """
+    groups: list[np.ndarray] = []
+    categories = [cat.strip() for cat in categories if cat.strip()]
+    if categories:
+      groups.append(_union([self.category(cat) for cat in categories]))
+    keywords = [normalize_keyword(kw) for kw in keywords if kw.strip()]
+    tracked = self.tracked_keywords()
+    if keywords and all(keyword in tracked for keyword in keywords):
+      groups.append(_union([self.keyword(keyword) for keyword in keywords]))
+    elif keywords:
+      logger.warning("metadata_index.untracked_keywords", keywords=sorted(set(keywords) - tracked))
+    if not groups:
+      return None
+    return reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), groups)
+
+  def stats(self) -> dict[str, int]:
+    terms, ids, size = self._db.execute(
+      "SELECT COUNT(DISTINCT term), COALESCE(SUM(count), 0), COALESCE(SUM(LENGTH(deltas)), 0) "
+      "FROM postings"
+    ).fetchone()
+    return {"terms": terms, "postings": ids, "bytes": size}
+
+  def close(self) -> None:
+    self._db.close()
+
+  def _bump_keywords_version(self) -> None:
+    self._db.execute(
+      "INSERT INTO meta (key, value) VALUES ('keywords_version', '1') "
+      "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
+
+  def _document_terms(self, paper_ids: list[int]) -> dict[int, set[str]]:
+    if not paper_ids:
+      return {}
+    placeholders = ",".join("?" * len(paper_ids))
+    return {
+      paper_id: set(terms.split("\n")) if terms else set()
+      for paper_id, terms in self._db.execute(
+        # Only `?` placeholders are interpolated; the ids themselves are bound parameters.
+        f"SELECT paper_id, terms FROM documents WHERE paper_id IN ({placeholders})",  # noqa: S608
+        paper_ids,
+      )
+    }
+
+  def _apply(self, term: str, add: Iterable[int], remove: Iterable[int]) -> None:
+    add_ids = np.unique(np.fromiter(add, dtype=np.int64))
+    remove_ids = np.unique(np.fromiter(remove, dtype=np.int64))
+    touched = np.union1d(add_ids >> _BLOCK_BITS, remove_ids >> _BLOCK_BITS)
+    for block in touched.tolist():
+      row = self._db.execute(
+        "SELECT first_id, width, deltas FROM postings WHERE term = ? AND block = ?", (term, block)
+      ).fetchone()
+      ids = _decode(*row) if row else np.empty(0, dtype=np.int64)
+      ids = _union([ids, add_ids[(add_ids >> _BLOCK_BITS) == block]])
+      ids = np.setdiff1d(ids, remove_ids, assume_unique=True)
+      if ids.size == 0:
+        self._db.execute("DELETE FROM postings WHERE term = ? AND block = ?", (term, block))
+        continue
+      width, deltas = _encode(ids)
+      self._db.execute(
+        "INSERT INTO postings (term, block, first_id, count, width, deltas) "
+        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (term, block) DO UPDATE SET "
+        "first_id = excluded.first_id, count = excluded.count, width = excluded.width, "
+        "deltas = excluded.deltas",
+        (term, block, int(ids[0]), int(ids.size), width, deltas),
+      )
+
+
+@lru_cache
+def get_metadata_index() -> MetadataIndex | None:
+  settings = get_settings()
+  if not settings.metadata_index_dir:
+    return None
+  return MetadataIndex(settings.metadata_index_dir)
+
+
+def _category_term(category: str) -> str:
+  return f"c:{category}"
+
+
+def _keyword_term(keyword: str) -> str:
+  return f"k:{keyword}"
+
+
+def _encode(ids: np.ndarray) -> tuple[int, bytes]:
+  deltas = np.diff(ids)
+  width = 1 if deltas.size == 0 or int(deltas.max()) < 256 else 2
+  return width, deltas.astype(np.uint8 if width == 1 else np.uint16).tobytes()
+
+
+def _decode(first_id: int, width: int, deltas: bytes) -> np.ndarray:
+  values = np.frombuffer(deltas, dtype=np.uint8 if width == 1 else np.uint16)
+  ids = np.empty(values.size + 1, dtype=np.int64)
+  ids[0] = first_id
+  np.cumsum(values, dtype=np.int64, out=ids[1:])
+  ids[1:] += first_id
+  return ids
+
+
+def _union(arrays: list[np.ndarray]) -> np.ndarray:
+  if len(arrays) == 1:
+    return arrays[0]
+  # Sorting and dropping neighbours beats `np.unique`, which hashes before it sorts.
+  merged = np.sort(np.concatenate(arrays), kind="stable")
+  if merged.size == 0:
+    return merged
+  keep = np.empty(merged.size, dtype=bool)
+  keep[0] = True
+  np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+  return merged[keep]
+
+
+def _backfill_keyword(keyword: str) -> list[int]:
+  """Ids of papers matching `keyword` by the same rule `update` applies through `KeywordSet`.
+
+  SQL substring filters narrow the scan to rows containing every word; each row's text is
+  then re-checked, so "gan" does not pick up every paper mentioning "organ".
+  """
+  words = _TOKEN.findall(keyword)
+  if not words:
+    return []
+  text = func.lower(
+    func.concat_ws(" ", Paper.title, Paper.abstract, func.array_to_string(Paper.authors, " "))
+  )
+  keyword_set = KeywordSet([keyword])
+  columns = (Paper.id, Paper.title, Paper.abstract, Paper.authors)
+  with session_scope() as session:
+    rows = session.execute(
+      select(*columns)
+      .where(and_(*(text.contains(word, autoescape=True) for word in words)))
+      .order_by(Paper.id)
+      .execution_options(yield_per=_UPDATE_BATCH)
+    ).mappings()
+    return [
+      row["id"] for row in rows if keyword_set.match(IndexedPaper.from_row(row["id"], row).text)
+    ]
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+import structlog
+from sqlalchemy import and_, event, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import session_scope
+from ..models.tables import Paper
+from .arxiv_client import ArxivPaper, split_version
+from .metadata_index import IndexedPaper, MetadataIndex, get_metadata_index
+
+logger = structlog.get_logger()
+
+SOURCE_ARXIV = "arxiv"
+DEFAULT_BATCH_SIZE = 1000
+_AUTHOR_MAX_LEN = 128
+
+
+@dataclass(slots=True)
+class UpsertReport:
+  """Outcome of a bulk upsert; `new`/`changed` map source ids to `papers.id`."""
+
+  new: dict[str, int] = field(default_factory=dict)
+  changed: dict[str, int] = field(default_factory=dict)
+  unchanged: set[str] = field(default_factory=set)
+  elapsed: float = 0.0
+
+  @property
+  def total(self) -> int:
+    return len(self.new) + len(self.changed) + len(self.unchanged)
+
+  @property
+  def rows_per_sec(self) -> float:
+    return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+  @property
+  def needs_processing(self) -> dict[str, int]:
+    return {**self.new, **self.changed}
+
+
+def content_hash(paper: ArxivPaper) -> str:
+  """Hash the fields whose change should trigger re-parsing and re-embedding."""
+  payload = json.dumps(
+    [paper.title, paper.summary, paper.authors, sorted(paper.categories)],
+    ensure_ascii=False,
+    separators=(",", ":"),
+  )
+  return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def paper_row(paper: ArxivPaper, *, source: str = SOURCE_ARXIV) -> dict[str, Any]:
+  # Every arXiv version is the same paper: rows are keyed on the base id and keep the version
+  # separately, so a revision updates its paper instead of inserting a duplicate.
+  source_id, version = split_version(paper.source_id)
+  return {
+    "source": source,
+    "source_id": source_id,
+    "source_version": version,
+    "title": paper.title,
+    "authors": [author[:_AUTHOR_MAX_LEN] for author in paper.authors],
+    "abstract": paper.summary,
+    "published_at": paper.published_at,
+    "updated_at_source": paper.updated_at,
+    "url_pdf": paper.pdf_url,
+    "url_page": paper.html_url,
+    "primary_category": paper.primary_category,
+    "meta_json": {"categories": paper.categories, "entry_id": paper.entry_id},
+    "content_hash": content_hash(paper),
+  }
+
+
+def upsert_papers(
+  papers: Iterable[ArxivPaper],
+  *,
+  session: Session | None = None,
+  batch_size: int = DEFAULT_BATCH_SIZE,
+  source: str = SOURCE_ARXIV,
+  index: MetadataIndex | None | bool = True,
+) -> UpsertReport:
+  """Insert or update papers in batches, touching rows only when their content changed.
+
+  Each batch is a single `INSERT ... ON CONFLICT (source, source_id) DO UPDATE ... WHERE
+  content_hash IS DISTINCT FROM excluded.content_hash RETURNING`, so unchanged rows cost no
+  write and are reported as such. New and changed rows are fed to the metadata index once
+  the transaction commits: the index drops a paper's old terms on update, so indexing rows
+  that then roll back would lose the paper from its real postings.
+  """
+  report = UpsertReport()
+  started = time.perf_counter()
+  index = get_metadata_index() if index is True else (index or None)
+  indexed: list[IndexedPaper] | None = [] if index is not None else None
+  if session is None:
+    with session_scope() as scoped:
+      _upsert_batches(scoped, papers, batch_size, source, report, indexed=indexed)
+    if indexed:
+      index.update(indexed)
+  else:
+    _upsert_batches(session, papers, batch_size, source, report, indexed=indexed)
+    if indexed:
+      _index_on_commit(session, index, indexed)
+  report.elapsed = time.perf_counter() - started
+  logger.info(
+    "papers.upsert",
+    new=len(report.new),
+    changed=len(report.changed),
+    unchanged=len(report.unchanged),
+    rows_per_sec=round(report.rows_per_sec, 1),
+  )
+  return report
+
+
+def stage_batches(
+  papers: Iterable[ArxivPaper], batch_size: int, *, source: str = SOURCE_ARXIV
+) -> Iterator[list[dict[str, Any]]]:
+  """Group rows into batches with one row per paper: the highest version, and of equal
+  versions the last occurrence.
+
+  Postgres refuses to update the same row twice within one `ON CONFLICT` statement.
+  """
+  iterator = iter(papers)
+  while batch := list(islice(iterator, batch_size)):
+    rows: dict[str, dict[str, Any]] = {}
+    for paper in batch:
+      row = paper_row(paper, source=source)
+      previous = rows.get(row["source_id"])
+      if previous is None or (row["source_version"] or 0) >= (previous["source_version"] or 0):
+        rows[row["source_id"]] = row
+    yield list(rows.values())
+
+
+def _upsert_batches(
+  session: Session,
+  papers: Iterable[ArxivPaper],
+  batch_size: int,
+  source: str,
+  report: UpsertReport,
+  *,
+  indexed: list[IndexedPaper] | None = None,
+) -> None:
+  for rows in stage_batches(papers, batch_size, source=source):
+    stmt = insert(Paper).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+      constraint="uq_papers_source_source_id",
+      set_={
+        "title": excluded.title,
+        "authors": excluded.authors,
+        "abstract": excluded.abstract,
+        "published_at": excluded.published_at,
+        "updated_at_source": excluded.updated_at_source,
+        "url_pdf": excluded.url_pdf,
+        "url_page": excluded.url_page,
+        "primary_category": excluded.primary_category,
+        "meta_json": excluded.meta_json,
+        "content_hash": excluded.content_hash,
+        "source_version": excluded.source_version,
+        "updated_at": func.now(),
+      },
+      # A new version ships a new PDF, so it counts as changed even with the same abstract; a
+      # stale older version (e.g. from a backfill) never overwrites a newer one.
+      where=and_(
+        or_(
+          Paper.content_hash.is_distinct_from(excluded.content_hash),
+          Paper.source_version.is_distinct_from(excluded.source_version),
+        ),
+        func.coalesce(excluded.source_version, 0) >= func.coalesce(Paper.source_version, 0),
+      ),
+    ).returning(Paper.id, Paper.source_id, literal_column("xmax = 0").label("inserted"))
+
+    touched: dict[str, int] = {}
+    for paper_id, source_id, inserted in session.execute(stmt):
+      touched[source_id] = paper_id
+      if inserted:
+        report.new[source_id] = paper_id
+      else:
+        report.changed[source_id] = paper_id
+    report.unchanged.update(row["source_id"] for row in rows if row["source_id"] not in touched)
+    if indexed is not None:
+      indexed.extend(
+        IndexedPaper.from_row(touched[row["source_id"]], row) for row in rows if row["source_id"] in touched
+      )
+
+
+def _index_on_commit(session: Session, index: MetadataIndex, papers: list[IndexedPaper]) -> None:
+  # The caller owns the transaction: index when it commits, and forget the rows if it rolls back.
+  pending = [papers]
+
+  def on_commit(_session: Session) -> None:
+    if pending:
+      index.update(pending.pop())
+
+  def on_rollback(_session: Session) -> None:
+    pending.clear()
+
+  event.listen(session, "after_commit", on_commit, once=True)
+  event.listen(session, "after_rollback", on_rollback, once=True)
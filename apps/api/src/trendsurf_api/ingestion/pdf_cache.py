@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import structlog
+
+from ..core.settings import get_settings
+from .pdf_fetcher import PdfDocument
+
+logger = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+  checksum TEXT PRIMARY KEY,
+  size INTEGER NOT NULL,
+  last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+  url TEXT PRIMARY KEY,
+  checksum TEXT NOT NULL REFERENCES blobs(checksum) ON DELETE CASCADE,
+  content_type TEXT,
+  etag TEXT,
+  last_modified TEXT,
+  validated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_blobs_last_access ON blobs (last_access);
+CREATE INDEX IF NOT EXISTS ix_urls_checksum ON urls (checksum);
+"""
+# Spool files and leases left behind by a crashed process are swept after this long.
+_STALE_SPOOL_SECONDS = 86400.0
+
+
+@dataclass(slots=True)
+class CachedPdf:
+  document: PdfDocument
+  validated_at: float
+
+  def is_fresh(self, ttl_seconds: float, *, now: float | None = None) -> bool:
+    return ((now or time.time()) - self.validated_at) < ttl_seconds
+
+  def validators(self) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if self.document.etag:
+      headers["If-None-Match"] = self.document.etag
+    if self.document.last_modified:
+      headers["If-Modified-Since"] = self.document.last_modified
+    return headers
+
+
+class PdfCache:
+  """Content-addressed PDF store with a URL index and byte-budgeted LRU eviction.
+
+  Blobs live at `<root>/blobs/<sha[:2]>/<sha>.pdf`; several URLs (e.g. arXiv versions with
+  identical bytes) can point at the same blob. The index is a small SQLite database.
+
+  Documents handed out by `lookup` and `store` are leases: hard links under `<root>/spool`
+  that the caller owns and discards. Eviction only unlinks the blob's own name, so a
+  document a caller (in any process) is still reading keeps its bytes until it is discarded.
+  Downloads should be spooled into `spool_dir` too, so storing them is a rename rather than
+  a copy.
+  """
+
+  def __init__(self, root: str | Path, *, max_bytes: int) -> None:
+    self.root = Path(root)
+    self.max_bytes = max_bytes
+    self.spool_dir = self.root / "spool"
+    (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+    self.spool_dir.mkdir(exist_ok=True)
+    self._sweep_spool()
+    # `fetch_pdf` calls in from worker threads; the lock keeps their transactions apart.
+    self._lock = threading.RLock()
+    self._db = sqlite3.connect(self.root / "index.sqlite3", check_same_thread=False)
+    self._db.execute("PRAGMA foreign_keys = ON")
+    self._db.execute("PRAGMA journal_mode = WAL")
+    self._db.executescript(_SCHEMA)
+
+  def blob_path(self, checksum: str) -> Path:
+    return self.root / "blobs" / checksum[:2] / f"{checksum}.pdf"
+
+  def lookup(self, url: str) -> CachedPdf | None:
+    with self._lock:
+      row = self._db.execute(
+        "SELECT u.checksum, b.size, u.content_type, u.etag, u.last_modified, u.validated_at "
+        "FROM urls u JOIN blobs b ON b.checksum = u.checksum WHERE u.url = ?",
+        (url,),
+      ).fetchone()
+      if row is None:
+        return None
+      checksum, size, content_type, etag, last_modified, validated_at = row
+      try:
+        path = self._lease(checksum)
+      except FileNotFoundError:
+        self._forget_blob(checksum)
+        return None
+      self._touch(checksum)
+    document = PdfDocument(
+      path=path,
+      size=size,
+      checksum=checksum,
+      content_type=content_type,
+      etag=etag,
+      last_modified=last_modified,
+    )
+    return CachedPdf(document=document, validated_at=validated_at)
+
+  def mark_validated(self, url: str) -> None:
+    with self._lock, self._db:
+      self._db.execute("UPDATE urls SET validated_at = ? WHERE url = ?", (time.time(), url))
+
+  def store(self, url: str, document: PdfDocument) -> PdfDocument:
+    """Move a freshly spooled download into the store and return a lease on the cached copy."""
+    path = self.blob_path(document.checksum)
+    with self._lock:
+      if path.exists():
+        document.discard()
+      else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _move(document.path, path)
+      lease = self._lease(document.checksum)
+      self._record(url, document)
+      self.evict()
+    return PdfDocument(
+      path=lease,
+      size=document.size,
+      checksum=document.checksum,
+      content_type=document.content_type,
+      etag=document.etag,
+      last_modified=document.last_modified,
+    )
+
+  def total_bytes(self) -> int:
+    with self._lock:
+      (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+    return int(total)
+
+  def evict(self) -> int:
+    """Drop least recently used blobs until the store fits its byte budget."""
+    with self._lock:
+      total = self.total_bytes()
+      if total <= self.max_bytes:
+        return 0
+      evicted = 0
+      rows = self._db.execute("SELECT checksum, size FROM blobs ORDER BY last_access ASC").fetchall()
+      for checksum, size in rows:
+        if total <= self.max_bytes:
+          break
+        self._forget_blob(checksum)
+        total -= size
+        evicted += 1
+    logger.info("pdf_cache.evicted", blobs=evicted, total_bytes=total, max_bytes=self.max_bytes)
+    return evicted
+
+  def close(self) -> None:
+    self._db.close()
+
+  def _record(self, url: str, document: PdfDocument) -> None:
+    now = time.time()
+    with self._db:
+      self._db.execute(
+        "INSERT INTO blobs (checksum, size, last_access) VALUES (?, ?, ?) "
+        "ON CONFLICT (checksum) DO UPDATE SET last_access = excluded.last_access",
+        (document.checksum, document.size, now),
+      )
+      self._db.execute(
+        "INSERT INTO urls (url, checksum, content_type, etag, last_modified, validated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (url) DO UPDATE SET "
+        "checksum = excluded.checksum, content_type = excluded.content_type, "
+        "etag = excluded.etag, last_modified = excluded.last_modified, "
+        "validated_at = excluded.validated_at",
+        (url, document.checksum, document.content_type, document.etag, document.last_modified, now),
+      )
+
+  def _lease(self, checksum: str) -> Path:
+    lease = self.spool_dir / f"{checksum}-{uuid.uuid4().hex}.pdf"
+    try:
+      os.link(self.blob_path(checksum), lease)
+    except FileNotFoundError:
+      raise
+    except OSError:
+      # Filesystems without hard links get a private copy instead.
+      shutil.copyfile(self.blob_path(checksum), lease)
+    return lease
+
+  def _sweep_spool(self) -> None:
+    cutoff = time.time() - _STALE_SPOOL_SECONDS
+    for path in self.spool_dir.iterdir():
+      try:
+        if path.stat().st_mtime < cutoff:
+          path.unlink()
+      except FileNotFoundError:
+        continue
+
+  def _touch(self, checksum: str) -> None:
+    with self._db:
+      self._db.execute("UPDATE blobs SET last_access = ? WHERE checksum = ?", (time.time(), checksum))
+
+  def _forget_blob(self, checksum: str) -> None:
+    self.blob_path(checksum).unlink(missing_ok=True)
+    with self._db:
+      self._db.execute("DELETE FROM blobs WHERE checksum = ?", (checksum,))
+
+
+def _move(source: Path, target: Path) -> None:
+  try:
+    os.replace(source, target)
+  except OSError as exc:
+    if exc.errno != errno.EXDEV:
+      raise
+    # The spool is on another filesystem: copy next to the target, then rename into place so
+    # readers never see a partial blob.
+    fd, name = tempfile.mkstemp(prefix="blob-", suffix=".part", dir=target.parent)
+    os.close(fd)
+    try:
+      shutil.copyfile(source, name)
+      os.replace(name, target)
+    except BaseException:
+      Path(name).unlink(missing_ok=True)
+      raise
+    source.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=1)
+def get_pdf_cache() -> PdfCache | None:
+  settings = get_settings()
+  if not settings.pdf_cache_dir:
+    return None
+  return PdfCache(settings.pdf_cache_dir, max_bytes=settings.pdf_cache_max_mb * 1024 * 1024)
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
 from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, BinaryIO, Callable, Iterator
 
 import httpx
 
+from ..core.http import get_http_client
 from ..core.settings import get_settings
 
+if TYPE_CHECKING:
+  from .pdf_cache import PdfCache
+
+CHUNK_SIZE = 64 * 1024
+
 
 class PdfTooLargeError(RuntimeError):
   pass
@@ -16,47 +29,175 @@ class PdfDownloadError(RuntimeError):
   pass
 
 
+BodySizeHook = Callable[[int], Awaitable[None]]
+
+
 @dataclass(slots=True)
 class PdfDocument:
-  content: bytes
+  """A downloaded PDF on disk; use as a context manager to delete the spool file.
+
+  Documents served from the PDF cache are leases on the cached blob and are discarded the
+  same way.
+  """
+
+  path: Path
+  size: int
+  checksum: str
   content_type: str | None
   etag: str | None
   last_modified: str | None
 
-
-async def fetch_pdf(url: str, *, timeout: float = 60.0, retries: int = 3) -> PdfDocument:
+  @property
+  def content(self) -> bytes:
+    return self.path.read_bytes()
+
+  def open(self) -> BinaryIO:
+    return self.path.open("rb")
+
+  @contextmanager
+  def memory_map(self) -> Iterator[mmap.mmap]:
+    with self.open() as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      yield mapped
+
+  def discard(self) -> None:
+    self.path.unlink(missing_ok=True)
+
+  def __enter__(self) -> PdfDocument:
+    return self
+
+  def __exit__(self, exc_type, exc, tb) -> None:
+    self.discard()
+
+
+async def fetch_pdf(
+  url: str,
+  *,
+  timeout: float = 60.0,
+  retries: int = 3,
+  spool_dir: str | Path | None = None,
+  cache: PdfCache | None | bool = True,
+  on_body_size: BodySizeHook | None = None,
+) -> PdfDocument:
+  """Download `url`, consulting the on-disk PDF cache first when one is configured.
+
+  Cached entries younger than `pdf_cache_ttl_seconds` are returned without any network
+  traffic; older ones are revalidated with `If-None-Match`/`If-Modified-Since`. Cache reads
+  and writes are SQLite and file I/O, so they run in a worker thread off the event loop.
+  `on_body_size` is awaited once the response headers arrive, before the body is read,
+  with its Content-Length (or the `pdf_max_mb` cap when the length is unknown).
+  """
   settings = get_settings()
   max_bytes = settings.pdf_max_mb * 1024 * 1024
+  headers = {"User-Agent": settings.user_agent}
+  pdf_cache = _resolve_cache(cache)
+  spool_dir = spool_dir or settings.pdf_spool_dir or (pdf_cache.spool_dir if pdf_cache is not None else None)
+
+  cached = await asyncio.to_thread(pdf_cache.lookup, url) if pdf_cache is not None else None
+  if cached is not None:
+    if cached.is_fresh(settings.pdf_cache_ttl_seconds):
+      return cached.document
+    headers.update(cached.validators())
+
   delay = 1.0
+  try:
+    for attempt in range(retries):
+      try:
+        document = await _download(
+          url,
+          headers=headers,
+          timeout=timeout,
+          max_bytes=max_bytes,
+          spool_dir=spool_dir,
+          on_body_size=on_body_size,
+        )
+      except httpx.HTTPError as exc:
+        if attempt == retries - 1:
+          raise PdfDownloadError(f"Failed to download PDF: {exc}") from exc
+        await asyncio.sleep(delay)
+        delay *= 2
+        continue
+
+      if document is None:
+        if cached is None or pdf_cache is None:
+          raise PdfDownloadError("Received 304 Not Modified without a cached copy")
+        await asyncio.to_thread(pdf_cache.mark_validated, url)
+        document, cached = cached.document, None
+        return document
+      if pdf_cache is not None:
+        return await asyncio.to_thread(pdf_cache.store, url, document)
+      return document
+  finally:
+    # A stale copy that was not revalidated is no longer needed.
+    if cached is not None:
+      cached.document.discard()
 
-  for attempt in range(retries):
-    try:
-      async with httpx.AsyncClient(
-        timeout=timeout, headers={"User-Agent": settings.user_agent}
-      ) as client:
-        response = await client.get(url, follow_redirects=True)
-        response.raise_for_status()
-    except httpx.HTTPError as exc:
-      if attempt == retries - 1:
-        raise PdfDownloadError(f"Failed to download PDF: {exc}") from exc
-      await asyncio.sleep(delay)
-      delay *= 2
-      continue
+  raise PdfDownloadError("Failed to download PDF")
 
-    if response.headers.get("Content-Length"):
-      content_length = int(response.headers["Content-Length"])
-      if content_length > max_bytes:
-        raise PdfTooLargeError(f"PDF exceeds size limit ({content_length} bytes)")
 
-    content = response.content
-    if len(content) > max_bytes:
-      raise PdfTooLargeError("PDF exceeds size limit after download")
+def _resolve_cache(cache: PdfCache | None | bool) -> PdfCache | None:
+  if cache is True:
+    from .pdf_cache import get_pdf_cache
+
+    return get_pdf_cache()
+  if cache is False:
+    return None
+  return cache
+
+
+async def _download(
+  url: str,
+  *,
+  headers: dict[str, str],
+  timeout: float,
+  max_bytes: int,
+  spool_dir: str | Path | None,
+  on_body_size: BodySizeHook | None = None,
+) -> PdfDocument | None:
+  client = get_http_client(url)
+  async with client.stream("GET", url, headers=headers, timeout=timeout, follow_redirects=True) as response:
+    if response.status_code == httpx.codes.NOT_MODIFIED:
+      return None
+    response.raise_for_status()
+    body_size = max_bytes
+    if response.headers.get("Content-Length"):
+      body_size = int(response.headers["Content-Length"])
+      if body_size > max_bytes:
+        raise PdfTooLargeError(f"PDF exceeds size limit ({body_size} bytes)")
+    if on_body_size is not None:
+      await on_body_size(body_size)
 
+    path, size, checksum = await spool_response(response, max_bytes=max_bytes, spool_dir=spool_dir)
     return PdfDocument(
-      content=content,
+      path=path,
+      size=size,
+      checksum=checksum,
       content_type=response.headers.get("Content-Type"),
       etag=response.headers.get("ETag"),
       last_modified=response.headers.get("Last-Modified"),
     )
 
-  raise PdfDownloadError("Failed to download PDF")
+
+async def spool_response(
+  response: httpx.Response, *, max_bytes: int, spool_dir: str | Path | None = None
+) -> tuple[Path, int, str]:
+  """Write a streamed body to a temp file, hashing as it goes and aborting past `max_bytes`."""
+  if spool_dir is not None:
+    Path(spool_dir).mkdir(parents=True, exist_ok=True)
+  fd, name = tempfile.mkstemp(prefix="pdf-", suffix=".part", dir=spool_dir)
+  path = Path(name)
+  digest = hashlib.sha256()
+  size = 0
+  try:
+    with os.fdopen(fd, "wb") as spool:
+      async for chunk in response.aiter_bytes(CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+          raise PdfTooLargeError(f"PDF exceeds size limit after {size} bytes")
+        digest.update(chunk)
+        spool.write(chunk)
+    if size == 0:
+      raise PdfDownloadError("PDF response body was empty")
+  except BaseException:
+    path.unlink(missing_ok=True)
+    raise
+  return path, size, digest.hexdigest()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, AsyncIterator, Collection, Iterable, Mapping
+
+from .arxiv_client import ArxivClient, ArxivPaper, build_search_query
+from .keywords import KeywordSet, keyword_in, normalize_keyword
+
+if TYPE_CHECKING:
+  from ..models.tables import Topic
+  from .watermarks import WatermarkStore
+
+# arXiv rejects overly long GET URLs; keep the encoded search_query well under common limits.
+MAX_QUERY_CHARS = 1500
+DEFAULT_KEYWORDS = ("ai",)
+
+
+@dataclass(frozen=True, slots=True)
+class TopicSpec:
+  topic_id: int
+  categories: frozenset[str]
+  keywords: frozenset[str]
+
+  @classmethod
+  def from_filters(cls, topic_id: int, filters: Mapping[str, Iterable[str]] | None) -> TopicSpec:
+    filters = filters or {}
+    categories = frozenset(cat.strip() for cat in filters.get("categories", []) if cat.strip())
+    keywords = frozenset(normalize_keyword(kw) for kw in filters.get("keywords", []) if kw.strip())
+    if not categories and not keywords:
+      # Mirrors the `all:ai` fallback in `build_search_query`.
+      keywords = frozenset(DEFAULT_KEYWORDS)
+    return cls(topic_id=topic_id, categories=categories, keywords=keywords)
+
+  def matches(self, paper: ArxivPaper, found: Collection[str] | None = None) -> bool:
+    """Whether `paper` passes the filters; `found` may hold its keywords already matched."""
+    if self.categories and not self.categories.intersection(paper.categories):
+      return False
+    if self.keywords:
+      if found is not None:
+        return not self.keywords.isdisjoint(found)
+      haystack = searchable_text(paper)
+      return any(keyword_in(keyword, haystack) for keyword in self.keywords)
+    return True
+
+
+@dataclass(slots=True)
+class PlannedQuery:
+  search_query: str
+  topic_ids: set[int] = field(default_factory=set)
+  max_results: int = 0
+
+
+def specs_from_topics(topics: Iterable[Topic]) -> list[TopicSpec]:
+  return [TopicSpec.from_filters(topic.id, topic.filters_json) for topic in topics]
+
+
+def plan_queries(
+  specs: Iterable[TopicSpec],
+  *,
+  max_results_per_topic: int,
+  max_query_chars: int = MAX_QUERY_CHARS,
+) -> list[PlannedQuery]:
+  """Coalesce topic filters into as few arXiv queries as the URL budget allows.
+
+  Category-only topics share OR-ed category queries. Topics with categories and keywords
+  are grouped by their category set, and each group queries `(categories) AND (keywords)`
+  with the group's keywords OR-ed, so a narrow topic in a busy category still receives
+  actual matches instead of the newest entries of the whole category. Keyword-only topics
+  share OR-ed keyword queries. Each query's result budget is proportional to the number of
+  topics it serves.
+  """
+  by_category: dict[str, set[int]] = {}
+  by_category_keyword: dict[tuple[str, ...], dict[str, set[int]]] = {}
+  by_keyword: dict[str, set[int]] = {}
+  for spec in specs:
+    if spec.categories and spec.keywords:
+      group = by_category_keyword.setdefault(tuple(sorted(spec.categories)), {})
+      for keyword in spec.keywords:
+        group.setdefault(keyword, set()).add(spec.topic_id)
+    elif spec.categories:
+      for category in spec.categories:
+        by_category.setdefault(category, set()).add(spec.topic_id)
+    else:
+      for keyword in spec.keywords:
+        by_keyword.setdefault(keyword, set()).add(spec.topic_id)
+
+  planned: list[PlannedQuery] = []
+  for chunk in _chunk_terms(sorted(by_category), "categories", max_query_chars):
+    planned.append(_planned(chunk, "categories", by_category, max_results_per_topic))
+  for categories, group in sorted(by_category_keyword.items()):
+    base = {"categories": list(categories)}
+    for chunk in _chunk_terms(sorted(group), "keywords", max_query_chars, base):
+      planned.append(_planned(chunk, "keywords", group, max_results_per_topic, base))
+  for chunk in _chunk_terms(sorted(by_keyword), "keywords", max_query_chars):
+    planned.append(_planned(chunk, "keywords", by_keyword, max_results_per_topic))
+  return planned
+
+
+async def iter_planned(
+  client: ArxivClient,
+  specs: Iterable[TopicSpec],
+  *,
+  page_size: int = 100,
+  max_query_chars: int = MAX_QUERY_CHARS,
+  watermarks: WatermarkStore | None = None,
+) -> AsyncIterator[tuple[ArxivPaper, list[int]]]:
+  """Fetch each planned query once and yield papers with the topic ids they match.
+
+  Paging through a query stops as soon as every topic it serves has received
+  `max_results_per_run` matches, so a shared category query costs about as many requests
+  as its busiest topic rather than the sum over all topics. With `watermarks`, each planned
+  query pages only until it reaches entries ingested by a previous run.
+  """
+  specs = list(specs)
+  quota = client.max_results_per_run
+  counts: dict[int, int] = {spec.topic_id: 0 for spec in specs}
+  seen: set[str] = set()
+  plan = plan_queries(specs, max_results_per_topic=quota, max_query_chars=max_query_chars)
+  keyword_set = KeywordSet(keyword for spec in specs for keyword in spec.keywords)
+  for query in plan:
+
+    def quota_met(query: PlannedQuery = query) -> bool:
+      return all(counts[topic_id] >= quota for topic_id in query.topic_ids)
+
+    if watermarks is not None:
+      # The incremental iterator stops itself on the quota so it can complete the watermark;
+      # closing it from here would look like an interrupted run.
+      pages = client.iter_incremental(
+        watermarks.load(query.search_query),
+        max_results=query.max_results,
+        page_size=page_size,
+        checkpoint=watermarks.save,
+        until=quota_met,
+      )
+    else:
+      pages = client.iter_query(query.search_query, max_results=query.max_results, page_size=page_size)
+    async with aclosing(pages):
+      async for paper in pages:
+        if paper.source_id in seen:
+          continue
+        seen.add(paper.source_id)
+        found = keyword_set.found(searchable_text(paper))
+        topic_ids = [spec.topic_id for spec in specs if spec.matches(paper, found)]
+        for topic_id in topic_ids:
+          counts[topic_id] += 1
+        if topic_ids:
+          yield paper, topic_ids
+        if watermarks is None and quota_met():
+          break
+
+
+def _planned(
+  terms: list[str],
+  kind: str,
+  index: dict[str, set[int]],
+  max_results_per_topic: int,
+  base: dict[str, list[str]] | None = None,
+) -> PlannedQuery:
+  topic_ids: set[int] = set()
+  for term in terms:
+    topic_ids.update(index[term])
+  return PlannedQuery(
+    search_query=build_search_query({**(base or {}), kind: terms}),
+    topic_ids=topic_ids,
+    max_results=max_results_per_topic * len(topic_ids),
+  )
+
+
+def _chunk_terms(
+  terms: list[str], kind: str, max_query_chars: int, base: dict[str, list[str]] | None = None
+) -> Iterable[list[str]]:
+  chunk: list[str] = []
+  for term in terms:
+    candidate = [*chunk, term]
+    if chunk and len(build_search_query({**(base or {}), kind: candidate})) > max_query_chars:
+      yield chunk
+      chunk = [term]
+    else:
+      chunk = candidate
+  if chunk:
+    yield chunk
+
+
+def searchable_text(paper: ArxivPaper) -> str:
+  return " ".join([paper.title, paper.summary, *paper.authors]).lower()
+
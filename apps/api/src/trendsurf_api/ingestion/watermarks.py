@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable
+
+from sqlalchemy import select
+
+from ..core.database import session_scope
+from ..models.tables import IngestWatermark
+
+if TYPE_CHECKING:
+  from .arxiv_client import ArxivPaper
+
+
+@dataclass(slots=True)
+class Watermark:
+  """Incremental ingest state for one arXiv search query.
+
+  `last_updated_at`/`seen_ids` mark the newest entry of the last completed run. While a run
+  is in progress, `pending_*` holds the newest entry seen so far and `cursor_*` the oldest
+  one processed, so an interrupted run can resume from `cursor_start` and skip entries it
+  already handled.
+  """
+
+  search_query: str
+  last_updated_at: datetime | None = None
+  seen_ids: set[str] = field(default_factory=set)
+  pending_updated_at: datetime | None = None
+  pending_ids: set[str] = field(default_factory=set)
+  cursor_start: int | None = None
+  cursor_updated_at: datetime | None = None
+  cursor_ids: set[str] = field(default_factory=set)
+
+  @property
+  def query_key(self) -> str:
+    return query_key(self.search_query)
+
+  @property
+  def resuming(self) -> bool:
+    return self.cursor_start is not None
+
+  def is_seen(self, paper: ArxivPaper) -> bool:
+    if self.last_updated_at is None or paper.updated_at is None:
+      return False
+    if paper.updated_at < self.last_updated_at:
+      return True
+    return paper.updated_at == self.last_updated_at and paper.source_id in self.seen_ids
+
+  def already_processed(self, paper: ArxivPaper) -> bool:
+    if self.cursor_updated_at is None or paper.updated_at is None:
+      return False
+    if paper.updated_at > self.cursor_updated_at:
+      return True
+    return paper.updated_at == self.cursor_updated_at and paper.source_id in self.cursor_ids
+
+  def observe(self, paper: ArxivPaper, position: int) -> None:
+    self.cursor_start = position + 1
+    if paper.updated_at is None:
+      return
+    if self.pending_updated_at is None or paper.updated_at > self.pending_updated_at:
+      self.pending_updated_at = paper.updated_at
+      self.pending_ids = {paper.source_id}
+    elif paper.updated_at == self.pending_updated_at:
+      self.pending_ids.add(paper.source_id)
+    if self.cursor_updated_at is None or paper.updated_at < self.cursor_updated_at:
+      self.cursor_updated_at = paper.updated_at
+      self.cursor_ids = {paper.source_id}
+    elif paper.updated_at == self.cursor_updated_at:
+      self.cursor_ids.add(paper.source_id)
+
+  def complete(self) -> None:
+    if self.pending_updated_at is not None:
+      if self.last_updated_at is None or self.pending_updated_at >= self.last_updated_at:
+        self.last_updated_at = self.pending_updated_at
+        self.seen_ids = set(self.pending_ids)
+    self.pending_updated_at = None
+    self.pending_ids = set()
+    self.cursor_start = None
+    self.cursor_updated_at = None
+    self.cursor_ids = set()
+
+
+Checkpoint = Callable[[Watermark], None]
+
+
+class WatermarkStore:
+  """Loads and persists `Watermark`s in the `ingest_watermarks` table."""
+
+  def load(self, search_query: str) -> Watermark:
+    with session_scope() as session:
+      row = session.scalar(
+        select(IngestWatermark).where(IngestWatermark.query_key == query_key(search_query))
+      )
+      if row is None:
+        return Watermark(search_query=search_query)
+      return Watermark(
+        search_query=search_query,
+        last_updated_at=row.last_updated_at,
+        seen_ids=set(row.seen_ids or []),
+        pending_updated_at=row.pending_updated_at,
+        pending_ids=set(row.pending_ids or []),
+        cursor_start=row.cursor_start,
+        cursor_updated_at=row.cursor_updated_at,
+        cursor_ids=set(row.cursor_ids or []),
+      )
+
+  def save(self, watermark: Watermark) -> None:
+    with session_scope() as session:
+      row = session.scalar(
+        select(IngestWatermark).where(IngestWatermark.query_key == watermark.query_key)
+      )
+      if row is None:
+        row = IngestWatermark(query_key=watermark.query_key, search_query=watermark.search_query)
+        session.add(row)
+      row.last_updated_at = watermark.last_updated_at
+      row.seen_ids = sorted(watermark.seen_ids)
+      row.pending_updated_at = watermark.pending_updated_at
+      row.pending_ids = sorted(watermark.pending_ids)
+      row.cursor_start = watermark.cursor_start
+      row.cursor_updated_at = watermark.cursor_updated_at
+      row.cursor_ids = sorted(watermark.cursor_ids)
+
+
+def query_key(search_query: str) -> str:
+  return hashlib.sha256(search_query.encode("utf-8")).hexdigest()
@@ -1,11 +1,24 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from .core.http import close_http_clients
 from .core.logging import configure_logging
 from .core.settings import get_settings
+from .parsing.executor import shutdown_parse_executor
 
 configure_logging()
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+  yield
+  await close_http_clients()
+  shutdown_parse_executor()
+
+
+app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/healthz")
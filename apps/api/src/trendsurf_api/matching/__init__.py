@@ -0,0 +1,13 @@
+from .anchors import AnchorIndex, get_anchor_index, refresh_anchors
+from .engine import CandidatePaper, MatchResult, TopicAnchor, TopicMatcher, write_matches
+
+__all__ = [
+  "AnchorIndex",
+  "CandidatePaper",
+  "MatchResult",
+  "TopicAnchor",
+  "TopicMatcher",
+  "get_anchor_index",
+  "refresh_anchors",
+  "write_matches",
+]
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import structlog
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..core.database import session_scope
+from ..core.http import run_in_worker_loop
+from ..core.settings import get_settings
+from ..ingestion.metadata_index import get_metadata_index
+from ..ingestion.keywords import normalize_keyword
+from ..models.tables import Topic, TopicVector
+from ..providers.embed_engine import EmbeddingEngine
+from .engine import TopicAnchor, TopicMatcher
+
+logger = structlog.get_logger()
+
+ANCHOR_VERSION_KEY = "trendsurf:topic_anchors:version"
+
+# `now()` is the transaction start, so a slow writer can commit rows stamped before the last
+# load; re-reading a short window on each reload picks those up.
+_RELOAD_OVERLAP = timedelta(seconds=60)
+
+
+def anchor_text(name: str, description: str | None, filters: Mapping[str, Any] | None) -> str:
+  keywords = [normalize_keyword(kw) for kw in (filters or {}).get("keywords", []) if kw.strip()]
+  text = description or name
+  return f"{text}\n\nKeywords: {', '.join(keywords)}" if keywords else text
+
+
+def anchor_hash(text: str, *, model: str, dimensions: int | None) -> str:
+  payload = json.dumps({"text": text, "model": model, "dimensions": dimensions}, sort_keys=True)
+  return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(slots=True)
+class RefreshReport:
+  checked: int = 0
+  embedded: int = 0
+  unchanged: int = 0
+
+
+def refresh_anchors(
+  topic_ids: Iterable[int] | None = None,
+  *,
+  engine: EmbeddingEngine | None = None,
+  redis: Redis | None = None,
+) -> RefreshReport:
+  """Re-embed topics whose anchor inputs changed and notify every `AnchorIndex`.
+
+  Only topics edited after their stored vector, or embedded with another model, are read.
+  Of those, the ones whose input hash still matches (a rename with a description, a
+  threshold change) just have their timestamp advanced instead of calling the provider.
+  The provider is called between two short sessions, so no transaction stays open while it
+  runs; a topic edited meanwhile keeps an older `topic_updated_at` and is embedded again on
+  the next refresh.
+
+  This is a blocking job entry point: it drives the provider through `run_in_worker_loop`,
+  which raises when called from a running event loop, so async callers must go through
+  `asyncio.to_thread`.
+  """
+  engine = engine or EmbeddingEngine()
+  model = engine.model or ""
+  report = RefreshReport()
+  with session_scope() as session:
+    stmt = (
+      select(Topic.id, Topic.name, Topic.description, Topic.filters_json, Topic.updated_at, TopicVector)
+      .outerjoin(TopicVector, TopicVector.topic_id == Topic.id)
+      .where(_stale_clause(model, engine.dimensions))
+    )
+    if topic_ids is not None:
+      stmt = stmt.where(Topic.id.in_(list(topic_ids)))
+    pending: list[tuple[int, str, str, datetime]] = []
+    keywords: set[str] = set()
+    for topic_id, name, description, filters, updated_at, stored in session.execute(stmt):
+      report.checked += 1
+      keywords.update((filters or {}).get("keywords", []))
+      text = anchor_text(name, description, filters)
+      digest = anchor_hash(text, model=model, dimensions=engine.dimensions)
+      if stored is not None and stored.input_hash == digest:
+        stored.topic_updated_at = updated_at
+        report.unchanged += 1
+      else:
+        pending.append((topic_id, text, digest, updated_at))
+
+  if pending:
+    vectors = run_in_worker_loop(engine.embed([text for _, text, _, _ in pending]))
+    rows = [
+      {
+        "topic_id": topic_id,
+        "embed_model": model,
+        "embed_dimensions": len(vector),
+        "input_hash": digest,
+        "vector": np.asarray(vector, dtype=np.float32).tobytes(),
+        "topic_updated_at": updated_at,
+      }
+      for (topic_id, _, digest, updated_at), vector in zip(pending, vectors, strict=True)
+    ]
+    insert_stmt = insert(TopicVector).values(rows)
+    with session_scope() as session:
+      session.execute(
+        insert_stmt.on_conflict_do_update(
+          index_elements=[TopicVector.topic_id],
+          set_={
+            **{key: insert_stmt.excluded[key] for key in rows[0] if key != "topic_id"},
+            "updated_at": func.now(),
+          },
+        )
+      )
+    report.embedded = len(rows)
+
+  index = get_metadata_index()
+  if index is not None and keywords:
+    # Backfill postings for new keywords before matchers can ask for them.
+    index.track_keywords(keywords)
+  if report.checked:
+    _bump_version(redis)
+  logger.info(
+    "matching.anchors.refresh",
+    checked=report.checked,
+    embedded=report.embedded,
+    unchanged=report.unchanged,
+  )
+  return report
+
+
+class AnchorIndex:
+  """Hot in-memory copy of every topic anchor, shared by matching runs in one process.
+
+  `matcher()` hands out a `TopicMatcher` built from the cached anchors. At most once per
+  poll interval it reads the Redis version counter that `refresh_anchors` increments; a new
+  version (or an unreachable Redis) reloads only the anchors and topics touched since the
+  previous load and drops deleted topics, so an edit reaches every worker within seconds
+  without rebuilding all anchors.
+  """
+
+  def __init__(
+    self,
+    *,
+    model: str | None = None,
+    dimensions: int | None = None,
+    redis: Redis | None = None,
+    poll_seconds: float | None = None,
+  ) -> None:
+    settings = get_settings()
+    self.model = model or settings.embed_model or ""
+    self.dimensions = dimensions or settings.embed_dimensions
+    self.poll_seconds = settings.match_anchor_poll_seconds if poll_seconds is None else poll_seconds
+    self._redis = redis
+    self._anchors: dict[int, TopicAnchor] = {}
+    self._matcher: TopicMatcher | None = None
+    self._version: int | None = None
+    self._loaded_at: datetime | None = None
+    self._checked_at = 0.0
+    self._lock = threading.Lock()
+
+  def matcher(self) -> TopicMatcher:
+    with self._lock:
+      now = time.monotonic()
+      if self._matcher is None or now - self._checked_at >= self.poll_seconds:
+        self._checked_at = now
+        version = _read_version(self._redis)
+        if self._matcher is None or version is None or version != self._version:
+          self._reload()
+          self._version = version
+      return self._matcher
+
+  def invalidate(self) -> None:
+    with self._lock:
+      self._matcher = None
+      self._anchors.clear()
+      self._loaded_at = None
+
+  def _reload(self) -> None:
+    started = time.perf_counter()
+    current = TopicVector.embed_model == self.model
+    if self.dimensions is not None:
+      current &= TopicVector.embed_dimensions == self.dimensions
+    with session_scope() as session:
+      loaded_at = session.scalar(select(func.now()))
+      stmt = (
+        select(Topic.id, Topic.filters_json, TopicVector.vector)
+        .join(TopicVector, TopicVector.topic_id == Topic.id)
+        .where(current)
+      )
+      if self._loaded_at is not None:
+        since = self._loaded_at - _RELOAD_OVERLAP
+        stmt = stmt.where(or_(Topic.updated_at > since, TopicVector.updated_at > since))
+      changed = session.execute(stmt).all()
+      live = set(session.scalars(select(TopicVector.topic_id).where(current)))
+
+    dropped = self._anchors.keys() - live
+    for topic_id in dropped:
+      del self._anchors[topic_id]
+    for topic_id, filters, vector in changed:
+      self._anchors[topic_id] = TopicAnchor.from_filters(
+        topic_id, np.frombuffer(vector, dtype=np.float32), filters
+      )
+    if changed or dropped or self._matcher is None:
+      self._matcher = TopicMatcher(list(self._anchors.values()))
+    self._loaded_at = loaded_at
+    logger.info(
+      "matching.anchors.reload",
+      anchors=len(self._anchors),
+      changed=len(changed),
+      dropped=len(dropped),
+      elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@lru_cache
+def get_anchor_index() -> AnchorIndex:
+  return AnchorIndex()
+
+
+@lru_cache
+def _get_redis() -> Redis:
+  return Redis.from_url(get_settings().redis_url)
+
+
+def _stale_clause(model: str, dimensions: int | None):
+  clauses = [
+    TopicVector.topic_id.is_(None),
+    Topic.updated_at > TopicVector.topic_updated_at,
+    TopicVector.embed_model != model,
+  ]
+  if dimensions is not None:
+    clauses.append(TopicVector.embed_dimensions != dimensions)
+  return or_(*clauses)
+
+
+def _bump_version(redis: Redis | None) -> None:
+  try:
+    (redis or _get_redis()).incr(ANCHOR_VERSION_KEY)
+  except RedisError as exc:
+    # Indexes fall back to polling the database every interval while Redis is down.
+    logger.warning("matching.anchors.version_bump_failed", error=str(exc))
+
+
+def _read_version(redis: Redis | None) -> int | None:
+  try:
+    value = (redis or _get_redis()).get(ANCHOR_VERSION_KEY)
+  except RedisError as exc:
+    logger.warning("matching.anchors.version_read_failed", error=str(exc))
+    return None
+  return int(value) if value is not None else 0
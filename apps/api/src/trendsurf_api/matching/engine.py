@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+import structlog
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import session_scope
+from ..core.settings import get_settings
+from ..ingestion.keywords import KeywordSet, normalize_keyword
+from ..models.tables import Paper, TopicMatch
+
+logger = structlog.get_logger()
+
+# Four bind parameters per row; Postgres caps a statement at 65535.
+_MAX_ROWS_PER_STATEMENT = 16_000
+
+
+@dataclass(slots=True)
+class TopicAnchor:
+  topic_id: int
+  vector: np.ndarray
+  threshold: float
+  categories: frozenset[str] = frozenset()
+  keywords: frozenset[str] = frozenset()
+
+  @classmethod
+  def from_filters(
+    cls,
+    topic_id: int,
+    vector: Sequence[float] | np.ndarray,
+    filters: Mapping[str, Any] | None,
+    *,
+    default_threshold: float | None = None,
+  ) -> TopicAnchor:
+    # Unlike `TopicSpec`, an unfiltered topic matches on similarity alone (no `ai` fallback).
+    filters = filters or {}
+    threshold = filters.get("min_score")
+    if threshold is None:
+      threshold = get_settings().match_min_score if default_threshold is None else default_threshold
+    return cls(
+      topic_id=topic_id,
+      vector=np.asarray(vector, dtype=np.float32),
+      threshold=float(threshold),
+      categories=frozenset(cat.strip() for cat in filters.get("categories", []) if cat.strip()),
+      keywords=frozenset(normalize_keyword(kw) for kw in filters.get("keywords", []) if kw.strip()),
+    )
+
+
+@dataclass(slots=True)
+class CandidatePaper:
+  paper_id: int
+  vector: np.ndarray
+  categories: frozenset[str]
+  text: str
+
+  @classmethod
+  def from_paper(cls, paper: Paper, vector: Sequence[float] | np.ndarray) -> CandidatePaper:
+    categories = set((paper.meta_json or {}).get("categories") or [])
+    if paper.primary_category:
+      categories.add(paper.primary_category)
+    text = " ".join([paper.title, paper.abstract or "", *(paper.authors or [])]).lower()
+    return cls(paper.id, np.asarray(vector, dtype=np.float32), frozenset(categories), text)
+
+
+@dataclass(slots=True)
+class MatchResult:
+  topic_id: int
+  paper_id: int
+  score: float
+  reason: str
+
+
+class TopicMatcher:
+  """Match a block of papers against every topic with one matrix product.
+
+  Anchor vectors are normalised into a `(topics, dims)` matrix once. Each `match` call
+  builds the `(papers, topics)` cosine matrix in a single GEMM, then applies per-topic
+  thresholds and category/keyword filters as boolean masks. Categories reduce to one small
+  product against a `(categories, topics)` incidence matrix; keywords are too numerous for
+  that and go through a `KeywordSet` (word-prefix matching) instead.
+  """
+
+  def __init__(self, anchors: Sequence[TopicAnchor], *, top_k: int | None = None) -> None:
+    self.topic_ids = np.asarray([anchor.topic_id for anchor in anchors], dtype=np.int64)
+    self.thresholds = np.asarray([anchor.threshold for anchor in anchors], dtype=np.float32)
+    self.matrix = _normalize_rows(np.vstack([anchor.vector for anchor in anchors])) if anchors else None
+    self.top_k = top_k if top_k is not None else get_settings().match_top_k
+
+    self.categories = sorted({cat for anchor in anchors for cat in anchor.categories})
+    self._category_index = {cat: i for i, cat in enumerate(self.categories)}
+    self._category_topics = np.zeros((len(self.categories), len(anchors)), dtype=np.float32)
+    for column, anchor in enumerate(anchors):
+      for cat in anchor.categories:
+        self._category_topics[self._category_index[cat], column] = 1.0
+    self._category_free = self._category_topics.sum(axis=0) == 0
+
+    self._keyword_set = KeywordSet(kw for anchor in anchors for kw in anchor.keywords)
+    self.keywords = self._keyword_set.keywords
+    keyword_index = {kw: i for i, kw in enumerate(self.keywords)}
+    self._keyword_columns: list[list[int]] = [[] for _ in self.keywords]
+    for column, anchor in enumerate(anchors):
+      for kw in anchor.keywords:
+        self._keyword_columns[keyword_index[normalize_keyword(kw)]].append(column)
+    self._keyword_free = np.asarray([not anchor.keywords for anchor in anchors], dtype=bool)
+
+  def match(self, papers: Sequence[CandidatePaper]) -> list[MatchResult]:
+    if not papers or self.matrix is None:
+      return []
+    started = time.perf_counter()
+    block = _normalize_rows(np.vstack([paper.vector for paper in papers]))
+    scores = block @ self.matrix.T
+    mask = scores >= self.thresholds
+    if self.categories:
+      mask &= self._category_free | (self._paper_categories(papers) @ self._category_topics > 0)
+    if self.keywords:
+      mask &= self._keyword_free | self._keyword_mask(papers)
+    if self.top_k is not None and self.top_k < len(papers):
+      mask &= _top_k_per_column(np.where(mask, scores, -np.inf), self.top_k)
+
+    rows, columns = np.nonzero(mask)
+    clamped = np.clip(scores[rows, columns], 0.0, 1.0)
+    results = [
+      MatchResult(
+        topic_id=int(self.topic_ids[column]),
+        paper_id=papers[row].paper_id,
+        score=round(float(score), 4),
+        reason=f"cosine {score:.3f} >= threshold {self.thresholds[column]:.2f}",
+      )
+      for row, column, score in zip(rows.tolist(), columns.tolist(), clamped.tolist(), strict=True)
+    ]
+    logger.info(
+      "matching.block",
+      papers=len(papers),
+      topics=len(self.topic_ids),
+      matches=len(results),
+      elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    return results
+
+  def _paper_categories(self, papers: Sequence[CandidatePaper]) -> np.ndarray:
+    incidence = np.zeros((len(papers), len(self.categories)), dtype=np.float32)
+    for row, paper in enumerate(papers):
+      for cat in paper.categories:
+        column = self._category_index.get(cat)
+        if column is not None:
+          incidence[row, column] = 1.0
+    return incidence
+
+  def _keyword_mask(self, papers: Sequence[CandidatePaper]) -> np.ndarray:
+    rows: list[int] = []
+    columns: list[int] = []
+    for row, paper in enumerate(papers):
+      for keyword in self._keyword_set.match(paper.text):
+        rows.extend([row] * len(self._keyword_columns[keyword]))
+        columns.extend(self._keyword_columns[keyword])
+    mask = np.zeros((len(papers), len(self.topic_ids)), dtype=bool)
+    mask[rows, columns] = True
+    return mask
+
+
+def write_matches(matches: Iterable[MatchResult], *, session: Session | None = None) -> int:
+  """Upsert matches with `INSERT ... ON CONFLICT (topic_id, paper_id) DO UPDATE`.
+
+  Scores are clamped to the table's 0-1 check constraint. Everything goes out as one
+  statement unless it would exceed Postgres' bind-parameter limit.
+  """
+  rows: dict[tuple[int, int], dict[str, Any]] = {}
+  for match in matches:
+    rows[(match.topic_id, match.paper_id)] = {
+      "topic_id": match.topic_id,
+      "paper_id": match.paper_id,
+      "score": min(1.0, max(0.0, match.score)),
+      "reason": match.reason,
+    }
+  if not rows:
+    return 0
+  if session is None:
+    with session_scope() as scoped:
+      return _write_rows(scoped, list(rows.values()))
+  return _write_rows(session, list(rows.values()))
+
+
+def _write_rows(session: Session, rows: list[dict[str, Any]]) -> int:
+  for offset in range(0, len(rows), _MAX_ROWS_PER_STATEMENT):
+    stmt = insert(TopicMatch).values(rows[offset : offset + _MAX_ROWS_PER_STATEMENT])
+    stmt = stmt.on_conflict_do_update(
+      index_elements=[TopicMatch.topic_id, TopicMatch.paper_id],
+      set_={"score": stmt.excluded.score, "reason": stmt.excluded.reason},
+    )
+    session.execute(stmt)
+  return len(rows)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+  matrix = np.asarray(matrix, dtype=np.float32)
+  norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+  norms[norms == 0] = 1.0
+  return matrix / norms
+
+
+def _top_k_per_column(scores: np.ndarray, k: int) -> np.ndarray:
+  keep = np.zeros(scores.shape, dtype=bool)
+  top = np.argpartition(-scores, k - 1, axis=0)[:k]
+  keep[top, np.arange(scores.shape[1])] = True
+  return keep
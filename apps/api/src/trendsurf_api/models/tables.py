@@ -7,6 +7,7 @@ from sqlalchemy import (
   DateTime,
   ForeignKey,
   Integer,
+  LargeBinary,
   Numeric,
   String,
   Text,
@@ -60,6 +61,7 @@ class Paper(Base):
   id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
   source: Mapped[str] = mapped_column(String(32), nullable=False)
   source_id: Mapped[str] = mapped_column(String(128), nullable=False)
+  source_version: Mapped[int | None] = mapped_column(Integer)
   title: Mapped[str] = mapped_column(Text, nullable=False)
   authors: Mapped[list[str] | None] = mapped_column(ARRAY(String(128)))
   abstract: Mapped[str | None] = mapped_column(Text)
@@ -69,6 +71,7 @@ class Paper(Base):
   url_page: Mapped[str | None] = mapped_column(Text)
   primary_category: Mapped[str | None] = mapped_column(String(64))
   meta_json: Mapped[dict | None] = mapped_column(JSONB)
+  content_hash: Mapped[str | None] = mapped_column(String(64))
   created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
   updated_at: Mapped[datetime] = mapped_column(
     DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -162,3 +165,69 @@ class PaperFulltext(Base):
   updated_at: Mapped[datetime] = mapped_column(
     DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
   )
+
+
+class TeiDocument(Base):
+  __tablename__ = "tei_documents"
+
+  checksum: Mapped[str] = mapped_column(String(64), primary_key=True)
+  codec: Mapped[str] = mapped_column(String(16), nullable=False)
+  payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+  raw_size: Mapped[int] = mapped_column(Integer, nullable=False)
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class IngestWatermark(Base):
+  __tablename__ = "ingest_watermarks"
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  query_key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+  search_query: Mapped[str] = mapped_column(Text, nullable=False)
+  last_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+  seen_ids: Mapped[list[str] | None] = mapped_column(JSONB)
+  pending_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+  pending_ids: Mapped[list[str] | None] = mapped_column(JSONB)
+  cursor_start: Mapped[int | None] = mapped_column(Integer)
+  cursor_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+  cursor_ids: Mapped[list[str] | None] = mapped_column(JSONB)
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  updated_at: Mapped[datetime] = mapped_column(
+    DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+  )
+
+
+class VectorCollection(Base):
+  __tablename__ = "vector_collections"
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  alias: Mapped[str] = mapped_column(String(128), nullable=False)
+  collection: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+  embed_model: Mapped[str] = mapped_column(String(128), nullable=False)
+  embed_dimensions: Mapped[int] = mapped_column(Integer, nullable=False)
+  status: Mapped[str] = mapped_column(String(32), nullable=False, default="building")
+  checkpoint_id: Mapped[int | None] = mapped_column(Integer)
+  points: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  recall: Mapped[float | None] = mapped_column(Numeric(5, 4))
+  activated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+  retired_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  updated_at: Mapped[datetime] = mapped_column(
+    DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+  )
+
+
+class TopicVector(Base):
+  __tablename__ = "topic_vectors"
+
+  topic_id: Mapped[int] = mapped_column(
+    ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True, nullable=False
+  )
+  embed_model: Mapped[str] = mapped_column(String(128), nullable=False)
+  embed_dimensions: Mapped[int] = mapped_column(Integer, nullable=False)
+  input_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+  vector: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+  topic_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  updated_at: Mapped[datetime] = mapped_column(
+    DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+  )
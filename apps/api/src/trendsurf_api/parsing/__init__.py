@@ -1,4 +1,23 @@
-from .grobid_client import process_fulltext, GrobidError
-from .tei_parser import parse_tei, ParsedDocument
+from .chunker import Chunk, iter_chunks
+from .executor import parse_tei_async, shutdown_parse_executor
+from .grobid_client import process_fulltext, GrobidBusyError, GrobidError
+from .grobid_pool import GrobidDispatcher
+from .tei_cache import TeiCache, fetch_tei, reparse_cached
+from .tei_parser import parse_tei, ParsedDocument, Reference
 
-__all__ = ["process_fulltext", "GrobidError", "parse_tei", "ParsedDocument"]
+__all__ = [
+  "Chunk",
+  "process_fulltext",
+  "GrobidBusyError",
+  "GrobidDispatcher",
+  "GrobidError",
+  "iter_chunks",
+  "fetch_tei",
+  "parse_tei",
+  "parse_tei_async",
+  "ParsedDocument",
+  "Reference",
+  "reparse_cached",
+  "shutdown_parse_executor",
+  "TeiCache",
+]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterator
+
+from ..core.tokens import CHARS_PER_TOKEN, estimate_tokens
+from .tei_parser import ParsedDocument
+
+ABSTRACT_SECTION = "Abstract"
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+
+
+@dataclass(slots=True)
+class Chunk:
+  index: int
+  section_index: int | None
+  section_title: str | None
+  text: str
+  tokens: int
+
+  @property
+  def is_abstract(self) -> bool:
+    return self.section_index is None
+
+
+@dataclass(slots=True)
+class _Unit:
+  text: str
+  tokens: int
+  paragraph_start: bool
+
+
+def iter_chunks(
+  document: ParsedDocument,
+  *,
+  max_tokens: int = 512,
+  overlap_tokens: int = 64,
+  include_abstract: bool = True,
+) -> Iterator[Chunk]:
+  """Yield token-budgeted chunks that never cross a section boundary.
+
+  Sections are split on sentence boundaries; consecutive chunks of the same section share
+  up to `overlap_tokens` of trailing sentences. Each chunk's text starts with its section
+  heading so passages stay interpretable on their own. Chunks are produced lazily.
+  """
+  if max_tokens < 16:
+    raise ValueError("max_tokens must be at least 16")
+  overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+  index = 0
+  if include_abstract and document.abstract:
+    for text, tokens in _chunk_paragraphs(
+      ABSTRACT_SECTION, document.abstract.split("\n"), max_tokens, overlap_tokens
+    ):
+      yield Chunk(index, None, ABSTRACT_SECTION, text, tokens)
+      index += 1
+  for section_index, section in enumerate(document.body):
+    if not section.paragraphs:
+      continue
+    for text, tokens in _chunk_paragraphs(section.title, section.paragraphs, max_tokens, overlap_tokens):
+      yield Chunk(index, section_index, section.title, text, tokens)
+      index += 1
+
+
+def _chunk_paragraphs(
+  title: str | None, paragraphs: list[str], max_tokens: int, overlap_tokens: int
+) -> Iterator[tuple[str, int]]:
+  heading = f"{title}\n" if title else ""
+  heading_tokens = estimate_tokens(heading) if heading else 0
+  budget = max(max_tokens - heading_tokens, max_tokens // 2)
+  window: list[_Unit] = []
+  window_tokens = 0
+
+  for unit in _iter_units(paragraphs, budget):
+    if window and window_tokens + unit.tokens > budget:
+      yield _render(heading, window), heading_tokens + window_tokens
+      window, window_tokens = _overlap_tail(window, overlap_tokens, budget - unit.tokens)
+    window.append(unit)
+    window_tokens += unit.tokens
+  if window:
+    yield _render(heading, window), heading_tokens + window_tokens
+
+
+def _overlap_tail(window: list[_Unit], overlap_tokens: int, room: int) -> tuple[list[_Unit], int]:
+  tail: list[_Unit] = []
+  tokens = 0
+  for unit in reversed(window):
+    if tokens + unit.tokens > min(overlap_tokens, room):
+      break
+    tail.append(unit)
+    tokens += unit.tokens
+  tail.reverse()
+  return tail, tokens
+
+
+def _iter_units(paragraphs: list[str], budget: int) -> Iterator[_Unit]:
+  max_chars = budget * CHARS_PER_TOKEN
+  for paragraph in paragraphs:
+    first = True
+    for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+      for piece in _hard_wrap(sentence, max_chars):
+        yield _Unit(piece, estimate_tokens(piece), first)
+        first = False
+
+
+def _hard_wrap(text: str, max_chars: int) -> Iterator[str]:
+  # Sentences longer than the whole budget (tables, run-on extraction noise) split on words.
+  if len(text) <= max_chars:
+    if text:
+      yield text
+    return
+  line: list[str] = []
+  length = 0
+  for word in text.split():
+    if line and length + len(word) + 1 > max_chars:
+      yield " ".join(line)
+      line, length = [], 0
+    while len(word) > max_chars:
+      yield word[:max_chars]
+      word = word[max_chars:]
+    line.append(word)
+    length += len(word) + 1
+  if line:
+    yield " ".join(line)
+
+
+def _render(heading: str, units: list[_Unit]) -> str:
+  parts: list[str] = []
+  for position, unit in enumerate(units):
+    if position:
+      parts.append("\n" if unit.paragraph_start else " ")
+    parts.append(unit.text)
+  return heading + "".join(parts)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from ..core.settings import get_settings
+from .tei_parser import ParsedDocument, parse_tei
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+  global _executor
+  if _executor is None:
+    settings = get_settings()
+    _executor = ProcessPoolExecutor(max_workers=settings.parse_workers or None)
+  return _executor
+
+
+async def parse_tei_async(tei_xml: str | bytes, *, executor: ProcessPoolExecutor | None = None) -> ParsedDocument:
+  """Parse TEI in a worker process so multi-MB documents never block the event loop."""
+  loop = asyncio.get_running_loop()
+  return await loop.run_in_executor(executor or get_parse_executor(), parse_tei, tei_xml)
+
+
+def shutdown_parse_executor() -> None:
+  global _executor
+  if _executor is not None:
+    _executor.shutdown(wait=True, cancel_futures=True)
+    _executor = None
@@ -1,29 +1,55 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import httpx
 
+from ..core.http import get_http_client
 from ..core.settings import get_settings
 
+if TYPE_CHECKING:
+  from ..ingestion.pdf_fetcher import PdfDocument
+
 
 class GrobidError(RuntimeError):
   pass
 
 
-async def process_fulltext(pdf_bytes: bytes, *, consolidate_header: int = 1, timeout: float | None = None) -> str:
+class GrobidBusyError(GrobidError):
+  """GROBID answered 503: its worker pool is saturated and the request should be retried."""
+
+
+async def process_fulltext(
+  pdf: bytes | PdfDocument,
+  *,
+  consolidate_header: int = 1,
+  timeout: float | None = None,
+  base_url: str | None = None,
+) -> str:
+  """POST a PDF to GROBID; spooled `PdfDocument`s are streamed from disk, not loaded."""
   settings = get_settings()
-  if not settings.grobid_url:
+  base_url = base_url or (str(settings.grobid_url) if settings.grobid_url else None)
+  if not base_url:
     raise GrobidError("GROBID_URL is not configured")
 
   timeout = timeout or settings.grobid_timeout
-  files = {"input": ("document.pdf", pdf_bytes, "application/pdf")}
   data = {"consolidateHeader": str(consolidate_header)}
 
-  async with httpx.AsyncClient(timeout=timeout) as client:
-    try:
-      response = await client.post(f"{settings.grobid_url}/api/processFulltextDocument", files=files, data=data)
-      response.raise_for_status()
-    except httpx.HTTPError as exc:
-      raise GrobidError(f"GROBID request failed: {exc}") from exc
+  url = f"{base_url.rstrip('/')}/api/processFulltextDocument"
+  client = get_http_client(url)
+  try:
+    if isinstance(pdf, bytes):
+      files = {"input": ("document.pdf", pdf, "application/pdf")}
+      response = await client.post(url, files=files, data=data, timeout=timeout)
+    else:
+      with pdf.open() as handle:
+        files = {"input": ("document.pdf", handle, "application/pdf")}
+        response = await client.post(url, files=files, data=data, timeout=timeout)
+    if response.status_code == httpx.codes.SERVICE_UNAVAILABLE:
+      raise GrobidBusyError(f"GROBID at {base_url} is busy")
+    response.raise_for_status()
+  except httpx.HTTPError as exc:
+    raise GrobidError(f"GROBID request failed: {exc}") from exc
 
   if not response.text.strip():
     raise GrobidError("GROBID returned empty response")
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Sequence
+
+import structlog
+
+from ..core.settings import get_settings
+from .grobid_client import GrobidBusyError, GrobidError, process_fulltext
+
+if TYPE_CHECKING:
+  from ..ingestion.pdf_fetcher import PdfDocument
+
+logger = structlog.get_logger()
+
+Processor = Callable[..., Awaitable[str]]
+
+_LATENCY_ALPHA = 0.2
+
+
+@dataclass(slots=True)
+class GrobidInstance:
+  url: str
+  limit: float
+  max_limit: int
+  in_flight: int = 0
+  completed: int = 0
+  busy: int = 0
+  failed: int = 0
+  latency_ewma: float | None = None
+
+  @property
+  def available(self) -> bool:
+    return self.in_flight < max(1, int(self.limit))
+
+  @property
+  def load(self) -> float:
+    return self.in_flight / max(1.0, self.limit)
+
+  def record_success(self, latency: float) -> None:
+    self.completed += 1
+    self.latency_ewma = (
+      latency if self.latency_ewma is None else (1 - _LATENCY_ALPHA) * self.latency_ewma + _LATENCY_ALPHA * latency
+    )
+    # Additive increase: roughly +1 slot per window of successful requests.
+    self.limit = min(float(self.max_limit), self.limit + 1 / max(1.0, self.limit))
+
+  def record_busy(self) -> None:
+    self.busy += 1
+    # Multiplicative decrease on backpressure, never below a single slot.
+    self.limit = max(1.0, self.limit / 2)
+
+
+class GrobidDispatcher:
+  """Route fulltext requests across GROBID instances with per-instance in-flight limits.
+
+  Requests go to the least-loaded instance with a free slot and otherwise wait in a queue.
+  A 503 halves that instance's limit and requeues the document; successes grow the limit
+  back towards `per_instance_limit` (AIMD), so each container settles near its real capacity.
+  """
+
+  def __init__(
+    self,
+    urls: Sequence[str] | None = None,
+    *,
+    per_instance_limit: int | None = None,
+    max_attempts: int = 5,
+    busy_backoff: float = 0.5,
+    processor: Processor | None = None,
+  ) -> None:
+    settings = get_settings()
+    urls = list(urls or settings.grobid_instance_urls)
+    if not urls:
+      raise GrobidError("GROBID_URL is not configured")
+    limit = per_instance_limit or settings.grobid_concurrency
+    self.instances = [GrobidInstance(url=url.rstrip("/"), limit=float(limit), max_limit=limit) for url in urls]
+    self.max_attempts = max_attempts
+    self.busy_backoff = busy_backoff
+    self.processor = processor or process_fulltext
+    self.queue_depth = 0
+    self._condition = asyncio.Condition()
+
+  async def process(self, pdf: bytes | PdfDocument, **kwargs: Any) -> str:
+    last_error: GrobidError | None = None
+    for attempt in range(1, self.max_attempts + 1):
+      instance = await self._acquire()
+      started = time.perf_counter()
+      try:
+        tei = await self.processor(pdf, base_url=instance.url, **kwargs)
+      except GrobidBusyError as exc:
+        instance.record_busy()
+        last_error = exc
+        logger.info("grobid.busy", url=instance.url, limit=instance.limit, attempt=attempt)
+      except GrobidError as exc:
+        instance.failed += 1
+        last_error = exc
+        logger.warning("grobid.failed", url=instance.url, attempt=attempt, error=str(exc))
+      else:
+        instance.record_success(time.perf_counter() - started)
+        return tei
+      finally:
+        await self._release(instance)
+      await asyncio.sleep(self.busy_backoff * attempt)
+    raise GrobidError(f"GROBID request failed after {self.max_attempts} attempts: {last_error}")
+
+  def stats(self) -> dict[str, Any]:
+    return {
+      "queue_depth": self.queue_depth,
+      "instances": [
+        {
+          "url": instance.url,
+          "in_flight": instance.in_flight,
+          "limit": round(instance.limit, 2),
+          "latency_ms": round(instance.latency_ewma * 1000, 1) if instance.latency_ewma is not None else None,
+          "completed": instance.completed,
+          "busy": instance.busy,
+          "failed": instance.failed,
+        }
+        for instance in self.instances
+      ],
+    }
+
+  async def _acquire(self) -> GrobidInstance:
+    async with self._condition:
+      self.queue_depth += 1
+      try:
+        await self._condition.wait_for(lambda: any(instance.available for instance in self.instances))
+      finally:
+        self.queue_depth -= 1
+      instance = min(
+        (instance for instance in self.instances if instance.available),
+        key=lambda instance: (instance.load, instance.latency_ewma or 0.0),
+      )
+      instance.in_flight += 1
+      return instance
+
+  async def _release(self, instance: GrobidInstance) -> None:
+    async with self._condition:
+      instance.in_flight -= 1
+      self._condition.notify_all()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import session_scope
+from ..models.tables import TeiDocument
+from .grobid_client import GrobidError, process_fulltext
+from .tei_parser import ParsedDocument, parse_tei
+
+if TYPE_CHECKING:
+  from ..ingestion.pdf_fetcher import PdfDocument
+  from .grobid_pool import GrobidDispatcher
+
+CODEC_GZIP = "gzip"
+
+
+def encode_tei(tei_xml: str) -> tuple[str, bytes]:
+  # TEI is highly repetitive markup; level 6 gets most of the ratio at a fraction of level 9's CPU.
+  return CODEC_GZIP, gzip.compress(tei_xml.encode("utf-8"), compresslevel=6)
+
+
+def decode_tei(codec: str, payload: bytes) -> str:
+  if codec != CODEC_GZIP:
+    raise GrobidError(f"Unsupported TEI codec: {codec}")
+  return gzip.decompress(payload).decode("utf-8")
+
+
+class TeiCache:
+  """Raw GROBID TEI stored compressed in `tei_documents`, keyed by the PDF's SHA-256."""
+
+  def get(self, checksum: str, *, session: Session | None = None) -> str | None:
+    if session is None:
+      with session_scope() as scoped:
+        return self.get(checksum, session=scoped)
+    row = session.get(TeiDocument, checksum)
+    if row is None:
+      return None
+    return decode_tei(row.codec, row.payload)
+
+  def put(self, checksum: str, tei_xml: str, *, session: Session | None = None) -> None:
+    if session is None:
+      with session_scope() as scoped:
+        self.put(checksum, tei_xml, session=scoped)
+      return
+    codec, payload = encode_tei(tei_xml)
+    stmt = insert(TeiDocument).values(
+      checksum=checksum, codec=codec, payload=payload, raw_size=len(tei_xml.encode("utf-8"))
+    )
+    session.execute(stmt.on_conflict_do_nothing(index_elements=[TeiDocument.checksum]))
+
+  def iter_documents(
+    self, checksums: Iterable[str] | None = None, *, batch_size: int = 200
+  ) -> Iterator[tuple[str, str]]:
+    """Stream `(checksum, tei_xml)` pairs, optionally restricted to `checksums`."""
+    with session_scope() as session:
+      stmt = select(TeiDocument.checksum, TeiDocument.codec, TeiDocument.payload)
+      if checksums is not None:
+        stmt = stmt.where(TeiDocument.checksum.in_(list(checksums)))
+      rows = session.execute(stmt.execution_options(yield_per=batch_size))
+      for checksum, codec, payload in rows:
+        yield checksum, decode_tei(codec, payload)
+
+
+async def fetch_tei(
+  pdf: PdfDocument,
+  *,
+  cache: TeiCache | None = None,
+  dispatcher: GrobidDispatcher | None = None,
+) -> str:
+  """Return TEI for `pdf`, calling GROBID only when the checksum is not cached yet.
+
+  Cache reads and writes are blocking database I/O plus (de)compression of multi-MB TEI,
+  so they run in a worker thread off the event loop.
+  """
+  cache = cache or TeiCache()
+  cached = await asyncio.to_thread(cache.get, pdf.checksum)
+  if cached is not None:
+    return cached
+  if dispatcher is not None:
+    tei_xml = await dispatcher.process(pdf)
+  else:
+    tei_xml = await process_fulltext(pdf)
+  await asyncio.to_thread(cache.put, pdf.checksum, tei_xml)
+  return tei_xml
+
+
+def reparse_cached(
+  checksums: Iterable[str] | None = None, *, cache: TeiCache | None = None
+) -> Iterator[tuple[str, ParsedDocument]]:
+  """Re-run `parse_tei` over cached TEI without touching GROBID."""
+  for checksum, tei_xml in (cache or TeiCache()).iter_documents(checksums):
+    yield checksum, parse_tei(tei_xml)
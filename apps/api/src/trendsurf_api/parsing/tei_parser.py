@@ -1,13 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable
+import io
+from dataclasses import dataclass, field
+from typing import IO
 import xml.etree.ElementTree as ET
 
 
 TEI_NS = {
   "tei": "http://www.tei-c.org/ns/1.0",
 }
+_TEI = "{http://www.tei-c.org/ns/1.0}"
+_ABSTRACT = f"{_TEI}abstract"
+_BIBL_STRUCT = f"{_TEI}biblStruct"
+_BODY = f"{_TEI}body"
+_DIV = f"{_TEI}div"
+_HEAD = f"{_TEI}head"
+_IDNO = f"{_TEI}idno"
+_LIST_BIBL = f"{_TEI}listBibl"
+_P = f"{_TEI}p"
+_TITLE = f"{_TEI}title"
+_TITLE_STMT = f"{_TEI}titleStmt"
+_CLEAR_ON_END = {f"{_TEI}teiHeader", f"{_TEI}front", f"{_TEI}back"}
 
 
 @dataclass
@@ -20,55 +33,119 @@ class Section:
     return "\n".join(self.paragraphs)
 
 
+@dataclass
+class Reference:
+  """The parts of a `biblStruct` that identify the cited work, independent of its formatting."""
+
+  title: str | None
+  identifiers: dict[str, str] = field(default_factory=dict)
+
+
 @dataclass
 class ParsedDocument:
   title: str | None
   abstract: str | None
   body: list[Section]
   references: list[str]
+  cited: list[Reference] = field(default_factory=list)
 
   @property
   def concatenated_body(self) -> str:
     return "\n\n".join(section.text for section in self.body if section.paragraphs)
 
 
-def parse_tei(tei_xml: str) -> ParsedDocument:
-  root = ET.fromstring(tei_xml)
-  title = _first_text(root.findall(".//tei:titleStmt/tei:title", TEI_NS))
-  abstract = "\n".join(_iter_text(root.findall(".//tei:abstract//tei:p", TEI_NS)))
-  body_sections = _parse_sections(root)
-  references = [
-    _normalize_whitespace(ref)
-    for ref in _iter_text(root.findall(".//tei:listBibl/tei:biblStruct", TEI_NS))
-    if ref
-  ]
-  return ParsedDocument(title=title, abstract=abstract, body=body_sections, references=references)
+def parse_tei(tei_xml: str | bytes | IO[bytes]) -> ParsedDocument:
+  """Extract title, abstract, top-level body sections and references in one `iterparse` pass.
 
-
-def _parse_sections(root: ET.Element) -> list[Section]:
+  Subtrees are cleared as soon as they have been consumed, so memory stays proportional to
+  the largest single section rather than to the whole TEI document.
+  """
+  title: str | None = None
+  abstract_parts: list[str] = []
   sections: list[Section] = []
-  for div in root.findall(".//tei:body/tei:div", TEI_NS):
-    head = _first_text(div.findall("tei:head", TEI_NS))
-    paragraphs = list(_iter_text(div.findall("tei:p", TEI_NS)))
-    if not paragraphs:
+  references: list[str] = []
+  cited: list[Reference] = []
+  section_head: str | None = None
+  section_paragraphs: list[str] = []
+  # Tags of the currently open ancestors of the element being closed.
+  stack: list[str] = []
+  abstract_depth = 0
+
+  for event, elem in ET.iterparse(_as_stream(tei_xml), events=("start", "end")):
+    tag = elem.tag
+    if event == "start":
+      stack.append(tag)
+      if tag == _ABSTRACT:
+        abstract_depth += 1
       continue
-    sections.append(Section(title=head, paragraphs=[_normalize_whitespace(p) for p in paragraphs if p]))
-  return sections
-
-
-def _iter_text(nodes: Iterable[ET.Element]) -> Iterable[str]:
-  for node in nodes:
-    text_parts = [node.text or ""]
-    text_parts.extend(child.tail or "" for child in node)
-    yield _normalize_whitespace("".join(text_parts))
-
-
-def _first_text(nodes: Iterable[ET.Element]) -> str | None:
-  for node in nodes:
-    text = _normalize_whitespace(node.text or "")
-    if text:
-      return text
-  return None
+    stack.pop()
+    parent = stack[-1] if stack else None
+
+    if parent == _DIV and len(stack) >= 2 and stack[-2] == _BODY:
+      if tag == _P:
+        paragraph = _own_text(elem)
+        if paragraph:
+          section_paragraphs.append(paragraph)
+        elem.clear()
+      elif tag == _HEAD:
+        if section_head is None:
+          section_head = _normalize_whitespace(elem.text or "") or None
+        elem.clear()
+    elif tag == _P and abstract_depth:
+      abstract_parts.append(_own_text(elem))
+      elem.clear()
+    elif tag == _DIV and parent == _BODY:
+      if section_paragraphs:
+        sections.append(Section(title=section_head, paragraphs=section_paragraphs))
+      section_head = None
+      section_paragraphs = []
+      elem.clear()
+    elif tag == _BIBL_STRUCT and parent == _LIST_BIBL:
+      reference = _normalize_whitespace(" ".join(elem.itertext()))
+      if reference:
+        references.append(reference)
+        cited.append(_reference(elem))
+      elem.clear()
+    elif tag == _TITLE and parent == _TITLE_STMT:
+      if title is None:
+        title = _normalize_whitespace(elem.text or "") or None
+      elem.clear()
+    elif tag == _ABSTRACT:
+      abstract_depth -= 1
+      elem.clear()
+    elif tag in _CLEAR_ON_END:
+      elem.clear()
+
+  return ParsedDocument(title=title, abstract="\n".join(abstract_parts), body=sections, references=references, cited=cited)
+
+
+def _reference(bibl: ET.Element) -> Reference:
+  # The analytic title is the cited article; monograph-only entries (books, theses) use theirs.
+  title = bibl.find(f"{_TEI}analytic/{_TITLE}")
+  if title is None:
+    title = bibl.find(f"{_TEI}monogr/{_TITLE}")
+  identifiers = {
+    idno.get("type", "").lower(): _normalize_whitespace("".join(idno.itertext()))
+    for idno in bibl.iter(_IDNO)
+    if idno.get("type")
+  }
+  text = _normalize_whitespace("".join(title.itertext())) if title is not None else ""
+  return Reference(title=text or None, identifiers={key: value for key, value in identifiers.items() if value})
+
+
+def _as_stream(tei_xml: str | bytes | IO[bytes]) -> IO[bytes]:
+  if isinstance(tei_xml, str):
+    return io.BytesIO(tei_xml.encode("utf-8"))
+  if isinstance(tei_xml, bytes):
+    return io.BytesIO(tei_xml)
+  return tei_xml
+
+
+def _own_text(node: ET.Element) -> str:
+  # Paragraph text plus the tails of inline children (refs, formulas), not the children's text.
+  text_parts = [node.text or ""]
+  text_parts.extend(child.tail or "" for child in node)
+  return _normalize_whitespace("".join(text_parts))
 
 
 def _normalize_whitespace(text: str) -> str:
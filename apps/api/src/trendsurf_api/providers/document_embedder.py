@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+import numpy as np
+
+from ..core.settings import get_settings
+from ..parsing.chunker import Chunk, iter_chunks
+from ..parsing.tei_parser import ParsedDocument
+from .embed_engine import EmbeddingEngine
+
+ChunkSink = Callable[[Chunk, np.ndarray], Awaitable[None] | None]
+
+
+class VectorPool:
+  """Running weighted mean of unit-normalised vectors; O(dimensions) memory."""
+
+  def __init__(self) -> None:
+    self._sum: np.ndarray | None = None
+    self.count = 0
+    self.total_weight = 0.0
+
+  def add(self, vector: np.ndarray, weight: float = 1.0) -> None:
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0 or weight <= 0.0:
+      return
+    scaled = vector.astype(np.float64) * (weight / norm)
+    if self._sum is None:
+      self._sum = scaled
+    else:
+      self._sum += scaled
+    self.count += 1
+    self.total_weight += weight
+
+  def result(self) -> np.ndarray | None:
+    if self._sum is None:
+      return None
+    norm = float(np.linalg.norm(self._sum))
+    if norm == 0.0:
+      return None
+    return (self._sum / norm).astype(np.float32)
+
+
+@dataclass(slots=True)
+class DocumentEmbedding:
+  vector: np.ndarray | None
+  chunks: int
+  tokens: int
+
+
+async def iter_chunk_vectors(
+  chunks: Iterable[Chunk],
+  *,
+  engine: EmbeddingEngine | None = None,
+  window: int | None = None,
+) -> AsyncIterator[tuple[Chunk, np.ndarray]]:
+  """Embed `chunks` a window at a time, yielding `(chunk, float32 vector)` pairs in order.
+
+  Only one window of chunk strings and vectors is alive at once.
+  """
+  engine = engine or EmbeddingEngine()
+  window = window or engine.max_batch_items
+  pending: list[Chunk] = []
+  for chunk in chunks:
+    pending.append(chunk)
+    if len(pending) >= window:
+      for item in await _embed_window(engine, pending):
+        yield item
+      pending = []
+  if pending:
+    for item in await _embed_window(engine, pending):
+      yield item
+
+
+async def embed_document(
+  document: ParsedDocument,
+  *,
+  engine: EmbeddingEngine | None = None,
+  on_chunk: ChunkSink | None = None,
+  max_tokens: int | None = None,
+  overlap_tokens: int | None = None,
+  abstract_weight: float | None = None,
+) -> DocumentEmbedding:
+  """Chunk, embed and pool `document` into one normalised vector.
+
+  Chunks are weighted by estimated token count, with abstract chunks scaled by
+  `abstract_weight`. Pass `on_chunk` to persist passage vectors as they are produced.
+  """
+  settings = get_settings()
+  abstract_weight = settings.chunk_abstract_weight if abstract_weight is None else abstract_weight
+  chunks = iter_chunks(
+    document,
+    max_tokens=max_tokens or settings.chunk_max_tokens,
+    overlap_tokens=settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens,
+  )
+  pool = VectorPool()
+  chunk_count = 0
+  tokens = 0
+  async for chunk, vector in iter_chunk_vectors(chunks, engine=engine):
+    pool.add(vector, chunk.tokens * (abstract_weight if chunk.is_abstract else 1.0))
+    chunk_count += 1
+    tokens += chunk.tokens
+    if on_chunk is not None:
+      result = on_chunk(chunk, vector)
+      if inspect.isawaitable(result):
+        await result
+  return DocumentEmbedding(vector=pool.result(), chunks=chunk_count, tokens=tokens)
+
+
+async def _embed_window(engine: EmbeddingEngine, chunks: list[Chunk]) -> list[tuple[Chunk, np.ndarray]]:
+  vectors = np.asarray(await engine.embed([chunk.text for chunk in chunks]), dtype=np.float32)
+  return list(zip(chunks, vectors, strict=True))
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Sequence
+
+import structlog
+
+from ..core.settings import get_settings
+from .embed_engine import EmbeddingEngine
+
+logger = structlog.get_logger()
+
+
+@dataclass(slots=True)
+class _PendingRequest:
+  texts: list[str]
+  future: asyncio.Future[list[list[float]]]
+
+
+@dataclass(slots=True)
+class BatcherStats:
+  requests: int = 0
+  texts: int = 0
+  flushes: int = 0
+  full_flushes: int = 0
+  largest_flush: int = 0
+  failures: int = 0
+
+
+class EmbeddingBatcher:
+  """Coalesce concurrent small embedding calls into shared provider requests.
+
+  Requests arriving within `window_ms` of the first pending one are sent together; the
+  window is cut short once `max_items` texts are waiting. Each caller gets back only its
+  own vectors, in order. A provider failure fails every caller in that flush.
+  """
+
+  def __init__(
+    self,
+    *,
+    window_ms: float | None = None,
+    max_items: int | None = None,
+    engine: EmbeddingEngine | None = None,
+  ) -> None:
+    settings = get_settings()
+    window_ms = settings.embed_coalesce_window_ms if window_ms is None else window_ms
+    self.window = max(0.0, window_ms) / 1000
+    self.max_items = max_items or settings.embed_batch_max_items
+    self.engine = engine or EmbeddingEngine()
+    self.stats = BatcherStats()
+    self._pending: list[_PendingRequest] = []
+    self._pending_items = 0
+    self._timer: asyncio.TimerHandle | None = None
+    self._tasks: set[asyncio.Task[None]] = set()
+
+  async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+    if not texts:
+      return []
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[list[list[float]]] = loop.create_future()
+    self._pending.append(_PendingRequest(list(texts), future))
+    self._pending_items += len(texts)
+    self.stats.requests += 1
+    self.stats.texts += len(texts)
+    if self._pending_items >= self.max_items:
+      self.stats.full_flushes += 1
+      self._flush()
+    elif self._timer is None:
+      self._timer = loop.call_later(self.window, self._flush)
+    return await future
+
+  async def drain(self) -> None:
+    """Flush anything still waiting and wait for in-flight provider calls."""
+    self._flush()
+    if self._tasks:
+      await asyncio.gather(*self._tasks, return_exceptions=True)
+
+  def _flush(self) -> None:
+    if self._timer is not None:
+      self._timer.cancel()
+      self._timer = None
+    batch, self._pending = self._pending, []
+    self._pending_items = 0
+    if not batch:
+      return
+    task = asyncio.get_running_loop().create_task(self._run(batch))
+    self._tasks.add(task)
+    task.add_done_callback(self._tasks.discard)
+
+  async def _run(self, batch: list[_PendingRequest]) -> None:
+    # Callers that were cancelled while waiting are dropped before we spend a round-trip on them.
+    live = [request for request in batch if not request.future.done()]
+    if not live:
+      return
+    texts = [text for request in live for text in request.texts]
+    self.stats.flushes += 1
+    self.stats.largest_flush = max(self.stats.largest_flush, len(texts))
+    try:
+      vectors = await self.engine.embed(texts)
+    except Exception as exc:  # noqa: BLE001 - surfaced to every waiting caller
+      self.stats.failures += 1
+      logger.warning("embed.batcher.failed", requests=len(live), texts=len(texts), error=str(exc))
+      for request in live:
+        if not request.future.done():
+          request.future.set_exception(exc)
+      return
+    offset = 0
+    for request in live:
+      size = len(request.texts)
+      if not request.future.done():
+        request.future.set_result(vectors[offset : offset + size])
+      offset += size
+
+
+_batcher: tuple[asyncio.AbstractEventLoop, EmbeddingBatcher] | None = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+  """Return the batcher for the running loop, building a new one for a different loop."""
+  global _batcher
+  loop = asyncio.get_running_loop()
+  if _batcher is None or _batcher[0] is not loop:
+    _batcher = (loop, EmbeddingBatcher())
+  return _batcher[1]
+
+
+async def embed_coalesced(texts: Sequence[str]) -> list[list[float]]:
+  """Drop-in for small `embed_texts` calls that share round-trips with concurrent callers."""
+  return await get_embedding_batcher().embed(texts)
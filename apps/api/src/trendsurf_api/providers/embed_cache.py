@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import structlog
+
+from ..core.settings import get_settings
+
+logger = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+  key BLOB PRIMARY KEY,
+  vector BLOB NOT NULL,
+  last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_embeddings_last_access ON embeddings (last_access);
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value INTEGER NOT NULL
+);
+-- Running byte total, kept by triggers so every writer (in any process) keeps it exact and
+-- `put_many` never has to SUM the whole table. Seeded once for caches created before it.
+INSERT OR IGNORE INTO meta (key, value)
+  SELECT 'total_bytes', COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings;
+CREATE TRIGGER IF NOT EXISTS embeddings_bytes_insert AFTER INSERT ON embeddings BEGIN
+  UPDATE meta SET value = value + LENGTH(NEW.vector) WHERE key = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_bytes_update AFTER UPDATE OF vector ON embeddings BEGIN
+  UPDATE meta SET value = value + LENGTH(NEW.vector) - LENGTH(OLD.vector)
+  WHERE key = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS embeddings_bytes_delete AFTER DELETE ON embeddings BEGIN
+  UPDATE meta SET value = value - LENGTH(OLD.vector) WHERE key = 'total_bytes';
+END;
+"""
+# SQLite caps bound parameters per statement; stay well below the historical 999 limit.
+_LOOKUP_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+  return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+@dataclass(slots=True)
+class CacheStats:
+  hits: int = 0
+  misses: int = 0
+  evictions: int = 0
+
+  @property
+  def hit_rate(self) -> float:
+    total = self.hits + self.misses
+    return self.hits / total if total else 0.0
+
+
+class EmbeddingCache:
+  """SQLite-backed store of float32 embeddings keyed by model identity and text hash.
+
+  Keys are SHA-256 over `provider|model|dimensions|normalised text`, so switching the
+  embedding model or dimensions never serves stale vectors.
+  """
+
+  def __init__(self, root: str | Path, *, max_bytes: int) -> None:
+    self.root = Path(root)
+    self.root.mkdir(parents=True, exist_ok=True)
+    self.max_bytes = max_bytes
+    self.stats = CacheStats()
+    self._db = sqlite3.connect(self.root / "embeddings.sqlite3", check_same_thread=False)
+    self._db.execute("PRAGMA journal_mode = WAL")
+    self._db.executescript(_SCHEMA)
+
+  @staticmethod
+  def make_key(text: str, *, provider: str, model: str, dimensions: int) -> bytes:
+    material = f"{provider}|{model}|{dimensions}|{normalize_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).digest()
+
+  def get_many(self, keys: Sequence[bytes]) -> dict[bytes, np.ndarray]:
+    found: dict[bytes, np.ndarray] = {}
+    unique = list(dict.fromkeys(keys))
+    for offset in range(0, len(unique), _LOOKUP_CHUNK):
+      chunk = unique[offset : offset + _LOOKUP_CHUNK]
+      placeholders = ",".join("?" * len(chunk))
+      rows = self._db.execute(
+        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",  # noqa: S608
+        chunk,
+      ).fetchall()
+      for key, blob in rows:
+        found[key] = np.frombuffer(blob, dtype=np.float32)
+    if found:
+      now = time.time()
+      with self._db:
+        self._db.executemany(
+          "UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, key) for key in found]
+        )
+    hits = sum(1 for key in keys if key in found)
+    self.stats.hits += hits
+    self.stats.misses += len(keys) - hits
+    return found
+
+  def put_many(self, items: Sequence[tuple[bytes, Sequence[float] | np.ndarray]]) -> None:
+    if not items:
+      return
+    now = time.time()
+    rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+    with self._db:
+      self._db.executemany(
+        "INSERT INTO embeddings (key, vector, last_access) VALUES (?, ?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET vector = excluded.vector, last_access = excluded.last_access",
+        rows,
+      )
+    self.evict()
+
+  def total_bytes(self) -> int:
+    (total,) = self._db.execute("SELECT value FROM meta WHERE key = 'total_bytes'").fetchone()
+    return int(total)
+
+  def evict(self) -> int:
+    total = self.total_bytes()
+    if total <= self.max_bytes:
+      return 0
+    # Drop ~10% below the budget so eviction does not run on every insert.
+    target = int(self.max_bytes * 0.9)
+    evicted = 0
+    with self._db:
+      rows = self._db.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access ASC")
+      doomed: list[tuple[bytes]] = []
+      for key, size in rows:
+        if total <= target:
+          break
+        doomed.append((key,))
+        total -= size
+      self._db.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+      evicted = len(doomed)
+    self.stats.evictions += evicted
+    logger.info("embed_cache.evicted", entries=evicted, total_bytes=total, max_bytes=self.max_bytes)
+    return evicted
+
+  def close(self) -> None:
+    self._db.close()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+  settings = get_settings()
+  if not settings.embed_cache_dir:
+    return None
+  return EmbeddingCache(settings.embed_cache_dir, max_bytes=settings.embed_cache_max_mb * 1024 * 1024)
@@ -4,6 +4,7 @@ from typing import Iterable, Sequence
 
 import httpx
 
+from ..core.http import get_http_client
 from ..core.settings import get_settings
 from .types import EmbeddingProvider
 
@@ -12,6 +13,13 @@ class EmbeddingError(RuntimeError):
   pass
 
 
+class EmbeddingBatchTooLargeError(EmbeddingError):
+  """The provider rejected a request for exceeding its payload or context limits."""
+
+
+_SIZE_ERROR_HINTS = ("context length", "too long", "too large", "maximum", "token limit", "exceeds")
+
+
 async def embed_texts(
   texts: Sequence[str],
   *,
@@ -40,11 +48,12 @@ async def embed_texts(
       )
     payload = {"model": model, "input": list(texts)}
     timeout = timeout or settings.ollama_timeout
-    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
-      response = await client.post("/api/embeddings", json=payload)
-      response.raise_for_status()
-      data = response.json()
-      return [item["embedding"] for item in data.get("data", [])]
+    # `/api/embed` is Ollama's native batch endpoint; `/api/embeddings` takes one prompt.
+    url = f"{base_url.rstrip('/')}/api/embed"
+    response = await get_http_client(url).post(url, json=payload, timeout=timeout)
+    _raise_for_status(response)
+    data = response.json()
+    return _check_count(data.get("embeddings", []), texts)
 
   if provider == EmbeddingProvider.OPENAI_COMPAT:
     base_url = str(settings.embed_base_url or settings.openai_base_url or "https://api.openai.com/v1")
@@ -54,15 +63,32 @@ async def embed_texts(
       headers["Authorization"] = f"Bearer {api_key}"
     payload = {"model": model, "input": list(texts)}
     timeout = timeout or settings.openai_timeout
-    async with httpx.AsyncClient(timeout=timeout) as client:
-      response = await client.post(f"{base_url}/embeddings", headers=headers, json=payload)
-      response.raise_for_status()
-      data = response.json()
-      return [item["embedding"] for item in data.get("data", [])]
+    url = f"{base_url.rstrip('/')}/embeddings"
+    response = await get_http_client(url).post(url, headers=headers, json=payload, timeout=timeout)
+    _raise_for_status(response)
+    data = response.json()
+    items = sorted(data.get("data", []), key=lambda item: item.get("index", 0))
+    return _check_count([item["embedding"] for item in items], texts)
 
   raise EmbeddingError(f"Unsupported embedding provider: {provider}")
 
 
+def _raise_for_status(response: httpx.Response) -> None:
+  if response.status_code == httpx.codes.REQUEST_ENTITY_TOO_LARGE:
+    raise EmbeddingBatchTooLargeError("Embedding request payload too large")
+  if response.status_code in (httpx.codes.BAD_REQUEST, httpx.codes.UNPROCESSABLE_ENTITY):
+    detail = response.text.lower()
+    if any(hint in detail for hint in _SIZE_ERROR_HINTS):
+      raise EmbeddingBatchTooLargeError(f"Embedding request exceeds provider limits: {response.text[:200]}")
+  response.raise_for_status()
+
+
+def _check_count(vectors: list[list[float]], texts: Sequence[str]) -> list[list[float]]:
+  if len(vectors) != len(texts):
+    raise EmbeddingError(f"Provider returned {len(vectors)} embeddings for {len(texts)} inputs")
+  return vectors
+
+
 def _infer_provider(settings) -> EmbeddingProvider:
   provider = settings.embed_provider
   if not provider:
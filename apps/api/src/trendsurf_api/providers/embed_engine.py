@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Sequence
+
+import structlog
+
+from ..core.settings import get_settings
+from ..core.tokens import estimate_tokens
+from .embed_cache import EmbeddingCache, get_embedding_cache
+from .embed_client import EmbeddingBatchTooLargeError, EmbeddingError, _infer_provider, embed_texts
+from .types import EmbeddingProvider
+
+logger = structlog.get_logger()
+
+EmbedFn = Callable[..., Awaitable[list[list[float]]]]
+
+# Local Ollama serialises work on the GPU; hosted OpenAI-compatible APIs take more parallelism.
+DEFAULT_CONCURRENCY = {
+  EmbeddingProvider.OLLAMA: 2,
+  EmbeddingProvider.OPENAI_COMPAT: 8,
+}
+
+
+def plan_batches(texts: Sequence[str], *, max_items: int, max_tokens: int) -> list[list[int]]:
+  """Greedily group input indices, in order, under both item and token budgets."""
+  batches: list[list[int]] = []
+  current: list[int] = []
+  current_tokens = 0
+  for index, text in enumerate(texts):
+    tokens = estimate_tokens(text)
+    if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+      batches.append(current)
+      current = []
+      current_tokens = 0
+    current.append(index)
+    current_tokens += tokens
+  if current:
+    batches.append(current)
+  return batches
+
+
+class EmbeddingEngine:
+  """Split large embedding jobs into provider-sized batches and run them concurrently.
+
+  Output order always matches input order. A batch the provider rejects as too large is
+  bisected and retried until it fits; a single text that is still too large is an error.
+  With a cache (EMBED_CACHE_DIR by default), only texts without a stored vector are sent.
+  """
+
+  def __init__(
+    self,
+    *,
+    provider: EmbeddingProvider | None = None,
+    model: str | None = None,
+    max_batch_items: int | None = None,
+    max_batch_tokens: int | None = None,
+    concurrency: int | None = None,
+    embed_fn: EmbedFn | None = None,
+    cache: EmbeddingCache | None | bool = True,
+  ) -> None:
+    settings = get_settings()
+    self.provider = provider or _infer_provider(settings)
+    self.model = model or settings.embed_model
+    self.max_batch_items = max_batch_items or settings.embed_batch_max_items
+    self.max_batch_tokens = max_batch_tokens or settings.embed_batch_max_tokens
+    self.concurrency = concurrency or settings.embed_concurrency or DEFAULT_CONCURRENCY.get(self.provider, 4)
+    self.embed_fn = embed_fn or embed_texts
+    self.dimensions = settings.embed_dimensions
+    self.cache = get_embedding_cache() if cache is True else (cache or None)
+
+  async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+    if not texts:
+      return []
+    if self.cache is None:
+      return await self._embed_uncached(texts)
+
+    keys = [
+      self.cache.make_key(text, provider=self.provider.value, model=self.model or "", dimensions=self.dimensions)
+      for text in texts
+    ]
+    cached = self.cache.get_many(keys)
+    # Identical texts missing from the cache are embedded once.
+    pending: dict[bytes, str] = {}
+    for key, text in zip(keys, texts, strict=True):
+      if key not in cached:
+        pending.setdefault(key, text)
+    if pending:
+      vectors = await self._embed_uncached(list(pending.values()))
+      fresh = list(zip(pending, vectors, strict=True))
+      self.cache.put_many(fresh)
+      computed = dict(fresh)
+    else:
+      computed = {}
+    logger.info("embed.cache", hits=len(texts) - len(pending), sent=len(pending))
+    return [computed[key] if key in computed else cached[key].tolist() for key in keys]
+
+  async def _embed_uncached(self, texts: Sequence[str]) -> list[list[float]]:
+    started = time.perf_counter()
+    results: list[list[float] | None] = [None] * len(texts)
+    semaphore = asyncio.Semaphore(self.concurrency)
+    batches = plan_batches(texts, max_items=self.max_batch_items, max_tokens=self.max_batch_tokens)
+
+    async def run(indices: list[int]) -> None:
+      async with semaphore:
+        vectors = await self._embed_batch([texts[i] for i in indices])
+      for index, vector in zip(indices, vectors, strict=True):
+        results[index] = vector
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    elapsed = time.perf_counter() - started
+    logger.info(
+      "embed.engine",
+      texts=len(texts),
+      batches=len(batches),
+      texts_per_sec=round(len(texts) / elapsed, 1) if elapsed > 0 else None,
+    )
+    if any(vector is None for vector in results):
+      raise EmbeddingError("Embedding engine lost results for some inputs")
+    return results  # type: ignore[return-value]
+
+  async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+    try:
+      return await self.embed_fn(texts, model=self.model, provider=self.provider)
+    except EmbeddingBatchTooLargeError:
+      if len(texts) == 1:
+        raise EmbeddingError("A single text exceeds the embedding provider's input limit") from None
+      middle = len(texts) // 2
+      logger.info("embed.engine.bisect", size=len(texts))
+      left = await self._embed_batch(texts[:middle])
+      right = await self._embed_batch(texts[middle:])
+      return left + right
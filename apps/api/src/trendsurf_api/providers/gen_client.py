@@ -2,8 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-import httpx
-
+from ..core.http import get_http_client
 from ..core.settings import get_settings
 from .types import CompletionResult, GenerationProvider
 
@@ -50,17 +49,17 @@ async def generate_text(
     if max_tokens is not None:
       payload["options"]["num_predict"] = max_tokens
 
-    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
-      response = await client.post("/api/generate", json=payload)
-      response.raise_for_status()
-      data = response.json()
-      return CompletionResult(
-        content=data.get("response", ""),
-        model=data.get("model", model),
-        provider=provider.value,
-        prompt_tokens=data.get("prompt_eval_count"),
-        completion_tokens=data.get("eval_count"),
-      )
+    url = f"{base_url.rstrip('/')}/api/generate"
+    response = await get_http_client(url).post(url, json=payload, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return CompletionResult(
+      content=data.get("response", ""),
+      model=data.get("model", model),
+      provider=provider.value,
+      prompt_tokens=data.get("prompt_eval_count"),
+      completion_tokens=data.get("eval_count"),
+    )
 
   if provider == GenerationProvider.OPENAI_COMPAT:
     base_url = extra.get("base_url") or (str(settings.openai_base_url) if settings.openai_base_url else "https://api.openai.com/v1")
@@ -80,20 +79,20 @@ async def generate_text(
     if max_tokens is not None:
       body["max_tokens"] = max_tokens
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
-      response = await client.post(f"{base_url}/chat/completions", headers=headers, json=body)
-      response.raise_for_status()
-      data = response.json()
-      choice = data["choices"][0]
-      message = choice["message"]["content"]
-      usage = data.get("usage", {})
-      return CompletionResult(
-        content=message,
-        model=data.get("model", model),
-        provider=provider.value,
-        prompt_tokens=usage.get("prompt_tokens"),
-        completion_tokens=usage.get("completion_tokens"),
-      )
+    url = f"{base_url.rstrip('/')}/chat/completions"
+    response = await get_http_client(url).post(url, headers=headers, json=body, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    choice = data["choices"][0]
+    message = choice["message"]["content"]
+    usage = data.get("usage", {})
+    return CompletionResult(
+      content=message,
+      model=data.get("model", model),
+      provider=provider.value,
+      prompt_tokens=usage.get("prompt_tokens"),
+      completion_tokens=usage.get("completion_tokens"),
+    )
 
   raise NotImplementedError(f"Unsupported provider: {provider}")
 
@@ -1,8 +1,98 @@
-from .bootstrap import ensure_collections
+from __future__ import annotations
 
+import argparse
+from datetime import timedelta
 
-def main() -> None:
-  ensure_collections()
+from ..core.settings import get_settings
+from .bootstrap import QUANTIZATION_MODES, ensure_collections, estimate_ram
+from .reindex import Reindexer
+from .search import measure_recall
+
+
+def main(argv: list[str] | None = None) -> None:
+  settings = get_settings()
+  parser = argparse.ArgumentParser(prog="python -m trendsurf_api.vectors")
+  commands = parser.add_subparsers(dest="command")
+  commands.add_parser("bootstrap", help="create missing collections (default)")
+
+  estimate = commands.add_parser("estimate", help="estimate vector RAM per collection layout")
+  estimate.add_argument("--points", type=int, default=100_000)
+  estimate.add_argument("--dims", type=int, default=settings.embed_dimensions)
+  estimate.add_argument("--m", type=int, default=settings.qdrant_hnsw_m)
+
+  recall = commands.add_parser("recall", help="measure recall@k of the configured search params")
+  recall.add_argument("--collection", default=settings.qdrant_collection_papers)
+  recall.add_argument("--sample", type=int, default=100)
+  recall.add_argument("--k", type=int, default=10)
+
+  reindex = commands.add_parser("reindex", help="rebuild the paper collection behind its alias")
+  reindex.add_argument("--no-activate", action="store_true", help="build and validate only")
+  reindex.add_argument("--min-recall", type=float, default=None)
+  reindex.add_argument(
+    "--drop-legacy", action="store_true", help="replace a plain collection that has the alias name"
+  )
+  commands.add_parser("rollback", help="point the alias back at the previous collection")
+  gc = commands.add_parser("gc", help="delete retired collections")
+  gc.add_argument("--keep", type=int, default=None)
+  gc.add_argument("--older-than-days", type=float, default=7.0)
+
+  args = parser.parse_args(argv)
+  if settings.vector_backend == "local" and args.command in ("recall", "reindex", "rollback", "gc"):
+    # The local store searches exactly and has no aliases to swap.
+    parser.error(f"{args.command} needs VECTOR_BACKEND=qdrant")
+  if args.command in ("reindex", "rollback", "gc"):
+    _run_reindex_command(args)
+  elif args.command == "estimate":
+    _print_estimates(args.points, args.dims, args.m)
+  elif args.command == "recall":
+    report = measure_recall(args.collection, sample=args.sample, k=args.k)
+    print(f"{report.collection}: recall@{report.k} = {report.recall:.4f} over {report.queries} queries")
+  else:
+    ensure_collections()
+
+
+def _run_reindex_command(args: argparse.Namespace) -> None:
+  reindexer = Reindexer()
+  if args.command == "reindex":
+    run = reindexer.run(
+      activate=not args.no_activate, min_recall=args.min_recall, drop_legacy=args.drop_legacy
+    )
+    print(f"{run.collection}: {run.status}, {run.points} points")
+  elif args.command == "rollback":
+    run = reindexer.rollback()
+    print(f"{reindexer.alias} -> {run.collection}")
+  else:
+    deleted = reindexer.collect_garbage(keep=args.keep, older_than=timedelta(days=args.older_than_days))
+    print("\n".join(deleted) or "nothing to delete")
+
+
+def _print_estimates(points: int, dims: int, m: int) -> None:
+  settings = get_settings()
+  baseline = estimate_ram(points, dims, mode="none", on_disk=False, m=m).total_bytes
+  print(f"{points:,} points x {dims} dims, hnsw m={m}")
+  print(
+    f"{'quantization':<13}{'originals':<11}{'vectors MiB':>12}{'quant MiB':>11}"
+    f"{'graph MiB':>11}{'total MiB':>11}{'vs f32':>8}"
+  )
+  for mode in QUANTIZATION_MODES:
+    for on_disk in (False, True):
+      if mode == "none" and on_disk:
+        # Without a quantized copy every search reads originals from disk.
+        continue
+      ram = estimate_ram(points, dims, mode=mode, on_disk=on_disk, m=m)
+      current = (
+        mode == settings.qdrant_quantization.lower() and on_disk == settings.qdrant_on_disk_vectors
+      )
+      print(
+        f"{mode:<13}{'disk' if on_disk else 'ram':<11}"
+        f"{_mib(ram.vectors_bytes):>12.1f}{_mib(ram.quantized_bytes):>11.1f}"
+        f"{_mib(ram.graph_bytes):>11.1f}{_mib(ram.total_bytes):>11.1f}"
+        f"{baseline / ram.total_bytes:>7.1f}x{'  <- configured' if current else ''}"
+      )
+
+
+def _mib(value: int) -> float:
+  return value / (1024 * 1024)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Any
 
+import structlog
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
 
 from ..core.settings import get_settings
 from .client import get_qdrant_client
+from .store import get_vector_store
+
+logger = structlog.get_logger()
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+# Qdrant's sizing guidance: in-RAM float vectors cost ~1.5x their raw size once segment
+# and id-tracker overhead is included.
+_VECTOR_OVERHEAD = 1.5
 
 
 def ensure_collections(client: QdrantClient | None = None) -> None:
-  """Create required Qdrant collections if they do not already exist."""
+  """Create required Qdrant collections (or local stores) if they do not already exist."""
   settings = get_settings()
+  if settings.vector_backend == "local":
+    # Opening a local store creates it on disk and checks its dimensions; no server involved.
+    for name in (settings.qdrant_collection_papers, settings.qdrant_collection_topics):
+      get_vector_store(name)
+    return
   client = client or get_qdrant_client()
 
   collections = {
@@ -20,34 +37,141 @@ def ensure_collections(client: QdrantClient | None = None) -> None:
   }
 
   existing = {collection.name for collection in client.get_collections().collections}
+  aliases = {alias.alias_name: alias.collection_name for alias in client.get_aliases().aliases}
 
   for name, config in collections.items():
-    if name in existing:
+    if name in existing or name in aliases:
+      _warn_on_dimension_mismatch(client, aliases.get(name, name), config["vectors"].size)
+      _ensure_payload_indexes(client, aliases.get(name, name), config)
+      continue
+    if name == settings.qdrant_collection_papers:
+      # The paper collection is served through an alias so reindexing can swap it atomically.
+      versioned = versioned_name(name, settings.embed_model or "default", settings.embed_dimensions)
+      create_collection(client, versioned, config)
+      client.update_collection_aliases(
+        change_aliases_operations=[
+          qmodels.CreateAliasOperation(
+            create_alias=qmodels.CreateAlias(collection_name=versioned, alias_name=name)
+          )
+        ]
+      )
       continue
+    create_collection(client, name, config)
+
+
+def versioned_name(alias: str, model: str, dimensions: int, *, now: datetime | None = None) -> str:
+  stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%d%H%M%S")
+  slug = re.sub(r"[^a-z0-9]+", "-", model.lower()).strip("-")
+  return f"{alias}__{slug}_{dimensions}d_{stamp}"
+
 
-    client.create_collection(
-      collection_name=name,
-      vectors_config=config["vectors"],
-      optimizers_config=config["optimizers"],
-      hnsw_config=config["hnsw"],
-      quantization_config=config["quantization"],
-      on_disk_payload=True,
-      shard_number=2,
-      payload_schema=config["payload_schema"],
+def create_collection(client: QdrantClient, name: str, config: dict[str, Any]) -> None:
+  client.create_collection(
+    collection_name=name,
+    vectors_config=config["vectors"],
+    optimizers_config=config["optimizers"],
+    hnsw_config=config["hnsw"],
+    quantization_config=config["quantization"],
+    on_disk_payload=True,
+    shard_number=2,
+  )
+  # `create_collection` has no payload schema argument; indexes are created per field.
+  for field_name, schema in config["payload_schema"].items():
+    client.create_payload_index(collection_name=name, field_name=field_name, field_schema=schema)
+
+
+def _ensure_payload_indexes(client: QdrantClient, collection: str, config: dict[str, Any]) -> None:
+  existing = client.get_collection(collection).payload_schema or {}
+  for field_name, schema in config["payload_schema"].items():
+    if field_name not in existing:
+      logger.info("qdrant.payload_index.create", collection=collection, field=field_name)
+      client.create_payload_index(collection_name=collection, field_name=field_name, field_schema=schema)
+
+
+def _warn_on_dimension_mismatch(client: QdrantClient, collection: str, expected: int) -> None:
+  vectors = client.get_collection(collection).config.params.vectors
+  size = getattr(vectors, "size", None)
+  if size is not None and size != expected:
+    logger.warning(
+      "qdrant.collection.dimension_mismatch",
+      collection=collection,
+      stored=size,
+      configured=expected,
+      hint="run `python -m trendsurf_api.vectors reindex` to rebuild behind the alias",
     )
 
 
+def quantization_config(mode: str | None = None) -> qmodels.QuantizationConfig | None:
+  settings = get_settings()
+  mode = (mode or settings.qdrant_quantization).lower()
+  always_ram = settings.qdrant_quantization_always_ram
+  if mode == "none":
+    return None
+  if mode == "scalar":
+    return qmodels.ScalarQuantization(
+      scalar=qmodels.ScalarQuantizationConfig(
+        type=qmodels.ScalarType.INT8, quantile=settings.qdrant_quantization_quantile, always_ram=always_ram
+      )
+    )
+  if mode == "binary":
+    return qmodels.BinaryQuantization(binary=qmodels.BinaryQuantizationConfig(always_ram=always_ram))
+  raise ValueError(f"Unknown quantization mode {mode!r}; expected one of {', '.join(QUANTIZATION_MODES)}")
+
+
+@dataclass(slots=True)
+class RamEstimate:
+  mode: str
+  on_disk: bool
+  vectors_bytes: int
+  quantized_bytes: int
+  graph_bytes: int
+
+  @property
+  def total_bytes(self) -> int:
+    return self.vectors_bytes + self.quantized_bytes + self.graph_bytes
+
+
+def estimate_ram(
+  points: int, dimensions: int, *, mode: str, on_disk: bool, m: int, graph_on_disk: bool = False
+) -> RamEstimate:
+  """Estimate resident memory for `points` vectors under one collection configuration.
+
+  On-disk originals are only paged in for rescoring and are not counted; the quantized
+  copy is assumed to be pinned in RAM (`always_ram`).
+  """
+  raw = points * dimensions * 4
+  vectors = 0 if on_disk else int(raw * _VECTOR_OVERHEAD)
+  if mode == "scalar":
+    quantized = points * dimensions
+  elif mode == "binary":
+    quantized = points * ((dimensions + 7) // 8)
+  else:
+    quantized = 0
+  # Layer 0 keeps up to 2*m links per point as u32 ids; upper layers add a small fraction.
+  graph = 0 if graph_on_disk else int(points * m * 2 * 4 * 1.1)
+  return RamEstimate(mode, on_disk, vectors, quantized, graph)
+
+
 def _paper_collection_config(vector_size: int) -> dict[str, Any]:
+  settings = get_settings()
   return {
-    "vectors": qmodels.VectorParams(size=vector_size, distance=qmodels.Distance.COSINE),
+    "vectors": qmodels.VectorParams(
+      size=vector_size, distance=qmodels.Distance.COSINE, on_disk=settings.qdrant_on_disk_vectors
+    ),
     "optimizers": qmodels.OptimizersConfigDiff(default_segment_number=2),
-    "hnsw": qmodels.HnswConfigDiff(ef_construct=256, m=32),
-    "quantization": None,
+    "hnsw": qmodels.HnswConfigDiff(
+      ef_construct=settings.qdrant_hnsw_ef_construct,
+      m=settings.qdrant_hnsw_m,
+      on_disk=settings.qdrant_hnsw_on_disk,
+    ),
+    "quantization": quantization_config(),
     "payload_schema": {
       "paper_id": qmodels.PayloadSchemaType.INTEGER,
       "model_name": qmodels.PayloadSchemaType.KEYWORD,
       "dim": qmodels.PayloadSchemaType.INTEGER,
       "created_at": qmodels.PayloadSchemaType.DATETIME,
+      "categories": qmodels.PayloadSchemaType.KEYWORD,
+      "published_at": qmodels.PayloadSchemaType.DATETIME,
     },
   }
 
@@ -13,4 +13,10 @@ def get_qdrant_client() -> QdrantClient:
   if not settings.qdrant_url:
     raise RuntimeError("QDRANT_URL is not configured")
 
-  return QdrantClient(url=str(settings.qdrant_url), api_key=settings.qdrant_api_key)
+  return QdrantClient(
+    url=str(settings.qdrant_url),
+    api_key=settings.qdrant_api_key,
+    prefer_grpc=settings.qdrant_prefer_grpc,
+    grpc_port=settings.qdrant_grpc_port,
+    timeout=int(settings.qdrant_timeout),
+  )
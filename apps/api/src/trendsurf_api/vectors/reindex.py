@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import structlog
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+from sqlalchemy import Row, func, or_, select
+
+from ..core.database import session_scope
+from ..core.http import run_in_worker_loop
+from ..core.settings import get_settings
+from ..models.tables import Paper, VectorCollection
+from ..providers.embed_engine import EmbeddingEngine
+from .bootstrap import _paper_collection_config, create_collection, versioned_name
+from .client import get_qdrant_client
+from .search import measure_recall
+from .store import QdrantVectorStore
+
+logger = structlog.get_logger()
+
+STATUS_BUILDING = "building"
+STATUS_VALIDATED = "validated"
+STATUS_ACTIVE = "active"
+STATUS_RETIRED = "retired"
+STATUS_DELETED = "deleted"
+
+
+class ReindexError(RuntimeError):
+  pass
+
+
+@dataclass(slots=True)
+class ReindexRun:
+  id: int
+  alias: str
+  collection: str
+  embed_model: str
+  embed_dimensions: int
+  status: str
+  checkpoint_id: int | None
+  points: int
+
+  @classmethod
+  def from_row(cls, row: VectorCollection) -> ReindexRun:
+    return cls(
+      id=row.id,
+      alias=row.alias,
+      collection=row.collection,
+      embed_model=row.embed_model,
+      embed_dimensions=row.embed_dimensions,
+      status=row.status,
+      checkpoint_id=row.checkpoint_id,
+      points=row.points,
+    )
+
+
+def paper_text(title: str, abstract: str | None) -> str:
+  return f"{title}\n\n{abstract}" if abstract else title
+
+
+def resolve_alias(alias: str, *, client: QdrantClient | None = None) -> str | None:
+  client = client or get_qdrant_client()
+  for description in client.get_aliases().aliases:
+    if description.alias_name == alias:
+      return description.collection_name
+  return None
+
+
+class Reindexer:
+  """Blue/green rebuild of the paper collection behind a Qdrant alias.
+
+  A versioned shadow collection is created and backfilled from `papers` while the alias
+  keeps serving the old one. Progress is checkpointed in `vector_collections`, so an
+  interrupted run resumes where it stopped. Once counts and sample recall check out, the
+  alias is moved in a single `update_collection_aliases` call. Retired collections stay
+  around for `rollback` until `collect_garbage` removes them.
+  """
+
+  def __init__(
+    self,
+    alias: str | None = None,
+    *,
+    client: QdrantClient | None = None,
+    engine: EmbeddingEngine | None = None,
+    batch_size: int | None = None,
+  ) -> None:
+    settings = get_settings()
+    self.alias = alias or settings.qdrant_collection_papers
+    self.client = client or get_qdrant_client()
+    self.engine = engine or EmbeddingEngine()
+    self.batch_size = batch_size or settings.qdrant_reindex_batch_size
+
+  def run(
+    self, *, activate: bool = True, min_recall: float | None = None, drop_legacy: bool = False
+  ) -> ReindexRun:
+    run = self.start()
+    run = self.backfill(run)
+    run = self.validate(run, min_recall=min_recall)
+    if activate:
+      run = self.activate(run, drop_legacy=drop_legacy)
+    return run
+
+  def start(self) -> ReindexRun:
+    """Resume an unfinished build for the current model/dimensions or create a new one."""
+    settings = get_settings()
+    model = self.engine.model or ""
+    dimensions = settings.embed_dimensions
+    with session_scope() as session:
+      row = session.scalars(
+        select(VectorCollection)
+        .where(
+          VectorCollection.alias == self.alias,
+          VectorCollection.status == STATUS_BUILDING,
+          VectorCollection.embed_model == model,
+          VectorCollection.embed_dimensions == dimensions,
+        )
+        .order_by(VectorCollection.id.desc())
+      ).first()
+      if row is not None and self.client.collection_exists(row.collection):
+        logger.info("vectors.reindex.resume", collection=row.collection, checkpoint=row.checkpoint_id)
+        return ReindexRun.from_row(row)
+      name = versioned_name(self.alias, model, dimensions)
+      create_collection(self.client, name, _paper_collection_config(dimensions))
+      row = VectorCollection(
+        alias=self.alias,
+        collection=name,
+        embed_model=model,
+        embed_dimensions=dimensions,
+        status=STATUS_BUILDING,
+      )
+      session.add(row)
+      session.flush()
+      logger.info("vectors.reindex.created", collection=name, model=model, dimensions=dimensions)
+      return ReindexRun.from_row(row)
+
+  def backfill(self, run: ReindexRun) -> ReindexRun:
+    """Embed and write every paper after the run's checkpoint, checkpointing each page."""
+    store = QdrantVectorStore(run.collection, client=self.client)
+    started = time.perf_counter()
+    written = 0
+    for page in self._iter_pages(run.checkpoint_id):
+      texts = [paper_text(row.title, row.abstract) for row in page]
+      vectors = run_in_worker_loop(self.engine.embed(texts))
+      created_at = datetime.now(timezone.utc).isoformat()
+      store.upsert(
+        (row.id, vector, _payload(row, run, created_at))
+        for row, vector in zip(page, vectors, strict=True)
+      )
+      run.checkpoint_id = page[-1].id
+      run.points += len(page)
+      written += len(page)
+      self._save(run)
+      elapsed = time.perf_counter() - started
+      logger.info(
+        "vectors.reindex.progress",
+        collection=run.collection,
+        checkpoint=run.checkpoint_id,
+        points=run.points,
+        points_per_sec=round(written / elapsed, 1) if elapsed > 0 else None,
+      )
+    return run
+
+  def validate(
+    self, run: ReindexRun, *, min_recall: float | None = None, sample: int = 100
+  ) -> ReindexRun:
+    settings = get_settings()
+    min_recall = settings.qdrant_reindex_min_recall if min_recall is None else min_recall
+    with session_scope() as session:
+      expected = session.scalar(
+        select(func.count(Paper.id)).where(Paper.id <= (run.checkpoint_id or 0))
+      )
+    actual = self.client.count(collection_name=run.collection, exact=True).count
+    if actual != expected:
+      raise ReindexError(f"{run.collection} holds {actual} points, expected {expected}")
+    report = measure_recall(run.collection, client=self.client, sample=sample)
+    logger.info(
+      "vectors.reindex.validated", collection=run.collection, points=actual, recall=report.recall
+    )
+    if report.queries and report.recall < min_recall:
+      raise ReindexError(
+        f"{run.collection} recall@{report.k} {report.recall:.3f} is below {min_recall:.3f}"
+      )
+    run.status = STATUS_VALIDATED
+    self._save(run, recall=report.recall)
+    return run
+
+  def activate(self, run: ReindexRun, *, drop_legacy: bool = False) -> ReindexRun:
+    if run.status not in (STATUS_VALIDATED, STATUS_RETIRED):
+      raise ReindexError(f"{run.collection} is {run.status}; validate it before activating")
+    # Papers ingested while the backfill ran still go to the live alias; copy them over first.
+    if run.status == STATUS_VALIDATED:
+      run = self.backfill(run)
+    current = resolve_alias(self.alias, client=self.client)
+    operations: list[qmodels.AliasOperations] = []
+    if current is not None:
+      operations.append(
+        qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=self.alias))
+      )
+    elif self.client.collection_exists(self.alias):
+      # Aliases cannot shadow a real collection, so the first switch has to drop it.
+      if not drop_legacy:
+        raise ReindexError(
+          f"{self.alias} is a plain collection; pass drop_legacy to replace it with an alias"
+        )
+      logger.warning("vectors.reindex.drop_legacy", collection=self.alias)
+      self.client.delete_collection(self.alias)
+    operations.append(
+      qmodels.CreateAliasOperation(
+        create_alias=qmodels.CreateAlias(collection_name=run.collection, alias_name=self.alias)
+      )
+    )
+    self.client.update_collection_aliases(change_aliases_operations=operations)
+
+    now = datetime.now(timezone.utc)
+    with session_scope() as session:
+      for row in session.scalars(
+        select(VectorCollection).where(
+          VectorCollection.alias == self.alias, VectorCollection.status == STATUS_ACTIVE
+        )
+      ):
+        row.status = STATUS_RETIRED
+        row.retired_at = now
+      if current is not None and current != run.collection:
+        self._record_untracked(session, current, now)
+      row = session.get(VectorCollection, run.id)
+      row.status = STATUS_ACTIVE
+      row.activated_at = now
+      row.retired_at = None
+    run.status = STATUS_ACTIVE
+    logger.info("vectors.reindex.activated", alias=self.alias, collection=run.collection, previous=current)
+    return run
+
+  def rollback(self) -> ReindexRun:
+    """Point the alias back at the most recently retired collection."""
+    with session_scope() as session:
+      rows = session.scalars(
+        select(VectorCollection)
+        .where(VectorCollection.alias == self.alias, VectorCollection.status == STATUS_RETIRED)
+        .order_by(VectorCollection.retired_at.desc())
+      ).all()
+      candidates = [ReindexRun.from_row(row) for row in rows]
+    for candidate in candidates:
+      if self.client.collection_exists(candidate.collection):
+        return self.activate(candidate)
+    raise ReindexError(f"No retained collection to roll {self.alias} back to")
+
+  def collect_garbage(
+    self, *, keep: int | None = None, older_than: timedelta = timedelta(days=7)
+  ) -> list[str]:
+    """Delete retired collections beyond the newest `keep` that were retired before `older_than`."""
+    settings = get_settings()
+    keep = settings.qdrant_reindex_keep if keep is None else keep
+    cutoff = datetime.now(timezone.utc) - older_than
+    deleted: list[str] = []
+    retired = (VectorCollection.alias == self.alias, VectorCollection.status == STATUS_RETIRED)
+    newest = (
+      select(VectorCollection.id)
+      .where(*retired)
+      .order_by(VectorCollection.retired_at.desc())
+      .limit(keep)
+    )
+    with session_scope() as session:
+      rows = session.scalars(
+        select(VectorCollection)
+        .where(
+          *retired,
+          VectorCollection.id.not_in(newest),
+          or_(VectorCollection.retired_at.is_(None), VectorCollection.retired_at <= cutoff),
+        )
+        .order_by(VectorCollection.retired_at.desc())
+      ).all()
+      for row in rows:
+        if self.client.collection_exists(row.collection):
+          self.client.delete_collection(row.collection)
+        row.status = STATUS_DELETED
+        deleted.append(row.collection)
+    logger.info("vectors.reindex.gc", alias=self.alias, deleted=deleted)
+    return deleted
+
+  def _record_untracked(self, session, collection: str, retired_at: datetime) -> None:
+    # Collections created by `ensure_collections` have no row yet; track them so they can be
+    # rolled back to and garbage collected like any other version.
+    exists = session.scalar(
+      select(VectorCollection.id).where(VectorCollection.collection == collection)
+    )
+    if exists is not None:
+      return
+    params = self.client.get_collection(collection).config.params.vectors
+    session.add(
+      VectorCollection(
+        alias=self.alias,
+        collection=collection,
+        embed_model="unknown",
+        embed_dimensions=params.size,
+        status=STATUS_RETIRED,
+        points=self.client.count(collection_name=collection, exact=False).count,
+        retired_at=retired_at,
+      )
+    )
+
+  def _iter_pages(self, after_id: int | None) -> Iterator[list[Row]]:
+    last_id = after_id or 0
+    while True:
+      with session_scope() as session:
+        page = session.execute(
+          select(
+            Paper.id,
+            Paper.title,
+            Paper.abstract,
+            Paper.primary_category,
+            Paper.meta_json,
+            Paper.published_at,
+          )
+          .where(Paper.id > last_id)
+          .order_by(Paper.id)
+          .limit(self.batch_size)
+        ).all()
+      if not page:
+        return
+      yield page
+      last_id = page[-1].id
+
+  def _save(self, run: ReindexRun, *, recall: float | None = None) -> None:
+    with session_scope() as session:
+      row = session.get(VectorCollection, run.id)
+      row.status = run.status
+      row.checkpoint_id = run.checkpoint_id
+      row.points = run.points
+      if recall is not None:
+        row.recall = recall
+
+
+def _payload(row: Row, run: ReindexRun, created_at: str) -> dict:
+  # `categories` and `published_at` carry payload indexes so searches can pre-filter on them.
+  categories = set((row.meta_json or {}).get("categories") or [])
+  if row.primary_category:
+    categories.add(row.primary_category)
+  return {
+    "paper_id": row.id,
+    "model_name": run.embed_model,
+    "dim": run.embed_dimensions,
+    "created_at": created_at,
+    "categories": sorted(categories),
+    "published_at": row.published_at.isoformat() if row.published_at else None,
+  }
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from ..core.settings import get_settings
+from .client import get_qdrant_client
+
+
+def search_params(
+  *, exact: bool = False, hnsw_ef: int | None = None, quantization: str | None = None
+) -> qmodels.SearchParams:
+  """Query-time parameters matching the collection's quantization.
+
+  Quantized candidates are oversampled and rescored against the original vectors, so
+  recall stays close to float32 while the scan itself runs on the compressed index.
+  """
+  settings = get_settings()
+  mode = (quantization or settings.qdrant_quantization).lower()
+  rescoring = None
+  if mode != "none":
+    rescoring = qmodels.QuantizationSearchParams(
+      rescore=settings.qdrant_search_rescore, oversampling=settings.qdrant_search_oversampling
+    )
+  return qmodels.SearchParams(
+    hnsw_ef=hnsw_ef or settings.qdrant_search_hnsw_ef, exact=exact, quantization=rescoring
+  )
+
+
+@dataclass(slots=True)
+class RecallReport:
+  collection: str
+  queries: int
+  k: int
+  recall: float
+
+
+def measure_recall(
+  collection: str,
+  *,
+  client: QdrantClient | None = None,
+  sample: int = 100,
+  k: int = 10,
+  params: qmodels.SearchParams | None = None,
+) -> RecallReport:
+  """Recall@k of approximate search against exact search, using stored vectors as queries.
+
+  Queries are a random sample of the collection: the first scroll page is the lowest ids,
+  i.e. the oldest papers, which would hide recall loss on recently added ones.
+  """
+  client = client or get_qdrant_client()
+  params = params or search_params()
+  exact = qmodels.SearchParams(exact=True, quantization=qmodels.QuantizationSearchParams(ignore=True))
+  points = client.query_points(
+    collection_name=collection,
+    query=qmodels.SampleQuery(sample=qmodels.Sample.RANDOM),
+    limit=sample,
+    with_vectors=True,
+    with_payload=False,
+  ).points
+  hits = 0
+  for point in points:
+    truth = client.query_points(
+      collection_name=collection, query=point.vector, limit=k, search_params=exact, with_payload=False
+    ).points
+    approx = client.query_points(
+      collection_name=collection, query=point.vector, limit=k, search_params=params, with_payload=False
+    ).points
+    hits += len({hit.id for hit in truth} & {hit.id for hit in approx})
+  total = len(points) * k
+  return RecallReport(collection, len(points), k, hits / total if total else 0.0)
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import json
+import math
+import operator
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cache
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Protocol, Sequence
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from ..core.settings import get_settings
+from .client import get_qdrant_client
+from .search import search_params
+from .writer import PointId, QdrantVectorWriter, VectorRecord
+
+# Filters are a small subset of Qdrant's: {"field": value} matches equality (or membership
+# for list payloads), {"field": [a, b]} matches any of the values, and
+# {"field": {"gte": x, "lt": y}} is a range over numbers or ISO datetimes.
+Filters = Mapping[str, Any]
+_RANGE_KEYS = ("gt", "gte", "lt", "lte")
+_RANGE_OPS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+@dataclass(slots=True)
+class SearchHit:
+  id: PointId
+  score: float
+  payload: dict[str, Any]
+
+
+class VectorStore(Protocol):
+  def upsert(self, records: Iterable[VectorRecord]) -> int: ...
+
+  def search(
+    self, vector: Sequence[float] | np.ndarray, *, limit: int = 10, filters: Filters | None = None
+  ) -> list[SearchHit]: ...
+
+  def get_vectors(self, ids: Sequence[PointId]) -> dict[PointId, np.ndarray]: ...
+
+  def delete(self, ids: Sequence[PointId]) -> int: ...
+
+  def count(self) -> int: ...
+
+
+class QdrantVectorStore:
+  """`VectorStore` over a Qdrant collection (or alias)."""
+
+  def __init__(self, collection: str, *, client: QdrantClient | None = None) -> None:
+    self.collection = collection
+    self.client = client or get_qdrant_client()
+
+  def upsert(self, records: Iterable[VectorRecord]) -> int:
+    return QdrantVectorWriter(self.collection, client=self.client).write(records).points
+
+  def search(
+    self, vector: Sequence[float] | np.ndarray, *, limit: int = 10, filters: Filters | None = None
+  ) -> list[SearchHit]:
+    response = self.client.query_points(
+      collection_name=self.collection,
+      query=np.asarray(vector, dtype=np.float32).tolist(),
+      query_filter=qdrant_filter(filters),
+      search_params=search_params(),
+      limit=limit,
+      with_payload=True,
+    )
+    return [SearchHit(point.id, point.score, point.payload or {}) for point in response.points]
+
+  def get_vectors(self, ids: Sequence[PointId]) -> dict[PointId, np.ndarray]:
+    points = self.client.retrieve(
+      collection_name=self.collection, ids=list(ids), with_vectors=True, with_payload=False
+    )
+    return {point.id: np.asarray(point.vector, dtype=np.float32) for point in points}
+
+  def delete(self, ids: Sequence[PointId]) -> int:
+    self.client.delete(
+      collection_name=self.collection, points_selector=qmodels.PointIdsList(points=list(ids))
+    )
+    return len(ids)
+
+  def count(self) -> int:
+    return self.client.count(collection_name=self.collection, exact=True).count
+
+
+def qdrant_filter(filters: Filters | None) -> qmodels.Filter | None:
+  if not filters:
+    return None
+  conditions: list[qmodels.Condition] = []
+  for key, value in filters.items():
+    if isinstance(value, Mapping):
+      bounds = {name: value[name] for name in _RANGE_KEYS if name in value}
+      if any(isinstance(bound, (str, datetime)) for bound in bounds.values()):
+        conditions.append(qmodels.FieldCondition(key=key, range=qmodels.DatetimeRange(**bounds)))
+      else:
+        conditions.append(qmodels.FieldCondition(key=key, range=qmodels.Range(**bounds)))
+    elif isinstance(value, (list, tuple, set)):
+      conditions.append(qmodels.FieldCondition(key=key, match=qmodels.MatchAny(any=list(value))))
+    else:
+      conditions.append(qmodels.FieldCondition(key=key, match=qmodels.MatchValue(value=value)))
+  return qmodels.Filter(must=conditions)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+  row INTEGER PRIMARY KEY,
+  point_id TEXT NOT NULL UNIQUE,
+  payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+"""
+
+
+class LocalVectorStore:
+  """In-process cosine index: a memory-mapped float32 matrix plus a SQLite payload table.
+
+  Vectors are normalised on write, so a query is one matrix-vector product over the live
+  rows (optionally pre-filtered on payload) followed by `argpartition` for the top-k.
+  Rows freed by deletes are reused. Everything persists under `root`.
+  """
+
+  def __init__(self, root: str | Path, *, dimensions: int, initial_capacity: int = 1024) -> None:
+    self.root = Path(root)
+    self.root.mkdir(parents=True, exist_ok=True)
+    self.dimensions = dimensions
+    self._lock = threading.RLock()
+    self._db = sqlite3.connect(self.root / "payloads.sqlite3", check_same_thread=False)
+    self._db.execute("PRAGMA journal_mode = WAL")
+    self._db.executescript(_SCHEMA)
+    stored = self._db.execute("SELECT value FROM meta WHERE key = 'dimensions'").fetchone()
+    if stored is not None and int(stored[0]) != dimensions:
+      raise ValueError(f"{self.root} holds {stored[0]}-dimensional vectors, not {dimensions}")
+    with self._db:
+      self._db.execute(
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('dimensions', ?)", (str(dimensions),)
+      )
+
+    self._rows: dict[PointId, int] = {}
+    self._ids: list[PointId | None] = []
+    self._payloads: list[dict[str, Any] | None] = []
+    stored_points = self._db.execute("SELECT row, point_id, payload FROM points ORDER BY row")
+    for row, point_id, payload in stored_points:
+      self._place(row, json.loads(point_id), json.loads(payload))
+    self._size = len(self._ids)
+    self._free = [row for row, point_id in enumerate(self._ids) if point_id is None]
+    self._vectors = self._open_matrix(max(initial_capacity, self._size))
+    self._alive = np.zeros(self._vectors.shape[0], dtype=bool)
+    self._alive[list(self._rows.values())] = True
+    self._columns: dict[str, np.ndarray] = {}
+    self._ranges: dict[str, np.ndarray] = {}
+    self._indexes: dict[str, dict[Any, np.ndarray]] = {}
+
+  def upsert(self, records: Iterable[VectorRecord]) -> int:
+    written = 0
+    with self._lock:
+      rows: list[tuple[int, str, str]] = []
+      for point_id, vector, payload in records:
+        row = self._rows.get(point_id)
+        if row is None:
+          row = self._free.pop() if self._free else self._append_row()
+        self._vectors[row] = _normalize(np.asarray(vector, dtype=np.float32))
+        self._place(row, point_id, payload or {})
+        self._alive[row] = True
+        rows.append((row, json.dumps(point_id), json.dumps(payload or {}, default=_json_default)))
+        written += 1
+      with self._db:
+        self._db.executemany(
+          "INSERT INTO points (row, point_id, payload) VALUES (?, ?, ?) "
+          "ON CONFLICT (row) DO UPDATE SET point_id = excluded.point_id, payload = excluded.payload",
+          rows,
+        )
+      self._vectors.flush()
+      self._columns.clear()
+      self._ranges.clear()
+      self._indexes.clear()
+    return written
+
+  def search(
+    self, vector: Sequence[float] | np.ndarray, *, limit: int = 10, filters: Filters | None = None
+  ) -> list[SearchHit]:
+    query = _normalize(np.asarray(vector, dtype=np.float32))
+    with self._lock:
+      mask = self._alive[: self._size]
+      if filters:
+        mask = mask & self._filter_mask(filters)
+      candidates = np.flatnonzero(mask)
+      if candidates.size == 0 or limit <= 0:
+        return []
+      if candidates.size == self._size:
+        scores = self._vectors[: self._size] @ query
+      else:
+        scores = self._vectors[candidates] @ query
+      k = min(limit, candidates.size)
+      top = np.argpartition(-scores, k - 1)[:k]
+      top = top[np.argsort(-scores[top], kind="stable")]
+      rows = candidates[top]
+      return [
+        SearchHit(self._ids[row], float(scores[index]), dict(self._payloads[row] or {}))
+        for row, index in zip(rows, top, strict=True)
+      ]
+
+  def get_vectors(self, ids: Sequence[PointId]) -> dict[PointId, np.ndarray]:
+    with self._lock:
+      return {
+        point_id: np.array(self._vectors[self._rows[point_id]])
+        for point_id in ids
+        if point_id in self._rows
+      }
+
+  def delete(self, ids: Sequence[PointId]) -> int:
+    with self._lock:
+      rows = [self._rows.pop(point_id) for point_id in ids if point_id in self._rows]
+      for row in rows:
+        self._ids[row] = None
+        self._payloads[row] = None
+        self._alive[row] = False
+        self._vectors[row] = 0.0
+        self._free.append(row)
+      with self._db:
+        self._db.executemany("DELETE FROM points WHERE row = ?", [(row,) for row in rows])
+      self._vectors.flush()
+      self._columns.clear()
+      self._ranges.clear()
+      self._indexes.clear()
+    return len(rows)
+
+  def count(self) -> int:
+    return len(self._rows)
+
+  def close(self) -> None:
+    self._vectors.flush()
+    self._db.close()
+
+  def _place(self, row: int, point_id: PointId, payload: dict[str, Any]) -> None:
+    while len(self._ids) <= row:
+      self._ids.append(None)
+      self._payloads.append(None)
+    self._ids[row] = point_id
+    self._payloads[row] = payload
+    self._rows[point_id] = row
+
+  def _append_row(self) -> int:
+    row = self._size
+    if row >= self._vectors.shape[0]:
+      self._grow(self._vectors.shape[0] * 2)
+    self._size += 1
+    return row
+
+  def _grow(self, capacity: int) -> None:
+    self._vectors.flush()
+    del self._vectors
+    self._vectors = self._open_matrix(capacity)
+    alive = np.zeros(capacity, dtype=bool)
+    alive[: self._alive.size] = self._alive
+    self._alive = alive
+
+  def _open_matrix(self, capacity: int) -> np.memmap:
+    path = self.root / "vectors.f32"
+    row_bytes = self.dimensions * 4
+    current = path.stat().st_size // row_bytes if path.exists() else 0
+    if current < capacity:
+      with open(path, "ab") as handle:
+        handle.truncate(capacity * row_bytes)
+    capacity = max(capacity, current)
+    return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dimensions))
+
+  def _filter_mask(self, filters: Filters) -> np.ndarray:
+    mask = np.ones(self._size, dtype=bool)
+    for key, expected in filters.items():
+      if isinstance(expected, Mapping):
+        values = self._range_column(key)
+        for name, bound in expected.items():
+          if name in _RANGE_OPS:
+            mask &= _RANGE_OPS[name](values, _range_value(bound))
+      else:
+        wanted = expected if isinstance(expected, (list, tuple, set)) else [expected]
+        index = self._keyword_index(key)
+        matched = np.zeros(self._size, dtype=bool)
+        for value in wanted:
+          rows = index.get(value)
+          if rows is not None:
+            matched[rows] = True
+        mask &= matched
+    return mask
+
+  def _keyword_index(self, key: str) -> dict[Any, np.ndarray]:
+    # value -> rows holding it (list payloads contribute each element); rebuilt after writes.
+    index = self._indexes.get(key)
+    if index is None:
+      grouped: dict[Any, list[int]] = {}
+      for row, value in enumerate(self._column(key)):
+        for item in value if isinstance(value, list) else (value,):
+          if item is not None:
+            grouped.setdefault(item, []).append(row)
+      index = {value: np.asarray(rows, dtype=np.intp) for value, rows in grouped.items()}
+      self._indexes[key] = index
+    return index
+
+  def _range_column(self, key: str) -> np.ndarray:
+    # Range filters compare numbers, with datetimes as UTC epoch seconds; NaN never matches.
+    values = self._ranges.get(key)
+    if values is None:
+      values = np.fromiter(map(_range_value, self._column(key)), np.float64, self._size)
+      self._ranges[key] = values
+    return values
+
+  def _column(self, key: str) -> np.ndarray:
+    column = self._columns.get(key)
+    if column is None:
+      column = np.empty(self._size, dtype=object)
+      column[:] = [payload.get(key) if payload else None for payload in self._payloads[: self._size]]
+      self._columns[key] = column
+    return column
+
+
+def _json_default(value: Any) -> Any:
+  if isinstance(value, datetime):
+    return value.isoformat()
+  return str(value)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+  norm = float(np.linalg.norm(vector))
+  return vector / norm if norm else vector
+
+
+def _range_value(value: Any) -> float:
+  # ISO strings are parsed rather than compared as text, so offsets and precision differences
+  # ("...Z" vs "+00:00", missing microseconds) order correctly. Naive times are UTC, as in Qdrant.
+  if isinstance(value, str):
+    try:
+      value = datetime.fromisoformat(value)
+    except ValueError:
+      return math.nan
+  if isinstance(value, datetime):
+    if value.tzinfo is None:
+      value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+  if isinstance(value, (int, float)) and not isinstance(value, bool):
+    return float(value)
+  return math.nan
+
+
+@cache
+def get_vector_store(collection: str) -> VectorStore:
+  """Return the configured backend (`VECTOR_BACKEND=qdrant|local`) for `collection`."""
+  settings = get_settings()
+  if settings.vector_backend == "local":
+    if not settings.vector_local_dir:
+      raise RuntimeError("VECTOR_LOCAL_DIR must be configured for the local vector backend")
+    return LocalVectorStore(
+      Path(settings.vector_local_dir) / collection, dimensions=settings.embed_dimensions
+    )
+  return QdrantVectorStore(collection)
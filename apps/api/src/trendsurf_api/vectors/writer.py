@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+import structlog
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from ..core.settings import get_settings
+from .client import get_qdrant_client
+
+logger = structlog.get_logger()
+
+PROGRESS_INTERVAL_S = 10.0
+
+PointId = int | str
+VectorRecord = tuple[PointId, Sequence[float] | np.ndarray, dict[str, Any] | None]
+
+
+class VectorWriteError(RuntimeError):
+  def __init__(self, message: str, report: WriteReport) -> None:
+    super().__init__(message)
+    self.report = report
+
+
+@dataclass(slots=True)
+class WriteReport:
+  collection: str
+  points: int = 0
+  batches: int = 0
+  retries: int = 0
+  failed_ids: list[PointId] = field(default_factory=list)
+  elapsed: float = 0.0
+
+  @property
+  def points_per_sec(self) -> float:
+    return self.points / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class QdrantVectorWriter:
+  """Stream `(id, vector, payload)` records into a collection in parallel batches.
+
+  Batches are sent from a small thread pool, with at most `2 * parallel` batches buffered so
+  an unbounded input stream never piles up in memory. Each failed batch is retried with
+  jittered backoff. Every batch is sent with `wait=True`: an acknowledgement for one batch
+  says nothing about other shards, so only waiting on all of them guarantees that every
+  point is searchable and counted once `write` returns. Throughput comes from the parallel
+  requests, not from skipping the wait.
+  """
+
+  def __init__(
+    self,
+    collection: str,
+    *,
+    client: QdrantClient | None = None,
+    batch_size: int | None = None,
+    parallel: int | None = None,
+    max_retries: int | None = None,
+    retry_backoff: float = 0.5,
+  ) -> None:
+    settings = get_settings()
+    self.collection = collection
+    self.client = client or get_qdrant_client()
+    self.batch_size = batch_size or settings.qdrant_upsert_batch_size
+    self.parallel = parallel or settings.qdrant_upsert_parallel
+    self.max_retries = settings.qdrant_upsert_retries if max_retries is None else max_retries
+    self.retry_backoff = retry_backoff
+    self._lock = threading.Lock()
+
+  def write(self, records: Iterable[VectorRecord]) -> WriteReport:
+    report = WriteReport(collection=self.collection)
+    started = time.perf_counter()
+    in_flight: set[Future[None]] = set()
+    last_progress = started
+
+    with ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix="qdrant-upsert") as pool:
+      for batch in _iter_batches(records, self.batch_size):
+        if len(in_flight) >= self.parallel * 2:
+          _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        if time.perf_counter() - last_progress >= PROGRESS_INTERVAL_S:
+          last_progress = time.perf_counter()
+          self._log_progress(report, started)
+        in_flight.add(pool.submit(self._upsert, batch, report))
+      wait(in_flight)
+
+    report.elapsed = time.perf_counter() - started
+    logger.info(
+      "qdrant.write.complete",
+      collection=self.collection,
+      points=report.points,
+      batches=report.batches,
+      retries=report.retries,
+      failed=len(report.failed_ids),
+      points_per_sec=round(report.points_per_sec, 1),
+    )
+    if report.failed_ids:
+      raise VectorWriteError(
+        f"{len(report.failed_ids)} points could not be written to {self.collection}", report
+      )
+    return report
+
+  def _upsert(self, batch: list[VectorRecord], report: WriteReport) -> None:
+    ids = [point_id for point_id, _, _ in batch]
+    points = qmodels.Batch(
+      ids=ids,
+      vectors=[_as_list(vector) for _, vector, _ in batch],
+      payloads=[payload or {} for _, _, payload in batch],
+    )
+    for attempt in range(self.max_retries + 1):
+      try:
+        self.client.upsert(collection_name=self.collection, points=points, wait=True)
+        break
+      except Exception as exc:  # noqa: BLE001 - transport errors differ between REST and gRPC
+        if attempt >= self.max_retries:
+          logger.warning(
+            "qdrant.write.batch_failed", collection=self.collection, size=len(batch), error=str(exc)
+          )
+          with self._lock:
+            report.failed_ids.extend(ids)
+          return
+        with self._lock:
+          report.retries += 1
+        # Jitter only spreads retries out; it needs no cryptographic randomness.
+        time.sleep(random.uniform(0, self.retry_backoff * 2**attempt))  # noqa: S311
+    with self._lock:
+      report.points += len(batch)
+      report.batches += 1
+
+  def _log_progress(self, report: WriteReport, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    logger.info(
+      "qdrant.write.progress",
+      collection=self.collection,
+      points=report.points,
+      points_per_sec=round(report.points / elapsed, 1) if elapsed > 0 else None,
+    )
+
+
+def write_vectors(collection: str, records: Iterable[VectorRecord], **kwargs: Any) -> WriteReport:
+  return QdrantVectorWriter(collection, **kwargs).write(records)
+
+
+def _iter_batches(records: Iterable[VectorRecord], size: int) -> Iterator[list[VectorRecord]]:
+  iterator = iter(records)
+  while batch := list(islice(iterator, size)):
+    yield batch
+
+
+def _as_list(vector: Sequence[float] | np.ndarray) -> list[float]:
+  if isinstance(vector, np.ndarray):
+    return vector.astype(np.float32).tolist()
+  return list(vector)
@@ -0,0 +1,35 @@
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from trendsurf_api.core import database as core_database
+from trendsurf_api.models.base import Base
+
+
+@compiles(JSONB, "sqlite")
+@compiles(ARRAY, "sqlite")
+def _sqlite_json(type_, compiler, **kwargs) -> str:
+  return "JSON"
+
+
+@pytest.fixture
+def database(monkeypatch) -> Iterator[sessionmaker[Session]]:
+  """Point `session_scope` at an in-memory SQLite database holding the full schema.
+
+  Postgres-only column types are stored as JSON; ARRAY columns can be created but not bound,
+  so tests leave them empty.
+  """
+  engine = create_engine(
+    "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+  )
+  Base.metadata.create_all(engine)
+  factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+  monkeypatch.setattr(core_database, "_engine", engine)
+  monkeypatch.setattr(core_database, "_SessionFactory", factory)
+  yield factory
+  engine.dispose()
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+from trendsurf_api.ingestion.arxiv_client import iter_feed, parse_feed
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>ArXiv Query</title>
+  <entry>
+    <id>http://arxiv.org/abs/2406.00001v2</id>
+    <updated>2024-06-02T08:30:00Z</updated>
+    <published>2024-06-01T12:00:00Z</published>
+    <title>  Sparse Mixtures of Experts </title>
+    <summary> Routing tokens to experts. </summary>
+    <author><name>Ada Lovelace</name></author>
+    <author><name> </name></author>
+    <link href="http://arxiv.org/abs/2406.00001v2" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2406.00001v2" rel="related" type="application/pdf"/>
+    <arxiv:primary_category term="cs.LG"/>
+    <category term="cs.LG"/>
+    <category term="stat.ML"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2406.00002v1</id>
+    <title>Second</title>
+    <summary>Another abstract.</summary>
+  </entry>
+</feed>
+"""
+
+
+def test_streaming_parser_handles_arbitrary_chunk_boundaries() -> None:
+  whole = list(parse_feed(FEED))
+  chunked = list(iter_feed(FEED[i : i + 7] for i in range(0, len(FEED), 7)))
+  assert chunked == whole
+  assert [paper.source_id for paper in whole] == ["2406.00001v2", "2406.00002v1"]
+
+  first = whole[0]
+  assert first.title == "Sparse Mixtures of Experts"
+  assert first.summary == "Routing tokens to experts."
+  assert first.authors == ["Ada Lovelace"]
+  assert first.updated_at == datetime(2024, 6, 2, 8, 30, tzinfo=timezone.utc)
+  assert first.pdf_url == "http://arxiv.org/pdf/2406.00001v2"
+  assert first.html_url == "http://arxiv.org/abs/2406.00001v2"
+  assert first.primary_category == "cs.LG"
+  assert first.categories == ["cs.LG", "stat.ML"]
+  assert first.entry_id == "http://arxiv.org/abs/2406.00001v2"
+  assert not hasattr(first, "__dict__")
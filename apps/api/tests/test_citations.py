@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from trendsurf_api.analysis import citations
+from trendsurf_api.analysis.citations import CitationIndex, CitedPaper, MinHasher, reference_keys
+from trendsurf_api.parsing.tei_parser import Reference
+
+NOW = datetime(2024, 6, 20, tzinfo=timezone.utc)
+
+
+def _at(year: int, month: int) -> datetime:
+  return datetime(year, month, 15, tzinfo=timezone.utc)
+
+
+def _title_word(number: int) -> str:
+  return "".join(chr(ord("a") + int(digit)) for digit in str(number))
+
+
+def _references(start: int, count: int) -> list[str]:
+  return [f"Sparse {_title_word(i)} attention kernels. Smith J. NeurIPS 2023" for i in range(start, start + count)]
+
+
+def test_reference_keys_extract_identifiers_and_title_words() -> None:
+  keys = reference_keys(
+    [
+      "Attention is all you need. Vaswani A. arXiv:1706.03762v5 2017",
+      "Deep residual learning for image recognition. He K. CVPR. doi:10.1109/CVPR.2016.90.",
+      "Ok. 2020",
+    ]
+  )
+
+  assert keys == {
+    "arxiv:1706.03762",
+    "doi:10.1109/cvpr.2016.90",
+    "ref:attention is all you need",
+    "ref:deep residual learning for image recognition",
+  }
+
+
+def test_reference_keys_ignore_how_authors_and_venues_are_written() -> None:
+  first = Reference("Attention is all you need", {"arxiv": "arXiv:1706.03762v2"})
+  second = Reference("Attention Is All You Need", {"doi": "10.5555/3295222.3295349"})
+
+  assert reference_keys([first]) == {"ref:attention is all you need", "arxiv:1706.03762"}
+  assert reference_keys([first]) & reference_keys([second]) == {"ref:attention is all you need"}
+
+
+def test_signature_agreement_estimates_jaccard() -> None:
+  hasher = MinHasher(256)
+  left = {f"key{i}" for i in range(100)}
+  right = {f"key{i}" for i in range(50, 150)}
+  signatures, sizes = hasher.signatures([left, right, set()])
+
+  assert signatures.dtype == np.uint32 and signatures.shape == (3, 256)
+  assert sizes.tolist() == [100, 100, 0]
+  assert abs((signatures[0] == signatures[1]).mean() - 1 / 3) < 0.08
+
+
+def test_signatures_do_not_depend_on_the_chunk_size(monkeypatch) -> None:
+  hasher = MinHasher(64)
+  spans = [(0, 7), (3, 0), (5, 20), (40, 1)]
+  key_sets = [{f"key{i}" for i in range(start, start + size)} for start, size in spans]
+  expected, sizes = hasher.signatures(key_sets)
+
+  monkeypatch.setattr(citations, "_CHUNK_KEYS", 3)
+  chunked, chunked_sizes = hasher.signatures(key_sets)
+
+  assert np.array_equal(chunked, expected) and np.array_equal(chunked_sizes, sizes)
+  assert (chunked[1] == np.iinfo(np.uint32).max).all()
+
+
+def test_score_finds_overlapping_papers_and_skips_unrelated(tmp_path) -> None:
+  index = CitationIndex(tmp_path, num_perm=128, bands=32, neighbours=1)
+  papers = [CitedPaper(i, _references(i * 40, 40), _at(2024, 5)) for i in range(200)]
+  index.update(papers)
+
+  near, far, empty = index.score(
+    [_references(7 * 40, 36) + _references(90_000, 4), _references(50_000, 40), []],
+    paper_ids=[None, None, None],
+    now=NOW,
+  )
+
+  assert near.neighbours[0][0] == 7 and near.overlap > 0.6
+  assert near.candidates < 5 and near.points < 1.0
+  assert far.candidates == 0 and far.points == 2.0
+  assert empty is None
+
+  (own,) = index.score([papers[3].references], paper_ids=[3], now=NOW)
+  assert all(paper_id != 3 for paper_id, _ in own.neighbours)
+
+
+def test_update_replaces_papers_persists_and_expires(tmp_path) -> None:
+  index = CitationIndex(tmp_path, num_perm=64, bands=16, neighbours=1)
+  index.update([CitedPaper(1, _references(0, 20), _at(2024, 5)), CitedPaper(2, _references(100, 20), _at(2024, 6))])
+  # Re-parsed with a new publication month: the row moves instead of being duplicated.
+  index.update([CitedPaper(1, _references(200, 20), _at(2024, 6))])
+
+  reloaded = CitationIndex(tmp_path, num_perm=64, bands=16, neighbours=1)
+  (moved,) = reloaded.score([_references(200, 20)], now=NOW)
+  assert moved.neighbours == [(1, 1.0)]
+  assert reloaded.months == ["2024-05", "2024-06"]
+
+  assert reloaded.expire(now=datetime(2025, 5, 1, tzinfo=timezone.utc)) == ["2024-05"]
+  assert 2 in reloaded and not (tmp_path / "2024-05").exists()
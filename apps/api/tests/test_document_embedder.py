@@ -0,0 +1,60 @@
+import asyncio
+
+import numpy as np
+
+from trendsurf_api.parsing.chunker import iter_chunks
+from trendsurf_api.parsing.tei_parser import ParsedDocument, Section
+from trendsurf_api.providers.document_embedder import embed_document
+from trendsurf_api.providers.embed_engine import EmbeddingEngine
+from trendsurf_api.providers.types import EmbeddingProvider
+
+SENTENCE = "Sparse experts route each token to a small subset of parameters."
+
+
+def make_document() -> ParsedDocument:
+  return ParsedDocument(
+    title="Sparse Experts",
+    abstract="We study routing.",
+    body=[
+      Section("Introduction", [" ".join([SENTENCE] * 6), SENTENCE]),
+      Section("Empty", []),
+      Section(None, ["x" * 400]),
+    ],
+    references=[],
+  )
+
+
+def test_chunks_stay_in_budget_and_overlap_within_sections() -> None:
+  chunks = list(iter_chunks(make_document(), max_tokens=48, overlap_tokens=16))
+
+  assert chunks[0].is_abstract and chunks[0].text == "Abstract\nWe study routing."
+  assert all(chunk.tokens <= 48 for chunk in chunks)
+  intro = [chunk for chunk in chunks if chunk.section_title == "Introduction"]
+  assert len(intro) > 1 and all(chunk.text.startswith("Introduction\n") for chunk in intro)
+  assert intro[0].text.rsplit(". ", 1)[-1] in intro[1].text
+  assert intro[-1].text.endswith(f"\n{SENTENCE}")
+  assert {chunk.section_index for chunk in chunks} == {None, 0, 2}
+  assert sum(chunk.text.count("x") for chunk in chunks if chunk.section_index == 2) == 400
+  assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+
+
+def test_embed_document_streams_windows_and_pools() -> None:
+  windows: list[int] = []
+
+  async def fake_embed(texts, *, model, provider):
+    windows.append(len(texts))
+    return [[1.0, 0.0] if text.startswith("Abstract") else [0.0, 3.0] for text in texts]
+
+  engine = EmbeddingEngine(
+    provider=EmbeddingProvider.OLLAMA, model="m", max_batch_items=2, embed_fn=fake_embed, cache=False
+  )
+  seen: list[int] = []
+  result = asyncio.run(
+    embed_document(
+      make_document(), engine=engine, on_chunk=lambda chunk, _: seen.append(chunk.index), max_tokens=48
+    )
+  )
+
+  assert max(windows) <= 2 and sum(windows) == result.chunks == len(seen)
+  assert np.isclose(np.linalg.norm(result.vector), 1.0)
+  assert result.vector.dtype == np.float32 and result.vector[1] > result.vector[0] > 0
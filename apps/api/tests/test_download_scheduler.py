@@ -0,0 +1,108 @@
+import asyncio
+from contextlib import aclosing
+from pathlib import Path
+
+from trendsurf_api.ingestion.download_scheduler import DownloadScheduler
+from trendsurf_api.ingestion.pdf_fetcher import PdfDocument, PdfDownloadError, PdfTooLargeError
+
+
+def test_scheduler_limits_per_host_and_retries_transient_errors() -> None:
+  active: dict[str, int] = {}
+  peak: dict[str, int] = {}
+  failures = {"https://arxiv.org/pdf/flaky": 2}
+
+  async def fetcher(url: str, on_body_size=None) -> PdfDocument:
+    host = url.split("/")[2]
+    active[host] = active.get(host, 0) + 1
+    peak[host] = max(peak.get(host, 0), active[host])
+    try:
+      await asyncio.sleep(0.01)
+      if failures.get(url, 0) > 0:
+        failures[url] -= 1
+        raise PdfDownloadError("connection reset")
+      if url.endswith("huge"):
+        raise PdfTooLargeError("too big")
+      return PdfDocument(
+        path=Path("/dev/null"), size=1000, checksum="x", content_type=None, etag=None, last_modified=None
+      )
+    finally:
+      active[host] -= 1
+
+  scheduler = DownloadScheduler(
+    per_host_limit=2, host_delay_ms=0, max_inflight_mb=64, retries=3, backoff_base=0.001, fetcher=fetcher
+  )
+  urls = [f"https://arxiv.org/pdf/{i}" for i in range(6)] + [
+    "https://arxiv.org/pdf/flaky",
+    "https://arxiv.org/pdf/huge",
+    "https://mirror.example/pdf/1",
+  ]
+  results = {result.url: result for result in asyncio.run(scheduler.download_all(urls))}
+
+  assert peak["arxiv.org"] == 2
+  assert results["https://arxiv.org/pdf/flaky"].ok
+  assert results["https://arxiv.org/pdf/flaky"].attempts == 3
+  assert not results["https://arxiv.org/pdf/huge"].ok
+  assert results["https://arxiv.org/pdf/huge"].attempts == 1
+  assert scheduler.budget.in_flight == 0
+
+
+def test_downloads_queued_behind_a_busy_host_do_not_hold_the_budget() -> None:
+  async def fetcher(url: str, on_body_size=None) -> PdfDocument:
+    await asyncio.sleep(0.01)
+    return PdfDocument(
+      path=Path("/dev/null"), size=1000, checksum="x", content_type=None, etag=None, last_modified=None
+    )
+
+  scheduler = DownloadScheduler(
+    per_host_limit=1, host_delay_ms=0, max_inflight_mb=8, expected_mb=4, retries=1, fetcher=fetcher
+  )
+  urls = [f"https://arxiv.org/pdf/{i}" for i in range(4)] + ["https://mirror.example/pdf/1"]
+  results = asyncio.run(scheduler.download_all(urls))
+
+  assert all(result.ok for result in results)
+  # The mirror download runs alongside the first arxiv.org one instead of waiting for budget
+  # held by the arxiv.org queue.
+  assert "https://mirror.example/pdf/1" in {result.url for result in results[:2]}
+
+
+def test_budget_holds_the_announced_body_size() -> None:
+  peak = 0
+
+  async def fetcher(url: str, on_body_size) -> PdfDocument:
+    nonlocal peak
+    await on_body_size(24 * 1024 * 1024)
+    peak = max(peak, scheduler.budget.in_flight)
+    await asyncio.sleep(0.01)
+    return PdfDocument(
+      path=Path("/dev/null"), size=1000, checksum="x", content_type=None, etag=None, last_modified=None
+    )
+
+  scheduler = DownloadScheduler(
+    per_host_limit=4, host_delay_ms=0, max_inflight_mb=32, expected_mb=4, retries=1, fetcher=fetcher
+  )
+  urls = [f"https://arxiv.org/pdf/{i}" for i in range(3)]
+  results = asyncio.run(scheduler.download_all(urls))
+
+  # Three 4 MB reservations fit, but only one 24 MB body at a time.
+  assert all(result.ok for result in results)
+  assert peak == 24 * 1024 * 1024
+  assert scheduler.budget.in_flight == 0
+
+
+def test_stopping_early_discards_undelivered_downloads(tmp_path) -> None:
+  async def fetcher(url: str, on_body_size=None) -> PdfDocument:
+    await asyncio.sleep(1 if url.endswith("slow") else 0)
+    path = tmp_path / url.rsplit("/", 1)[-1]
+    path.write_bytes(b"%PDF")
+    return PdfDocument(path=path, size=4, checksum="x", content_type=None, etag=None, last_modified=None)
+
+  scheduler = DownloadScheduler(per_host_limit=4, host_delay_ms=0, retries=1, fetcher=fetcher)
+
+  async def first() -> str:
+    urls = ["https://a/1", "https://b/2", "https://c/slow"]
+    async with aclosing(scheduler.iter_downloads(urls)) as results:
+      async for result in results:
+        return result.document.path.name
+
+  kept = asyncio.run(first())
+  assert [path.name for path in tmp_path.iterdir()] == [kept]
@@ -0,0 +1,48 @@
+import asyncio
+
+from trendsurf_api.providers.embed_batcher import EmbeddingBatcher
+from trendsurf_api.providers.embed_client import EmbeddingError
+
+
+class FakeEngine:
+  def __init__(self, fail: bool = False) -> None:
+    self.calls: list[list[str]] = []
+    self.fail = fail
+
+  async def embed(self, texts):
+    self.calls.append(list(texts))
+    await asyncio.sleep(0)
+    if self.fail:
+      raise EmbeddingError("provider down")
+    return [[float(len(text))] for text in texts]
+
+
+def test_batcher_coalesces_concurrent_callers() -> None:
+  engine = FakeEngine()
+  batcher = EmbeddingBatcher(window_ms=20, max_items=100, engine=engine)
+
+  async def run():
+    return await asyncio.gather(*(batcher.embed(["x" * n, "y"]) for n in range(1, 6)))
+
+  results = asyncio.run(run())
+  assert results == [[[float(n)], [1.0]] for n in range(1, 6)]
+  assert len(engine.calls) == 1 and len(engine.calls[0]) == 10
+
+
+def test_batcher_flushes_on_size_and_propagates_errors() -> None:
+  engine = FakeEngine()
+  batcher = EmbeddingBatcher(window_ms=10_000, max_items=4, engine=engine)
+
+  async def run():
+    return await asyncio.wait_for(asyncio.gather(*(batcher.embed(["a", "b"]) for _ in range(4))), 1)
+
+  assert asyncio.run(run()) == [[[1.0], [1.0]]] * 4
+  assert [len(call) for call in engine.calls] == [4, 4]
+  assert batcher.stats.full_flushes == 2
+
+  failing = EmbeddingBatcher(window_ms=1, engine=FakeEngine(fail=True))
+
+  async def run_failing():
+    return await asyncio.gather(failing.embed(["a"]), failing.embed(["b"]), return_exceptions=True)
+
+  assert all(isinstance(result, EmbeddingError) for result in asyncio.run(run_failing()))
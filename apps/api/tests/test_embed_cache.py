@@ -0,0 +1,56 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+from trendsurf_api.providers.embed_cache import EmbeddingCache
+from trendsurf_api.providers.embed_engine import EmbeddingEngine
+from trendsurf_api.providers.types import EmbeddingProvider
+
+
+def test_engine_only_sends_cache_misses(tmp_path: Path) -> None:
+  sent: list[list[str]] = []
+
+  async def fake_embed(texts, *, model, provider):
+    sent.append(list(texts))
+    return [[float(len(text)), 0.5] for text in texts]
+
+  cache = EmbeddingCache(tmp_path, max_bytes=1 << 20)
+  engine = EmbeddingEngine(
+    provider=EmbeddingProvider.OLLAMA, model="nomic-embed-text", embed_fn=fake_embed, cache=cache
+  )
+  first = asyncio.run(engine.embed(["alpha", "beta"]))
+  second = asyncio.run(engine.embed(["alpha  ", "gamma!", "gamma!", "beta"]))
+
+  assert first == [[5.0, 0.5], [4.0, 0.5]]
+  assert second == [[5.0, 0.5], [6.0, 0.5], [6.0, 0.5], [4.0, 0.5]]
+  assert sent == [["alpha", "beta"], ["gamma!"]]
+  assert (cache.stats.hits, cache.stats.misses) == (2, 4)
+
+  other_model = EmbeddingCache.make_key("alpha", provider="ollama", model="other", dimensions=1536)
+  assert other_model not in cache.get_many([other_model])
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+  vector = np.ones(64, dtype=np.float32)
+  cache = EmbeddingCache(tmp_path, max_bytes=int(vector.nbytes * 3.5))
+  keys = [bytes([i]) * 32 for i in range(3)]
+  cache.put_many([(key, vector) for key in keys])
+  cache.get_many([keys[0]])
+  cache.put_many([(b"\xff" * 32, vector)])
+
+  assert cache.total_bytes() == vector.nbytes * 3
+  assert set(cache.get_many(keys)) == {keys[0], keys[2]}
+  assert cache.stats.evictions == 1
+
+
+def test_running_byte_total_tracks_upserts_and_reopens(tmp_path: Path) -> None:
+  cache = EmbeddingCache(tmp_path, max_bytes=1 << 20)
+  cache.put_many([(b"a" * 32, np.ones(64)), (b"b" * 32, np.ones(32))])
+  # Re-embedding at another size replaces the vector, so the total follows the new length.
+  cache.put_many([(b"a" * 32, np.ones(16))])
+  cache.get_many([b"a" * 32])
+
+  assert cache.total_bytes() == (16 + 32) * 4
+  cache.close()
+  assert EmbeddingCache(tmp_path, max_bytes=1 << 20).total_bytes() == (16 + 32) * 4
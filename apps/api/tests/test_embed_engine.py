@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from trendsurf_api.providers.embed_client import EmbeddingBatchTooLargeError, EmbeddingError
+from trendsurf_api.providers.embed_engine import EmbeddingEngine, plan_batches
+from trendsurf_api.providers.types import EmbeddingProvider
+
+
+def test_plan_batches_respects_item_and_token_budgets() -> None:
+  texts = ["a" * 40, "b" * 40, "c" * 400, "d" * 4, "e" * 4, "f" * 4]
+  assert plan_batches(texts, max_items=2, max_tokens=100) == [[0, 1], [2], [3, 4], [5]]
+
+
+def test_engine_preserves_order_and_bisects_oversized_batches() -> None:
+  calls: list[int] = []
+
+  async def fake_embed(texts, *, model, provider):
+    calls.append(len(texts))
+    if len(texts) > 2:
+      raise EmbeddingBatchTooLargeError("context length exceeded")
+    await asyncio.sleep(0.001 * (5 - len(texts)))
+    return [[float(len(text))] for text in texts]
+
+  engine = EmbeddingEngine(
+    provider=EmbeddingProvider.OLLAMA,
+    model="nomic-embed-text",
+    max_batch_items=4,
+    max_batch_tokens=1000,
+    concurrency=3,
+    embed_fn=fake_embed,
+  )
+  texts = ["x" * n for n in range(1, 11)]
+  assert asyncio.run(engine.embed(texts)) == [[float(n)] for n in range(1, 11)]
+  assert calls.count(4) == 2 and max(calls) == 4
+
+  async def always_too_large(texts, *, model, provider):
+    raise EmbeddingBatchTooLargeError("too long")
+
+  engine.embed_fn = always_too_large
+  with pytest.raises(EmbeddingError):
+    asyncio.run(engine.embed(["only"]))
@@ -0,0 +1,42 @@
+import asyncio
+
+from trendsurf_api.parsing.grobid_client import GrobidBusyError
+from trendsurf_api.parsing.grobid_pool import GrobidDispatcher
+
+
+def test_dispatcher_balances_and_backs_off_busy_instances() -> None:
+  calls: dict[str, int] = {"http://a": 0, "http://b": 0}
+  active: dict[str, int] = {"http://a": 0, "http://b": 0}
+  peak: dict[str, int] = {"http://a": 0, "http://b": 0}
+  busy_left = {"http://b": 2}
+
+  async def processor(pdf: bytes, *, base_url: str) -> str:
+    calls[base_url] += 1
+    active[base_url] += 1
+    peak[base_url] = max(peak[base_url], active[base_url])
+    try:
+      await asyncio.sleep(0.005)
+      if busy_left.get(base_url, 0) > 0:
+        busy_left[base_url] -= 1
+        raise GrobidBusyError("busy")
+      return f"<TEI>{pdf.decode()}</TEI>"
+    finally:
+      active[base_url] -= 1
+
+  dispatcher = GrobidDispatcher(
+    ["http://a", "http://b"], per_instance_limit=3, busy_backoff=0.001, processor=processor
+  )
+
+  async def run() -> list[str]:
+    return await asyncio.gather(*(dispatcher.process(str(i).encode()) for i in range(20)))
+
+  results = asyncio.run(run())
+  assert results == [f"<TEI>{i}</TEI>" for i in range(20)]
+  assert max(peak.values()) <= 3
+  stats = dispatcher.stats()
+  assert stats["queue_depth"] == 0
+  by_url = {entry["url"]: entry for entry in stats["instances"]}
+  assert by_url["http://b"]["busy"] == 2
+  assert by_url["http://a"]["completed"] + by_url["http://b"]["completed"] == 20
+  assert sum(calls.values()) == 22
+  assert all(entry["in_flight"] == 0 for entry in stats["instances"])
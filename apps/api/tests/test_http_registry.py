@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from trendsurf_api.core.http import HttpClientRegistry, origin_of
+
+
+def test_origin_of_normalizes_scheme_and_host() -> None:
+  assert origin_of("HTTPS://Export.arxiv.org/api/query?x=1") == "https://export.arxiv.org"
+  with pytest.raises(ValueError):
+    origin_of("/api/query")
+
+
+def test_registry_reuses_clients_per_origin_and_loop() -> None:
+  registry = HttpClientRegistry()
+
+  async def scenario() -> None:
+    first = registry.get("http://grobid:8070/api/processFulltextDocument")
+    second = registry.get("http://grobid:8070/api/isalive")
+    other = registry.get("http://ollama:11434/api/embeddings")
+    assert first is second
+    assert first is not other
+    await registry.aclose()
+    assert first.is_closed and other.is_closed
+
+  asyncio.run(scenario())
+
+  async def fresh_loop() -> None:
+    client = registry.get("http://grobid:8070/")
+    assert not client.is_closed
+    await registry.aclose()
+
+  asyncio.run(fresh_loop())
@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from trendsurf_api.analysis.keyword_index import KeywordIndex, TermDocument, tokenize
+
+NOW = datetime(2024, 6, 20, tzinfo=timezone.utc)
+
+
+def _at(year: int, month: int) -> datetime:
+  return datetime(year, month, 15, tzinfo=timezone.utc)
+
+
+def _corpus() -> list[TermDocument]:
+  documents = []
+  for i in range(30):
+    documents.append(
+      TermDocument(i, f"Retrieval augmented generation with dense retriever and reranker, study {i}", _at(2024, 5))
+    )
+  for i in range(30, 60):
+    documents.append(
+      TermDocument(i, f"Diffusion models for image synthesis with latent denoising, study {i}", _at(2024, 6))
+    )
+  return documents
+
+
+def test_tokenize_drops_stopwords_and_short_tokens() -> None:
+  assert tokenize("The Transformer uses a KV-cache, see Fig 3 in 2024.") == ["transformer", "uses", "kv", "cache", "see"]
+
+
+def test_deltas_rank_off_topic_papers_as_more_novel(tmp_path) -> None:
+  index = KeywordIndex(tmp_path, window_months=12)
+  index.update(_corpus())
+  centroid = index.centroid(range(30), now=NOW)
+
+  familiar, novel = index.deltas(
+    [
+      "Dense retriever and reranker for retrieval augmented generation",
+      "Quantum error correction with surface codes and lattice surgery",
+    ],
+    centroid,
+    now=NOW,
+  )
+
+  assert centroid.documents == 30
+  assert familiar.similarity > 0.8 > novel.similarity
+  assert familiar.points < novel.points == 2.0
+  assert "quantum" in novel.distinctive_terms
+  assert index.bm25("reranker", [0, 45], now=NOW)[1] == 0.0
+
+
+def test_reindexing_replaces_documents_and_survives_reload(tmp_path) -> None:
+  index = KeywordIndex(tmp_path, window_months=12)
+  index.update(_corpus())
+  # The parsed body arrives later and replaces the abstract-only document.
+  for _ in range(10):
+    index.update([TermDocument(0, "Graph neural networks for molecule property prediction", _at(2024, 5))])
+
+  reloaded = KeywordIndex(tmp_path, window_months=12)
+  assert len(reloaded) == len(index) == 60
+  assert len(list((tmp_path / "2024-05").glob("*.npz"))) <= 8
+  assert reloaded.bm25("molecule retriever", [0, 1], now=NOW).tolist() == index.bm25(
+    "molecule retriever", [0, 1], now=NOW
+  ).tolist()
+  assert reloaded.bm25("reranker", [0], now=NOW)[0] == 0.0
+
+
+def test_expire_drops_months_outside_the_window(tmp_path) -> None:
+  index = KeywordIndex(tmp_path, window_months=1)
+  index.update(_corpus())
+
+  assert index.expire(now=NOW) == ["2024-05"]
+  assert index.months == ["2024-06"]
+  assert 0 not in index and 30 in index
+  assert not (tmp_path / "2024-05").exists()
+
+
+def test_terms_reach_disk_before_segments_and_torn_lines_are_dropped(tmp_path, monkeypatch) -> None:
+  index = KeywordIndex(tmp_path, window_months=12)
+  index.update(_corpus()[:5])
+  terms = list(index.terms)
+
+  def crash(*args, **kwargs):
+    raise OSError("disk full")
+
+  monkeypatch.setattr("trendsurf_api.analysis.keyword_index._save_segment", crash)
+  with pytest.raises(OSError):
+    index.update([TermDocument(99, "Quantum error correction codes", _at(2024, 5))])
+  monkeypatch.undo()
+  # The crash left new terms but no segment; simulate a torn final append on top.
+  with open(tmp_path / "terms.txt", "a", encoding="utf-8") as handle:
+    handle.write("partial")
+
+  reloaded = KeywordIndex(tmp_path, window_months=12)
+  assert reloaded.terms[: len(terms)] == terms
+  assert "quantum" in reloaded.terms and "partial" not in reloaded.terms
+  assert 99 not in reloaded and len(reloaded) == 5
+  reloaded.update([TermDocument(100, "Partial differential equations", _at(2024, 5))])
+  assert KeywordIndex(tmp_path, window_months=12).terms == reloaded.terms
@@ -0,0 +1,117 @@
+import numpy as np
+
+from trendsurf_api.ingestion.keywords import KeywordSet
+from trendsurf_api.ingestion.metadata_index import IndexedPaper, MetadataIndex, _decode, _encode
+from trendsurf_api.models.tables import Paper
+
+
+def _paper(paper_id: int, categories, text: str = "") -> IndexedPaper:
+  return IndexedPaper(paper_id, frozenset(categories), text)
+
+
+def test_blocks_round_trip_with_narrow_deltas() -> None:
+  dense = np.arange(70_000, 70_300, dtype=np.int64)
+  width, payload = _encode(dense)
+  assert width == 1 and len(payload) == 299
+  np.testing.assert_array_equal(_decode(70_000, width, payload), dense)
+
+  sparse = np.array([65_536, 66_000, 131_071], dtype=np.int64)
+  width, payload = _encode(sparse)
+  assert width == 2
+  np.testing.assert_array_equal(_decode(65_536, width, payload), sparse)
+
+
+def test_keyword_set_matches_word_prefixes() -> None:
+  keywords = KeywordSet(["Graph  Networks", "diffusion", "x-ray imaging"])
+  found = {keywords.keywords[i] for i in keywords.match("message passing on graph neural networks")}
+  assert found == {"graph networks"}
+  assert keywords.match("x-ray and imaging") == [keywords.keywords.index("x-ray imaging")]
+
+
+def test_keyword_set_matches_short_words_as_whole_tokens() -> None:
+  keywords = KeywordSet(["ai", "rl agent"])
+
+  assert keywords.match("the aims of air travel") == []
+  assert keywords.match("world models for rl agents") == [keywords.keywords.index("rl agent")]
+  assert keywords.match("generative ai") == [keywords.keywords.index("ai")]
+
+
+def test_candidates_intersect_categories_and_keywords(tmp_path) -> None:
+  index = MetadataIndex(tmp_path)
+  index._db.execute("INSERT INTO keywords (keyword) VALUES ('diffusion')")
+  index.update(
+    [
+      _paper(1, ["cs.LG"], "diffusion models"),
+      _paper(2, ["cs.LG", "cs.CV"], "image diffusion"),
+      _paper(3, ["cs.CL"], "diffusion of language"),
+      _paper(70_000, ["cs.CV"], "segmentation"),
+    ]
+  )
+
+  assert index.category("cs.CV").tolist() == [2, 70_000]
+  assert index.candidates(categories=["cs.LG", "cs.CV"]).tolist() == [1, 2, 70_000]
+  assert index.candidates(categories=["cs.CV"], keywords=["Diffusion"]).tolist() == [2]
+  assert index.candidates() is None
+  # Untracked keywords would otherwise look like "no papers"; they leave the group unrestricted.
+  assert index.candidates(categories=["cs.CL"], keywords=["transformers"]).tolist() == [3]
+
+
+def test_update_applies_term_differences(tmp_path) -> None:
+  index = MetadataIndex(tmp_path)
+  index.update([_paper(1, ["cs.LG"]), _paper(2, ["cs.LG"])])
+
+  assert index.update([_paper(1, ["cs.LG"])]) == 0
+  assert index.update([_paper(1, ["cs.AI"])]) == 1
+  assert index.category("cs.LG").tolist() == [2]
+  assert index.category("cs.AI").tolist() == [1]
+
+  index.remove([2])
+  assert index.category("cs.LG").tolist() == []
+  assert index.stats()["postings"] == 1
+
+
+def test_keywords_tracked_elsewhere_reach_other_processes(tmp_path, monkeypatch) -> None:
+  monkeypatch.setattr("trendsurf_api.ingestion.metadata_index._backfill_keyword", lambda keyword: [])
+  worker = MetadataIndex(tmp_path)
+  api = MetadataIndex(tmp_path)
+  assert api.keywords().keywords == []
+
+  worker.track_keywords(["Diffusion"])
+  api.update([_paper(5, ["cs.LG"], "latent diffusion")])
+
+  assert api.keyword("diffusion").tolist() == [5]
+
+
+def test_keyword_backfill_rechecks_substring_hits(tmp_path, database) -> None:
+  # SQLite lacks the Postgres text helpers the backfill query uses.
+  connection = database.kw["bind"].raw_connection().driver_connection
+  connection.create_function("concat_ws", -1, lambda sep, *parts: sep.join(p for p in parts if p))
+  connection.create_function("array_to_string", 2, lambda values, sep: None)
+  with database.begin() as session:
+    session.add_all(
+      Paper(id=i, source="arxiv", source_id=str(i), title=title, abstract="")
+      for i, title in enumerate(["Organ segmentation", "A GAN for faces", "Once again"], 1)
+    )
+  index = MetadataIndex(tmp_path)
+
+  assert index.track_keywords(["GAN"]) == ["gan"]
+  assert index.keyword("gan").tolist() == [2]
+
+
+def test_papers_upserted_during_a_backfill_keep_the_new_keyword(tmp_path, monkeypatch) -> None:
+  index = MetadataIndex(tmp_path)
+  index.update([_paper(5, ["cs.LG"], "latent diffusion")])
+
+  def backfill(keyword: str) -> list[int]:
+    # Indexed on update already, but candidates cannot rely on it until the backfill lands.
+    index.update([_paper(7, ["cs.LG"], "diffusion policies")])
+    assert index.candidates(keywords=["diffusion"]) is None
+    return [5, 7]
+
+  monkeypatch.setattr("trendsurf_api.ingestion.metadata_index._backfill_keyword", backfill)
+  index.track_keywords(["diffusion"])
+
+  assert index.candidates(keywords=["diffusion"]).tolist() == [5, 7]
+  assert index._db.execute("SELECT terms FROM documents WHERE paper_id = 7").fetchone() == (
+    "c:cs.LG\nk:diffusion",
+  )
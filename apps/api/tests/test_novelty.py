@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from trendsurf_api.analysis.novelty import NoveltyIndex, month_key
+
+
+def _at(year: int, month: int) -> datetime:
+  return datetime(year, month, 15, tzinfo=timezone.utc)
+
+
+def _cluster(rng: np.random.Generator, centre: np.ndarray, count: int) -> np.ndarray:
+  return centre + 0.05 * rng.standard_normal((count, centre.size)).astype(np.float32)
+
+
+def _index(root, **kwargs) -> NoveltyIndex:
+  options = {"clusters_per_month": 4, "exemplars_per_month": 50, "neighbours": 5}
+  return NoveltyIndex(root, dimensions=16, **{**options, **kwargs})
+
+
+def test_papers_far_from_the_corpus_score_higher(tmp_path) -> None:
+  rng = np.random.default_rng(0)
+  centres = np.eye(16, dtype=np.float32)[:3]
+  index = _index(tmp_path)
+  for month in (1, 2, 3):
+    vectors = np.vstack([_cluster(rng, centre, 40) for centre in centres])
+    index.update(vectors, [_at(2024, month)] * len(vectors))
+
+  familiar, novel = index.score([centres[0], np.eye(16, dtype=np.float32)[10]], now=_at(2024, 3))
+
+  assert familiar.distance < 0.1
+  assert novel.distance > 0.8
+  assert familiar.points < novel.points == 3.0
+
+
+def test_buckets_stay_bounded_and_persist(tmp_path) -> None:
+  rng = np.random.default_rng(1)
+  index = _index(tmp_path)
+  for _ in range(5):
+    index.update(rng.standard_normal((60, 16)), [_at(2024, 5)] * 60)
+
+  bucket = index._buckets["2024-05"]
+  assert bucket.centroids.shape == (4, 16) and bucket.exemplars.shape == (50, 16)
+  assert bucket.counts.sum() == 300 and bucket.seen == 300
+  np.testing.assert_allclose(np.linalg.norm(bucket.centroids, axis=1), 1.0, rtol=1e-5)
+
+  query = rng.standard_normal((3, 16))
+  reloaded = _index(tmp_path)
+  assert reloaded.months == ["2024-05"]
+  assert reloaded.score(query, now=_at(2024, 6)) == index.score(query, now=_at(2024, 6))
+
+
+def test_months_outside_the_window_expire(tmp_path) -> None:
+  index = _index(tmp_path, window_months=12)
+  vectors = np.eye(16)[:2]
+  index.update(vectors, [_at(2023, 1), _at(2024, 1)])
+
+  assert index.expire(now=_at(2024, 6)) == ["2023-01"]
+  assert index.months == ["2024-01"] and not (tmp_path / "2023-01.npz").exists()
+  assert month_key(_at(2024, 1)) == "2024-01"
+  # A month outside the window is ignored when scoring, even before it is expired.
+  assert index.score(vectors[:1], now=_at(2025, 6))[0].distance == 1.0
@@ -0,0 +1,100 @@
+from dataclasses import replace
+
+from sqlalchemy import create_engine, create_mock_engine
+from sqlalchemy.orm import Session
+
+from trendsurf_api.ingestion.arxiv_client import ArxivPaper
+from trendsurf_api.ingestion.metadata_index import IndexedPaper
+from trendsurf_api.ingestion.paper_writer import (
+  UpsertReport,
+  _index_on_commit,
+  _upsert_batches,
+  content_hash,
+  stage_batches,
+)
+
+
+def _paper(source_id: str, title: str = "Title") -> ArxivPaper:
+  return ArxivPaper(
+    source_id=source_id,
+    title=title,
+    summary="Abstract",
+    published_at=None,
+    updated_at=None,
+    authors=["A. Author"],
+    pdf_url=None,
+    html_url=None,
+    primary_category="cs.LG",
+    categories=["cs.LG", "cs.AI"],
+  )
+
+
+def test_content_hash_tracks_content_fields_only() -> None:
+  paper = _paper("1")
+  assert content_hash(paper) == content_hash(replace(paper, categories=["cs.AI", "cs.LG"]))
+  assert content_hash(paper) == content_hash(replace(paper, pdf_url="https://arxiv.org/pdf/1"))
+  assert content_hash(paper) != content_hash(replace(paper, title="Other"))
+
+
+def test_stage_batches_keeps_last_duplicate_per_batch() -> None:
+  batches = list(stage_batches([_paper("1"), _paper("2"), _paper("1", "New"), _paper("3")], 3))
+  assert [[row["source_id"] for row in batch] for batch in batches] == [["1", "2"], ["3"]]
+  assert batches[0][0]["title"] == "New"
+
+
+def test_versions_of_a_paper_share_one_row() -> None:
+  (batch,) = stage_batches([_paper("2401.00001v3", "Third"), _paper("2401.00001v2"), _paper("1")], 10)
+  assert [(row["source_id"], row["source_version"]) for row in batch] == [
+    ("2401.00001", 3),
+    ("1", None),
+  ]
+  assert batch[0]["title"] == "Third"
+
+
+def test_upsert_statement_skips_unchanged_rows() -> None:
+  statements: list[str] = []
+
+  class RecordingSession:
+    def execute(self, stmt):
+      statements.append(str(stmt.compile(dialect=engine.dialect)))
+      return [(10, "1", True)]
+
+  engine = create_mock_engine("postgresql+psycopg://", lambda *args, **kwargs: None)
+  report = UpsertReport()
+  _upsert_batches(RecordingSession(), [_paper("1"), _paper("2")], 100, "arxiv", report)
+
+  assert report.new == {"1": 10}
+  assert report.unchanged == {"2"}
+  (sql,) = statements
+  assert "ON CONFLICT ON CONSTRAINT uq_papers_source_source_id DO UPDATE" in sql
+  assert "papers.content_hash IS DISTINCT FROM excluded.content_hash" in sql
+  assert "papers.source_version IS DISTINCT FROM excluded.source_version" in sql
+  assert "RETURNING papers.id, papers.source_id, xmax = 0 AS inserted" in sql
+
+
+def test_index_waits_for_the_callers_commit() -> None:
+  class RecordingIndex:
+    def __init__(self) -> None:
+      self.updates: list[list[int]] = []
+
+    def update(self, papers) -> None:
+      self.updates.append([paper.paper_id for paper in papers])
+
+  index = RecordingIndex()
+  engine = create_engine("sqlite://")
+  paper = IndexedPaper(1, frozenset({"cs.LG"}), "title")
+
+  with Session(engine) as session:
+    session.connection()
+    _index_on_commit(session, index, [paper])
+    assert index.updates == []
+    session.rollback()
+    session.connection()
+    session.commit()
+  assert index.updates == []
+
+  with Session(engine) as session:
+    session.connection()
+    _index_on_commit(session, index, [paper])
+    session.commit()
+  assert index.updates == [[1]]
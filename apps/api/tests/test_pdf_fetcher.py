@@ -0,0 +1,104 @@
+import asyncio
+import errno
+import hashlib
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+from trendsurf_api.ingestion.pdf_cache import PdfCache
+from trendsurf_api.ingestion.pdf_fetcher import PdfDocument, PdfTooLargeError, spool_response
+
+
+def _streamed(chunks: list[bytes]) -> httpx.Response:
+  async def body():
+    for chunk in chunks:
+      yield chunk
+
+  return httpx.Response(200, content=body())
+
+
+def test_spool_response_hashes_and_writes_to_disk(tmp_path) -> None:
+  chunks = [b"%PDF-1.7\n", b"x" * 1000, b"%%EOF"]
+  path, size, checksum = asyncio.run(spool_response(_streamed(chunks), max_bytes=2048, spool_dir=tmp_path))
+  payload = b"".join(chunks)
+  assert path.read_bytes() == payload
+  assert size == len(payload)
+  assert checksum == hashlib.sha256(payload).hexdigest()
+
+
+def test_spool_response_aborts_mid_stream_without_leaving_files(tmp_path) -> None:
+  chunks = [b"a" * 600, b"b" * 600, b"c" * 600]
+  with pytest.raises(PdfTooLargeError):
+    asyncio.run(spool_response(_streamed(chunks), max_bytes=1000, spool_dir=tmp_path))
+  assert list(tmp_path.iterdir()) == []
+
+
+def _spooled(tmp_path, payload: bytes, name: str) -> PdfDocument:
+  path = tmp_path / name
+  path.write_bytes(payload)
+  return PdfDocument(
+    path=path,
+    size=len(payload),
+    checksum=hashlib.sha256(payload).hexdigest(),
+    content_type="application/pdf",
+    etag=f'"{name}"',
+    last_modified=None,
+  )
+
+
+def test_pdf_cache_dedupes_by_checksum_and_evicts_lru(tmp_path) -> None:
+  cache = PdfCache(tmp_path / "cache", max_bytes=250)
+  first = cache.store("http://arxiv.org/pdf/1v1", _spooled(tmp_path, b"a" * 100, "one"))
+  again = cache.store("http://arxiv.org/pdf/1v2", _spooled(tmp_path, b"a" * 100, "two"))
+  assert first.path.samefile(again.path) and first.path.samefile(cache.blob_path(first.checksum))
+  assert not (tmp_path / "one").exists() and not (tmp_path / "two").exists()
+  first.discard()
+  again.discard()
+
+  cached = cache.lookup("http://arxiv.org/pdf/1v2")
+  assert cached is not None
+  assert cached.validators() == {"If-None-Match": '"two"'}
+  assert cached.is_fresh(60)
+
+  cache.store("http://arxiv.org/pdf/2v1", _spooled(tmp_path, b"b" * 100, "three"))
+  cache.lookup("http://arxiv.org/pdf/1v1")
+  cache.store("http://arxiv.org/pdf/3v1", _spooled(tmp_path, b"c" * 100, "four"))
+  assert cache.total_bytes() <= 250
+  assert cache.lookup("http://arxiv.org/pdf/2v1") is None
+  assert cache.lookup("http://arxiv.org/pdf/1v1") is not None
+  cache.close()
+
+
+def test_pdf_cache_leases_survive_eviction(tmp_path) -> None:
+  cache = PdfCache(tmp_path / "cache", max_bytes=150)
+  cache.store("http://arxiv.org/pdf/1v1", _spooled(tmp_path, b"a" * 100, "one")).discard()
+  cached = cache.lookup("http://arxiv.org/pdf/1v1")
+  assert cached is not None
+
+  cache.store("http://arxiv.org/pdf/2v1", _spooled(tmp_path, b"b" * 100, "two")).discard()
+  assert not cache.blob_path(cached.document.checksum).exists()
+  # The caller still reading the evicted PDF keeps its bytes until it lets go.
+  assert cached.document.content == b"a" * 100
+  cached.document.discard()
+  assert list((tmp_path / "cache" / "spool").iterdir()) == []
+  cache.close()
+
+
+def test_pdf_cache_copies_downloads_spooled_on_another_filesystem(tmp_path, monkeypatch) -> None:
+  rename = os.replace
+
+  def cross_device(source, target) -> None:
+    if Path(source).parent.parent != Path(target).parent.parent:
+      raise OSError(errno.EXDEV, "Invalid cross-device link")
+    rename(source, target)
+
+  monkeypatch.setattr("trendsurf_api.ingestion.pdf_cache.os.replace", cross_device)
+  cache = PdfCache(tmp_path / "cache", max_bytes=1000)
+  with cache.store("http://arxiv.org/pdf/1v1", _spooled(tmp_path, b"a" * 100, "one")) as document:
+    assert document.content == b"a" * 100
+  assert cache.blob_path(document.checksum).read_bytes() == b"a" * 100
+  assert not (tmp_path / "one").exists()
+  assert list(cache.blob_path(document.checksum).parent.glob("*.part")) == []
+  cache.close()
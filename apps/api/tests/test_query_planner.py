@@ -0,0 +1,157 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from trendsurf_api.ingestion.arxiv_client import ArxivClient, ArxivPaper
+from trendsurf_api.ingestion.keywords import KeywordSet
+from trendsurf_api.ingestion.query_planner import TopicSpec, iter_planned, plan_queries
+from trendsurf_api.ingestion.watermarks import Watermark
+
+
+def _paper(source_id: str, categories: list[str], title: str = "", summary: str = "") -> ArxivPaper:
+  return ArxivPaper(
+    source_id=source_id,
+    title=title,
+    summary=summary,
+    published_at=None,
+    updated_at=None,
+    authors=[],
+    pdf_url=None,
+    html_url=None,
+    primary_category=categories[0] if categories else None,
+    categories=categories,
+  )
+
+
+class FakeClient:
+  max_results_per_run = 2
+
+  def __init__(self, feeds: dict[str, list[ArxivPaper]]) -> None:
+    self.feeds = feeds
+    self.queries: list[str] = []
+
+  async def iter_query(self, search_query: str, *, max_results: int, page_size: int):
+    self.queries.append(search_query)
+    for paper in self.feeds.get(search_query, [])[:max_results]:
+      yield paper
+
+
+class FeedClient(ArxivClient):
+  def __init__(self, feed: list[ArxivPaper]) -> None:
+    super().__init__(delay_ms=1, max_results_per_run=3)
+    self.feed = feed
+
+  async def query(self, search_query: str, *, start: int = 0, max_results: int = 100):
+    return self.feed[start : start + max_results]
+
+
+class MemoryWatermarks:
+  def __init__(self) -> None:
+    self.saved: dict[str, Watermark] = {}
+
+  def load(self, search_query: str) -> Watermark:
+    saved = self.saved.get(search_query)
+    return replace(saved) if saved else Watermark(search_query=search_query)
+
+  def save(self, watermark: Watermark) -> None:
+    self.saved[watermark.search_query] = replace(watermark)
+
+
+def test_plan_merges_shared_categories_and_keyword_only_topics() -> None:
+  specs = [
+    TopicSpec.from_filters(1, {"categories": ["cs.CL", "cs.LG"], "keywords": ["diffusion"]}),
+    TopicSpec.from_filters(2, {"categories": ["cs.LG"]}),
+    TopicSpec.from_filters(3, {"keywords": ["Graph  Neural"]}),
+    TopicSpec.from_filters(4, {}),
+  ]
+  specs.append(TopicSpec.from_filters(5, {"categories": ["cs.LG", "cs.CL"], "keywords": ["GAN"]}))
+  plan = plan_queries(specs, max_results_per_topic=10)
+  assert [query.search_query for query in plan] == [
+    "cat:cs.LG",
+    "(cat:cs.CL OR cat:cs.LG) AND (all:diffusion OR all:gan)",
+    "all:ai OR all:graph+neural",
+  ]
+  assert [query.topic_ids for query in plan] == [{2}, {1, 5}, {3, 4}]
+  assert [query.max_results for query in plan] == [10, 20, 20]
+
+
+def test_plan_respects_query_length_budget() -> None:
+  specs = [TopicSpec.from_filters(i, {"categories": [f"cs.X{i:02d}"]}) for i in range(20)]
+  plan = plan_queries(specs, max_results_per_topic=5, max_query_chars=60)
+  assert len(plan) > 1
+  assert all(len(query.search_query) <= 60 for query in plan)
+  assert set().union(*(query.topic_ids for query in plan)) == set(range(20))
+
+
+def test_iter_planned_fans_out_and_stops_when_quotas_met() -> None:
+  specs = [
+    TopicSpec.from_filters(1, {"categories": ["cs.LG"], "keywords": ["diffusion"]}),
+    TopicSpec.from_filters(2, {"categories": ["cs.LG"]}),
+  ]
+  feed = [
+    _paper("a", ["cs.LG"], title="Diffusion models"),
+    _paper("b", ["cs.LG"]),
+    _paper("a", ["cs.LG"], title="Diffusion models"),
+    _paper("d", ["cs.LG"]),
+    _paper("c", ["cs.LG"], summary="latent diffusion"),
+  ]
+  narrow = [
+    _paper("a", ["cs.LG"], title="Diffusion models"),
+    _paper("c", ["cs.LG"], summary="latent diffusion"),
+    _paper("e", ["cs.LG"], title="Diffusion policies"),
+  ]
+  client = FakeClient({"cat:cs.LG": feed, "(cat:cs.LG) AND (all:diffusion)": narrow})
+
+  async def collect() -> list[tuple[str, list[int]]]:
+    return [(paper.source_id, topics) async for paper, topics in iter_planned(client, specs)]
+
+  # The category query stops at topic 2's quota, before reaching "c"; topic 1's own
+  # conjunction query still finds it.
+  assert asyncio.run(collect()) == [("a", [1, 2]), ("b", [2]), ("c", [1, 2])]
+  assert client.queries == ["cat:cs.LG", "(cat:cs.LG) AND (all:diffusion)"]
+
+
+def test_keywords_match_on_token_boundaries() -> None:
+  gan = TopicSpec.from_filters(1, {"keywords": ["GAN"]})
+  rl = TopicSpec.from_filters(2, {"keywords": ["graph RL"]})
+
+  assert gan.matches(_paper("1", [], title="A GAN for faces"))
+  assert not gan.matches(_paper("2", [], title="Organ segmentation"))
+  assert rl.matches(_paper("3", [], summary="Graphs meet RL agents"))
+  assert not rl.matches(_paper("4", [], summary="Graphs of the world"))
+
+
+def test_planner_and_keyword_set_share_one_matching_rule() -> None:
+  xray = TopicSpec.from_filters(1, {"keywords": ["X-ray imaging"]})
+  paper = _paper("1", [], title="Imaging with x-ray sources")
+
+  assert xray.matches(paper)
+  assert xray.matches(paper, KeywordSet(["x-ray imaging"]).found("imaging with x-ray sources"))
+  assert not xray.matches(_paper("2", [], title="X-rays for imaging"))
+
+
+def test_planned_runs_complete_the_watermark_when_quotas_are_met() -> None:
+  base = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+  def dated(source_id: str, minutes: int) -> ArxivPaper:
+    return replace(_paper(source_id, ["cs.LG"]), updated_at=base + timedelta(minutes=minutes))
+
+  # Two topics share the category query, so it may fetch 6 entries but both quotas of 3 are
+  # met after the third.
+  specs = [TopicSpec.from_filters(i, {"categories": ["cs.LG"]}) for i in (1, 2)]
+  backlog = [dated(f"p{i}", -i) for i in range(10)]
+  client = FeedClient(backlog)
+  watermarks = MemoryWatermarks()
+
+  async def run() -> list[str]:
+    planned = iter_planned(client, specs, page_size=2, watermarks=watermarks)
+    return [paper.source_id async for paper, _ in planned]
+
+  assert asyncio.run(run()) == ["p0", "p1", "p2"]
+  watermark = watermarks.saved["cat:cs.LG"]
+  assert watermark.cursor_start is None
+  assert watermark.last_updated_at == backlog[0].updated_at
+
+  client.feed = [dated("n0", 2), dated("n1", 1)] + backlog
+  assert asyncio.run(run()) == ["n0", "n1"]
+  assert watermarks.saved["cat:cs.LG"].last_updated_at == client.feed[0].updated_at
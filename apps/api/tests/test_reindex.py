@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from trendsurf_api.models.tables import Paper, VectorCollection
+from trendsurf_api.vectors.reindex import (
+  STATUS_ACTIVE,
+  STATUS_BUILDING,
+  STATUS_DELETED,
+  STATUS_RETIRED,
+  ReindexError,
+  Reindexer,
+  resolve_alias,
+)
+
+DIMENSIONS = 1536
+
+
+class FakeEngine:
+  model = "fake-embed"
+
+  def __init__(self) -> None:
+    self.embedded: list[str] = []
+
+  async def embed(self, texts):
+    self.embedded.extend(texts)
+    rng = np.random.default_rng(len(self.embedded))
+    return rng.standard_normal((len(texts), DIMENSIONS)).tolist()
+
+
+def _add_papers(database, ids) -> None:
+  with database.begin() as session:
+    session.add_all(
+      Paper(
+        id=i, source="arxiv", source_id=f"2401.{i:05d}", title=f"Paper {i}", abstract="Abstract"
+      )
+      for i in ids
+    )
+
+
+def _create(client: QdrantClient, name: str) -> None:
+  client.create_collection(
+    collection_name=name,
+    vectors_config=qmodels.VectorParams(size=DIMENSIONS, distance=qmodels.Distance.COSINE),
+  )
+
+
+def _retired(database, client: QdrantClient, name: str, retired_at: datetime) -> None:
+  _create(client, name)
+  with database.begin() as session:
+    session.add(
+      VectorCollection(
+        alias="papers",
+        collection=name,
+        embed_model="fake-embed",
+        embed_dimensions=DIMENSIONS,
+        status=STATUS_RETIRED,
+        retired_at=retired_at,
+      )
+    )
+
+
+def test_backfill_resumes_from_the_checkpoint(database) -> None:
+  client = QdrantClient(":memory:")
+  engine = FakeEngine()
+  _add_papers(database, range(1, 6))
+  reindexer = Reindexer("papers", client=client, engine=engine, batch_size=2)
+
+  run = reindexer.backfill(reindexer.start())
+  assert (run.checkpoint_id, run.points) == (5, 5)
+
+  _add_papers(database, range(6, 8))
+  resumed = Reindexer("papers", client=client, engine=engine, batch_size=2).start()
+  assert resumed.collection == run.collection and resumed.status == STATUS_BUILDING
+  embedded = len(engine.embedded)
+  resumed = reindexer.backfill(resumed)
+
+  assert engine.embedded[embedded:] == ["Paper 6\n\nAbstract", "Paper 7\n\nAbstract"]
+  assert resumed.points == 7
+  assert client.count(collection_name=run.collection, exact=True).count == 7
+
+
+def test_validate_rejects_a_point_count_mismatch(database) -> None:
+  client = QdrantClient(":memory:")
+  _add_papers(database, range(1, 4))
+  reindexer = Reindexer("papers", client=client, engine=FakeEngine())
+  run = reindexer.backfill(reindexer.start())
+  client.delete(collection_name=run.collection, points_selector=qmodels.PointIdsList(points=[2]))
+
+  with pytest.raises(ReindexError, match="holds 2 points, expected 3"):
+    reindexer.validate(run, min_recall=0.0)
+
+
+def test_first_activation_creates_the_alias(database) -> None:
+  client = QdrantClient(":memory:")
+  _add_papers(database, range(1, 4))
+  reindexer = Reindexer("papers", client=client, engine=FakeEngine())
+
+  run = reindexer.run(min_recall=0.0)
+
+  assert run.status == STATUS_ACTIVE
+  assert resolve_alias("papers", client=client) == run.collection
+  with database() as session:
+    (row,) = session.query(VectorCollection).all()
+    assert (row.status, row.checkpoint_id, row.points) == (STATUS_ACTIVE, 3, 3)
+
+
+def test_activation_drops_a_legacy_collection_only_on_request(database) -> None:
+  client = QdrantClient(":memory:")
+  _add_papers(database, range(1, 4))
+  _create(client, "papers")
+  reindexer = Reindexer("papers", client=client, engine=FakeEngine())
+  run = reindexer.validate(reindexer.backfill(reindexer.start()), min_recall=0.0)
+
+  with pytest.raises(ReindexError, match="plain collection"):
+    reindexer.activate(run)
+  assert client.collection_exists("papers") and resolve_alias("papers", client=client) is None
+
+  reindexer.activate(run, drop_legacy=True)
+  assert resolve_alias("papers", client=client) == run.collection
+  assert {c.name for c in client.get_collections().collections} == {run.collection}
+
+
+def test_rollback_swaps_to_the_newest_retained_collection(database) -> None:
+  client = QdrantClient(":memory:")
+  now = datetime.now(timezone.utc)
+  _add_papers(database, range(1, 4))
+  reindexer = Reindexer("papers", client=client, engine=FakeEngine())
+  live = reindexer.run(min_recall=0.0)
+  _retired(database, client, "papers__old", now - timedelta(days=3))
+  _retired(database, client, "papers__older", now - timedelta(days=9))
+  _retired(database, client, "papers__gone", now - timedelta(days=1))
+  client.delete_collection("papers__gone")
+
+  restored = reindexer.rollback()
+
+  assert restored.collection == "papers__old"
+  assert resolve_alias("papers", client=client) == "papers__old"
+  with database() as session:
+    statuses = {row.collection: row.status for row in session.query(VectorCollection)}
+  assert statuses[live.collection] == STATUS_RETIRED
+  assert statuses["papers__old"] == STATUS_ACTIVE
+  assert statuses["papers__older"] == STATUS_RETIRED
+
+
+def test_collect_garbage_keeps_the_newest_and_recently_retired(database) -> None:
+  client = QdrantClient(":memory:")
+  now = datetime.now(timezone.utc)
+  for days in (1, 2, 10, 20, 30):
+    _retired(database, client, f"papers__{days}d", now - timedelta(days=days))
+  reindexer = Reindexer("papers", client=client, engine=FakeEngine())
+
+  deleted = reindexer.collect_garbage(keep=1, older_than=timedelta(days=7))
+
+  assert deleted == ["papers__10d", "papers__20d", "papers__30d"]
+  assert {c.name for c in client.get_collections().collections} == {"papers__1d", "papers__2d"}
+  with database() as session:
+    statuses = {row.collection: row.status for row in session.query(VectorCollection)}
+  assert statuses == {
+    "papers__1d": STATUS_RETIRED,
+    "papers__2d": STATUS_RETIRED,
+    "papers__10d": STATUS_DELETED,
+    "papers__20d": STATUS_DELETED,
+    "papers__30d": STATUS_DELETED,
+  }
@@ -0,0 +1,70 @@
+import asyncio
+import gzip
+from pathlib import Path
+
+import pytest
+
+from trendsurf_api.ingestion.pdf_fetcher import PdfDocument
+from trendsurf_api.models.tables import TeiDocument
+from trendsurf_api.parsing.grobid_client import GrobidError
+from trendsurf_api.parsing.tei_cache import (
+  TeiCache,
+  decode_tei,
+  encode_tei,
+  fetch_tei,
+  reparse_cached,
+)
+
+TEI = (
+  '<TEI xmlns="http://www.tei-c.org/ns/1.0"><teiHeader><fileDesc><titleStmt>'
+  "<title>Sparse attention kernels</title></titleStmt></fileDesc></teiHeader>"
+  "<text><body><div><head>Introduction</head><p>Sparse attention — revisited.</p></div>"
+  "</body></text></TEI>"
+)
+
+
+class CountingDispatcher:
+  def __init__(self) -> None:
+    self.calls: list[str] = []
+
+  async def process(self, pdf: PdfDocument) -> str:
+    self.calls.append(pdf.checksum)
+    return TEI
+
+
+def _pdf(checksum: str) -> PdfDocument:
+  return PdfDocument(
+    path=Path("/dev/null"),
+    size=1,
+    checksum=checksum,
+    content_type=None,
+    etag=None,
+    last_modified=None,
+  )
+
+
+def test_tei_round_trips_through_gzip() -> None:
+  codec, payload = encode_tei(TEI * 20)
+
+  assert codec == "gzip" and gzip.decompress(payload) == (TEI * 20).encode("utf-8")
+  assert len(payload) < len(TEI * 20) / 5
+  assert decode_tei(codec, payload) == TEI * 20
+  with pytest.raises(GrobidError):
+    decode_tei("zstd", payload)
+
+
+def test_fetch_tei_calls_grobid_once_per_checksum(database) -> None:
+  dispatcher = CountingDispatcher()
+
+  first = asyncio.run(fetch_tei(_pdf("a" * 64), dispatcher=dispatcher))
+  again = asyncio.run(fetch_tei(_pdf("a" * 64), dispatcher=dispatcher))
+  other = asyncio.run(fetch_tei(_pdf("b" * 64), dispatcher=dispatcher))
+
+  assert first == again == other == TEI
+  assert dispatcher.calls == ["a" * 64, "b" * 64]
+  assert TeiCache().get("c" * 64) is None
+  with database() as session:
+    row = session.get(TeiDocument, "a" * 64)
+    assert row.codec == "gzip" and row.raw_size == len(TEI.encode("utf-8"))
+  ((checksum, parsed),) = reparse_cached(["a" * 64])
+  assert checksum == "a" * 64 and parsed.title == "Sparse attention kernels"
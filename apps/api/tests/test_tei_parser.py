@@ -0,0 +1,34 @@
+import io
+
+from trendsurf_api.parsing.tei_parser import Reference, parse_tei
+
+TEI = """<TEI xmlns="http://www.tei-c.org/ns/1.0">
+  <teiHeader>
+    <fileDesc><titleStmt><title level="a" type="main">  Sparse   Experts </title></titleStmt></fileDesc>
+    <profileDesc><abstract><div><p>First <ref>[1]</ref> claim.</p><p>Second claim.</p></div></abstract></profileDesc>
+  </teiHeader>
+  <text>
+    <body>
+      <div><head>Introduction</head><p>Routing <ref type="bibr">[2]</ref> tokens.</p><div><p>Nested.</p></div></div>
+      <div><head>Empty</head></div>
+      <div><p>Untitled section.</p></div>
+    </body>
+    <back><div><listBibl>
+      <biblStruct xml:id="b0"><analytic><title>Attention Is All You Need</title></analytic>
+        <monogr><title>NeurIPS</title></monogr><idno type="arXiv">1706.03762</idno></biblStruct>
+    </listBibl></div></back>
+  </text>
+</TEI>"""
+
+
+def test_parse_tei_single_pass() -> None:
+  for source in (TEI, TEI.encode("utf-8"), io.BytesIO(TEI.encode("utf-8"))):
+    document = parse_tei(source)
+    assert document.title == "Sparse Experts"
+    assert document.abstract == "First claim.\nSecond claim."
+    assert [(section.title, section.paragraphs) for section in document.body] == [
+      ("Introduction", ["Routing tokens."]),
+      (None, ["Untitled section."]),
+    ]
+    assert document.references == ["Attention Is All You Need NeurIPS 1706.03762"]
+    assert document.cited == [Reference("Attention Is All You Need", {"arxiv": "1706.03762"})]
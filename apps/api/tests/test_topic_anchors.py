@@ -0,0 +1,211 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from redis.exceptions import ConnectionError
+
+from trendsurf_api.matching import anchors
+from trendsurf_api.matching.anchors import (
+  ANCHOR_VERSION_KEY,
+  AnchorIndex,
+  anchor_hash,
+  anchor_text,
+  refresh_anchors,
+)
+from trendsurf_api.models.tables import Topic, TopicVector, User
+
+LONG_AGO = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeRedis:
+  def __init__(self) -> None:
+    self.values: dict[str, int] = {}
+    self.down = False
+
+  def get(self, key):
+    if self.down:
+      raise ConnectionError("down")
+    return self.values.get(key)
+
+  def incr(self, key):
+    self.values[key] = self.values.get(key, 0) + 1
+
+
+class FakeEngine:
+  model = "m"
+  dimensions = 3
+
+  def __init__(self) -> None:
+    self.embedded: list[str] = []
+
+  async def embed(self, texts):
+    self.embedded.extend(texts)
+    return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+def _topic(
+  session, topic_id: int, *, filters=None, updated_at=LONG_AGO, model: str | None = "m"
+) -> Topic:
+  topic = Topic(
+    id=topic_id, user_id=1, name=f"Topic {topic_id}", filters_json=filters, updated_at=updated_at
+  )
+  session.add(topic)
+  if model is not None:
+    session.add(
+      TopicVector(
+        topic_id=topic_id,
+        embed_model=model,
+        embed_dimensions=3,
+        input_hash="x",
+        vector=np.asarray([0, 1, 0], dtype=np.float32).tobytes(),
+        topic_updated_at=updated_at,
+        updated_at=updated_at,
+      )
+    )
+  return topic
+
+
+def _seed_user(database) -> None:
+  with database.begin() as session:
+    session.add(User(id=1, email="a@example.com", password_hash="x"))
+
+
+def _index(redis: FakeRedis, reloads: list[int], poll_seconds: float = 0.0) -> AnchorIndex:
+  index = AnchorIndex(model="m", dimensions=3, redis=redis, poll_seconds=poll_seconds)
+
+  def reload() -> None:
+    reloads.append(1)
+    index._matcher = object()
+
+  index._reload = reload
+  return index
+
+
+def test_anchor_hash_covers_text_and_model() -> None:
+  text = anchor_text("Name", None, {"keywords": ["Graph  Networks", " "]})
+  assert text == "Name\n\nKeywords: graph networks"
+  assert anchor_text("Name", "About graphs", None) == "About graphs"
+  assert anchor_hash(text, model="a", dimensions=3) == anchor_hash(text, model="a", dimensions=3)
+  assert anchor_hash(text, model="a", dimensions=3) != anchor_hash(text, model="b", dimensions=3)
+  assert anchor_hash(text, model="a", dimensions=3) != anchor_hash(text, model="a", dimensions=4)
+
+
+def test_index_reloads_only_when_version_moves() -> None:
+  redis, reloads = FakeRedis(), []
+  index = _index(redis, reloads)
+
+  index.matcher()
+  index.matcher()
+  assert len(reloads) == 1
+
+  redis.incr(ANCHOR_VERSION_KEY)
+  index.matcher()
+  index.matcher()
+  assert len(reloads) == 2
+
+
+def test_index_polls_database_while_redis_is_down() -> None:
+  redis, reloads = FakeRedis(), []
+  index = _index(redis, reloads)
+  index.matcher()
+
+  redis.down = True
+  index.matcher()
+  index.matcher()
+  assert len(reloads) == 3
+
+
+def test_index_checks_version_at_most_once_per_interval() -> None:
+  redis, reloads = FakeRedis(), []
+  index = _index(redis, reloads, poll_seconds=3600)
+  index.matcher()
+
+  redis.incr(ANCHOR_VERSION_KEY)
+  index.matcher()
+  assert len(reloads) == 1
+
+
+def test_refresh_embeds_stale_topics_and_skips_unchanged_inputs(database) -> None:
+  _seed_user(database)
+  with database.begin() as session:
+    _topic(session, 1, filters={"keywords": ["graphs"]}, model=None)
+    _topic(session, 2, model=None)
+  redis, engine = FakeRedis(), FakeEngine()
+
+  report = refresh_anchors(engine=engine, redis=redis)
+  assert (report.checked, report.embedded, report.unchanged) == (2, 2, 0)
+  assert redis.values[ANCHOR_VERSION_KEY] == 1
+  assert refresh_anchors(engine=engine, redis=redis).checked == 0
+  assert redis.values[ANCHOR_VERSION_KEY] == 1
+
+  # A threshold edit leaves the anchor text alone; a new description changes it.
+  edited = datetime(2024, 2, 1, tzinfo=timezone.utc)
+  with database.begin() as session:
+    first, second = session.get(Topic, 1), session.get(Topic, 2)
+    first.filters_json = {"keywords": ["graphs"], "min_score": 0.5}
+    first.updated_at = edited
+    second.description = "About robots"
+    second.updated_at = edited
+  embedded = len(engine.embedded)
+
+  report = refresh_anchors(engine=engine, redis=redis)
+  assert (report.checked, report.embedded, report.unchanged) == (2, 1, 1)
+  assert engine.embedded[embedded:] == ["About robots"]
+  with database() as session:
+    stored = session.get(TopicVector, 1)
+    assert stored.topic_updated_at == edited.replace(tzinfo=None)
+  assert refresh_anchors(engine=engine, redis=redis).checked == 0
+
+
+def test_refresh_calls_the_provider_with_no_session_open(database, monkeypatch) -> None:
+  _seed_user(database)
+  with database.begin() as session:
+    _topic(session, 1, model=None)
+  opened = []
+  session_scope = anchors.session_scope
+
+  @contextmanager
+  def tracked_scope():
+    opened.append(True)
+    with session_scope() as session:
+      yield session
+    opened.pop()
+
+  class CheckingEngine(FakeEngine):
+    async def embed(self, texts):
+      assert not opened
+      return await super().embed(texts)
+
+  monkeypatch.setattr(anchors, "session_scope", tracked_scope)
+  report = refresh_anchors(engine=CheckingEngine(), redis=FakeRedis())
+
+  assert report.embedded == 1
+  with database() as session:
+    assert session.get(TopicVector, 1).embed_model == "m"
+
+
+def test_reload_reads_the_overlap_window_and_drops_deleted_topics(database) -> None:
+  _seed_user(database)
+  with database.begin() as session:
+    for topic_id in (1, 2, 3):
+      _topic(session, topic_id)
+    _topic(session, 4, model="other")
+  redis = FakeRedis()
+  index = AnchorIndex(model="m", dimensions=3, redis=redis, poll_seconds=0)
+
+  index.matcher()
+  assert index._anchors.keys() == {1, 2, 3}
+  untouched = index._anchors[3]
+
+  # Topic 1 was committed late, stamped inside the overlap before the last load.
+  late = datetime.now(timezone.utc) - timedelta(seconds=30)
+  with database.begin() as session:
+    session.get(Topic, 1).filters_json = {"min_score": 0.9}
+    session.get(Topic, 1).updated_at = late
+    session.delete(session.get(TopicVector, 2))
+  redis.incr(ANCHOR_VERSION_KEY)
+
+  index.matcher()
+  assert index._anchors.keys() == {1, 3}
+  assert index._anchors[1].threshold == 0.9
+  assert index._anchors[3] is untouched
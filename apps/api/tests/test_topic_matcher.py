@@ -0,0 +1,98 @@
+import numpy as np
+from sqlalchemy import create_mock_engine
+
+from trendsurf_api.matching.engine import (
+  CandidatePaper,
+  MatchResult,
+  TopicAnchor,
+  TopicMatcher,
+  write_matches,
+)
+
+
+def _paper(paper_id: int, vector, categories=(), text: str = "") -> CandidatePaper:
+  return CandidatePaper(paper_id, np.asarray(vector, dtype=np.float32), frozenset(categories), text)
+
+
+def test_match_applies_thresholds_and_filters() -> None:
+  anchors = [
+    TopicAnchor.from_filters(1, [1, 0, 0], {"min_score": 0.9}),
+    TopicAnchor.from_filters(2, [0, 1, 0], {"categories": ["cs.CL"]}, default_threshold=0.5),
+    TopicAnchor.from_filters(3, [0, 0, 1], {"keywords": ["Graph  Networks"]}, default_threshold=0.5),
+  ]
+  papers = [
+    _paper(10, [2, 0, 0], ["cs.LG"]),
+    _paper(11, [0.7, 0.7, 0], ["cs.CL"]),
+    _paper(12, [0, 1, 0], ["cs.CV"]),
+    _paper(13, [0, 0, 1], text="message passing on graph neural networks"),
+    _paper(14, [0, 0, 1], text="transformers"),
+  ]
+
+  matches = TopicMatcher(anchors, top_k=None).match(papers)
+
+  assert {(m.topic_id, m.paper_id) for m in matches} == {(1, 10), (2, 11), (3, 13)}
+  by_pair = {(m.topic_id, m.paper_id): m for m in matches}
+  assert by_pair[(1, 10)].score == 1.0
+  assert by_pair[(2, 11)].score == 0.7071
+
+
+def test_match_keeps_top_k_per_topic() -> None:
+  anchors = [TopicAnchor(1, np.array([1, 0], dtype=np.float32), threshold=0.0)]
+  papers = [_paper(i, [1, i / 10]) for i in range(5)]
+
+  matches = TopicMatcher(anchors, top_k=2).match(papers)
+
+  assert sorted(m.paper_id for m in matches) == [0, 1]
+
+
+def test_match_blocks_thousands_of_topics() -> None:
+  rng = np.random.default_rng(3)
+  words = [f"term{i}" for i in range(2000)]
+  anchors = [
+    TopicAnchor(
+      i,
+      vector,
+      threshold=0.1,
+      categories=frozenset({f"cs.{i % 20}"}),
+      keywords=frozenset({f"{words[i % 2000]} {words[(i * 7) % 2000]}", words[(i * 13) % 2000]}),
+    )
+    for i, vector in enumerate(rng.standard_normal((3000, 256), dtype=np.float32))
+  ]
+  papers = [
+    _paper(i, vector, [f"cs.{i % 20}"], " ".join(rng.choice(words, 200)))
+    for i, vector in enumerate(rng.standard_normal((800, 256), dtype=np.float32))
+  ]
+  matches = TopicMatcher(anchors, top_k=None).match(papers)
+
+  assert matches and all(0.1 <= m.score <= 1.0 for m in matches)
+  for m in matches:
+    anchor, paper = anchors[m.topic_id], papers[m.paper_id]
+    assert anchor.categories & paper.categories
+    tokens = paper.text.split()
+    assert any(
+      all(any(token.startswith(word) for token in tokens) for word in kw.split()) for kw in anchor.keywords
+    )
+
+
+def test_write_matches_clamps_and_upserts_in_one_statement() -> None:
+  statements = []
+
+  class RecordingSession:
+    def execute(self, stmt):
+      statements.append(stmt)
+
+  engine = create_mock_engine("postgresql+psycopg://", lambda *args, **kwargs: None)
+  written = write_matches(
+    [
+      MatchResult(1, 10, 1.2, "a"),
+      MatchResult(1, 11, -0.1, "b"),
+      MatchResult(1, 10, 0.8, "c"),
+    ],
+    session=RecordingSession(),
+  )
+
+  assert written == 2
+  (stmt,) = statements
+  compiled = stmt.compile(dialect=engine.dialect)
+  assert "ON CONFLICT (topic_id, paper_id) DO UPDATE" in str(compiled)
+  assert sorted(v for k, v in compiled.params.items() if k.startswith("score")) == [0.0, 0.8]
@@ -0,0 +1,156 @@
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from trendsurf_api.vectors.bootstrap import (
+  _paper_collection_config,
+  create_collection,
+  ensure_collections,
+  estimate_ram,
+  quantization_config,
+  versioned_name,
+)
+from trendsurf_api.core.settings import get_settings
+from trendsurf_api.vectors.search import measure_recall, search_params
+from trendsurf_api.vectors.store import LocalVectorStore, get_vector_store
+
+
+class RecordingClient:
+  def __init__(self) -> None:
+    self.created: dict = {}
+    self.names: list[str] = []
+    self.indexes: list[tuple[str, str]] = []
+    self.alias_operations: list = []
+
+  def get_collections(self):
+    return SimpleNamespace(collections=[])
+
+  def get_aliases(self):
+    return SimpleNamespace(aliases=[])
+
+  def create_collection(self, **kwargs) -> None:
+    self.created = kwargs
+    self.names.append(kwargs["collection_name"])
+
+  def update_collection_aliases(self, *, change_aliases_operations) -> None:
+    self.alias_operations.extend(change_aliases_operations)
+
+  def create_payload_index(self, *, collection_name, field_name, field_schema) -> None:
+    self.indexes.append((collection_name, field_name))
+
+
+def test_paper_collection_uses_quantized_on_disk_layout() -> None:
+  client = RecordingClient()
+  create_collection(client, "papers", _paper_collection_config(1536))
+
+  assert client.created["vectors_config"].on_disk is True
+  assert client.created["quantization_config"].scalar.type == qmodels.ScalarType.INT8
+  assert "payload_schema" not in client.created
+  assert ("papers", "paper_id") in client.indexes
+  assert isinstance(quantization_config("binary"), qmodels.BinaryQuantization)
+  assert quantization_config("none") is None
+
+  params = search_params()
+  assert params.quantization.rescore is True and params.quantization.oversampling == 2.0
+  assert search_params(quantization="none").quantization is None
+
+
+def test_ram_estimates_cut_vector_memory() -> None:
+  baseline = estimate_ram(100_000, 1536, mode="none", on_disk=False, m=32)
+  scalar = estimate_ram(100_000, 1536, mode="scalar", on_disk=True, m=32)
+  binary = estimate_ram(100_000, 1536, mode="binary", on_disk=True, m=32)
+
+  assert scalar.quantized_bytes == 100_000 * 1536
+  assert baseline.total_bytes / scalar.total_bytes >= 4
+  assert binary.total_bytes < scalar.total_bytes
+
+
+def test_paper_collection_is_created_behind_an_alias() -> None:
+  client = RecordingClient()
+  ensure_collections(client)
+
+  versioned, topics = client.names
+  assert topics == "topic_vectors"
+  assert re.fullmatch(r"paper_vectors__[a-z0-9-]+_1536d_\d{14}", versioned)
+  (operation,) = client.alias_operations
+  assert operation.create_alias.alias_name == "paper_vectors"
+  assert operation.create_alias.collection_name == versioned
+  stamp = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+  assert versioned_name("papers", "text-embedding-3-small", 1536, now=stamp) == (
+    "papers__text-embedding-3-small_1536d_20240701120000"
+  )
+
+
+def test_existing_paper_collection_gains_missing_payload_indexes() -> None:
+  class ExistingClient(RecordingClient):
+    def get_aliases(self):
+      return SimpleNamespace(
+        aliases=[SimpleNamespace(alias_name="paper_vectors", collection_name="paper_vectors__v1")]
+      )
+
+    def get_collections(self):
+      return SimpleNamespace(collections=[SimpleNamespace(name="topic_vectors")])
+
+    def get_collection(self, name):
+      params = SimpleNamespace(vectors=SimpleNamespace(size=1536))
+      schema = {"paper_id": None, "model_name": None, "dim": None, "created_at": None}
+      if name == "topic_vectors":
+        schema = {"topic_id": None, "model_name": None, "dim": None, "created_at": None}
+      return SimpleNamespace(config=SimpleNamespace(params=params), payload_schema=schema)
+
+  client = ExistingClient()
+  ensure_collections(client)
+
+  assert client.names == []
+  assert client.indexes == [
+    ("paper_vectors__v1", "categories"),
+    ("paper_vectors__v1", "published_at"),
+  ]
+
+
+def test_local_backend_bootstraps_without_a_server(tmp_path, monkeypatch) -> None:
+  monkeypatch.setenv("VECTOR_BACKEND", "local")
+  monkeypatch.setenv("VECTOR_LOCAL_DIR", str(tmp_path))
+  get_settings.cache_clear()
+  get_vector_store.cache_clear()
+  try:
+    ensure_collections(client=None)
+    store = get_vector_store("paper_vectors")
+  finally:
+    get_settings.cache_clear()
+    get_vector_store.cache_clear()
+
+  assert isinstance(store, LocalVectorStore) and store.dimensions == 1536
+  assert (tmp_path / "paper_vectors" / "vectors.f32").exists()
+  assert (tmp_path / "topic_vectors" / "payloads.sqlite3").exists()
+
+
+def test_recall_queries_a_random_sample_not_the_first_page() -> None:
+  class SampleRecordingClient(QdrantClient):
+    sampled: list = []
+
+    def query_points(self, *args, **kwargs):
+      response = super().query_points(*args, **kwargs)
+      if isinstance(kwargs.get("query"), qmodels.SampleQuery):
+        self.sampled.extend(point.id for point in response.points)
+      return response
+
+  client = SampleRecordingClient(":memory:")
+  client.create_collection(
+    collection_name="papers",
+    vectors_config=qmodels.VectorParams(size=4, distance=qmodels.Distance.COSINE),
+  )
+  rng = np.random.default_rng(0)
+  client.upsert(
+    collection_name="papers",
+    points=[qmodels.PointStruct(id=i, vector=rng.random(4).tolist()) for i in range(1, 201)],
+  )
+
+  report = measure_recall("papers", client=client, sample=20, k=5)
+
+  assert report.queries == 20 and report.recall == 1.0
+  assert len(set(client.sampled)) == 20 and max(client.sampled) > 20
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from trendsurf_api.vectors.store import LocalVectorStore, qdrant_filter
+
+
+def unit(*values: float) -> np.ndarray:
+  return np.asarray(values, dtype=np.float32)
+
+
+def test_local_store_filtered_top_k_and_persistence(tmp_path: Path) -> None:
+  store = LocalVectorStore(tmp_path, dimensions=3, initial_capacity=2)
+  store.upsert(
+    [
+      (1, unit(1, 0, 0), {"categories": ["cs.LG"], "published_at": datetime(2024, 5, 1, tzinfo=timezone.utc)}),
+      (2, unit(0.9, 0.1, 0), {"categories": ["cs.CL"], "published_at": "2024-06-01T00:00:00+00:00"}),
+      ("c", unit(0, 1, 0), {"categories": ["cs.LG", "cs.CL"], "published_at": "2024-07-01T00:00:00+00:00"}),
+      (4, unit(0, 0, 5), {"categories": ["math.OC"]}),
+    ]
+  )
+
+  hits = store.search([1, 0, 0], limit=2)
+  assert [hit.id for hit in hits] == [1, 2] and np.isclose(hits[0].score, 1.0)
+  filtered = store.search([1, 0, 0], limit=5, filters={"categories": "cs.CL"})
+  assert [hit.id for hit in filtered] == [2, "c"]
+  ranged = store.search([1, 0, 0], filters={"published_at": {"gte": datetime(2024, 5, 15, tzinfo=timezone.utc)}})
+  assert [hit.id for hit in ranged] == [2, "c"]
+
+  assert store.delete([2, 99]) == 1
+  store.upsert([(5, unit(1, 1, 0), None)])
+  assert store.count() == 4
+  store.close()
+
+  reopened = LocalVectorStore(tmp_path, dimensions=3)
+  assert reopened.count() == 4
+  assert [hit.id for hit in reopened.search([1, 0, 0], limit=3)] == [1, 5, "c"]
+  assert np.allclose(reopened.get_vectors([4])[4], [0, 0, 1])
+  assert reopened.search([1, 0, 0], filters={"categories": ["q-bio"]}) == []
+
+
+def test_local_store_ranges_compare_datetimes_not_strings(tmp_path: Path) -> None:
+  store = LocalVectorStore(tmp_path, dimensions=2)
+  store.upsert(
+    [
+      (1, unit(1, 0), {"published_at": "2024-06-01T00:00:00+00:00"}),
+      (2, unit(1, 0), {"published_at": "2024-06-01T01:30:00+02:00"}),
+      (3, unit(1, 0), {"published_at": "2024-06-01T00:00:00.5Z"}),
+      (4, unit(1, 0), {"published_at": "not a date"}),
+    ]
+  )
+
+  def ids(bounds) -> list:
+    return sorted(hit.id for hit in store.search([1, 0], filters={"published_at": bounds}))
+
+  assert ids({"gte": "2024-06-01T00:00:00Z"}) == [1, 3]
+  assert ids({"lt": datetime(2024, 6, 1)}) == [2]
+  assert ids({"gt": "2024-05-31T23:00:00-01:00", "lte": "2024-06-01T00:00:00.5+00:00"}) == [3]
+  store.close()
+
+
+def test_filters_translate_to_qdrant_conditions() -> None:
+  translated = qdrant_filter(
+    {"primary_category": "cs.LG", "categories": ["cs.LG", "cs.AI"], "published_at": {"gte": "2024-01-01T00:00:00Z"}}
+  )
+  keys = [condition.key for condition in translated.must]
+  assert keys == ["primary_category", "categories", "published_at"]
+  assert translated.must[1].match.any == ["cs.LG", "cs.AI"]
+  assert qdrant_filter(None) is None
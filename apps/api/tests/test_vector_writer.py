@@ -0,0 +1,53 @@
+import threading
+
+import numpy as np
+import pytest
+
+from trendsurf_api.vectors.writer import QdrantVectorWriter, VectorWriteError
+
+
+class FakeQdrant:
+  def __init__(self, fail_first: int = 0, always_fail_id: int | None = None) -> None:
+    self.lock = threading.Lock()
+    self.points: dict[int, list[float]] = {}
+    self.calls: list[tuple[int, bool]] = []
+    self.fail_first = fail_first
+    self.always_fail_id = always_fail_id
+
+  def upsert(self, *, collection_name, points, wait):
+    with self.lock:
+      self.calls.append((len(points.ids), wait))
+      if self.fail_first > 0:
+        self.fail_first -= 1
+        raise ConnectionError("transient")
+      if self.always_fail_id in points.ids:
+        raise ConnectionError("broken batch")
+      self.points.update(zip(points.ids, points.vectors, strict=True))
+
+
+def records(count: int):
+  for point_id in range(count):
+    yield point_id, np.full(4, point_id, dtype=np.float32), {"paper_id": point_id}
+
+
+def test_writer_batches_retries_and_waits_for_every_batch() -> None:
+  client = FakeQdrant(fail_first=2)
+  writer = QdrantVectorWriter(
+    "papers", client=client, batch_size=10, parallel=3, max_retries=3, retry_backoff=0.001
+  )
+  report = writer.write(records(95))
+
+  assert sorted(client.points) == list(range(95)) and client.points[7] == [7.0] * 4
+  assert report.points == 95 and report.batches == 10 and report.retries == 2
+  assert sorted(size for size, _ in client.calls)[0] == 5
+  assert all(wait for _, wait in client.calls)
+  assert report.points_per_sec > 0
+
+
+def test_writer_reports_failed_batches() -> None:
+  client = FakeQdrant(always_fail_id=13)
+  writer = QdrantVectorWriter("papers", client=client, batch_size=10, max_retries=1, retry_backoff=0.001)
+  with pytest.raises(VectorWriteError) as excinfo:
+    writer.write(records(30))
+  assert excinfo.value.report.failed_ids == list(range(10, 20))
+  assert excinfo.value.report.points == 20
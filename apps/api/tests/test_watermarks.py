@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+
+from trendsurf_api.ingestion.arxiv_client import ArxivClient, ArxivPaper
+from trendsurf_api.ingestion.watermarks import Watermark
+
+BASE = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def _paper(source_id: str, minutes: int) -> ArxivPaper:
+  return ArxivPaper(
+    source_id=source_id,
+    title=source_id,
+    summary="",
+    published_at=None,
+    updated_at=BASE + timedelta(minutes=minutes),
+    authors=[],
+    pdf_url=None,
+    html_url=None,
+    primary_category=None,
+    categories=[],
+  )
+
+
+class FeedClient(ArxivClient):
+  def __init__(self, feed: list[ArxivPaper]) -> None:
+    super().__init__(delay_ms=1, max_results_per_run=100)
+    self.feed = feed
+    self.requests = 0
+
+  async def query(self, search_query: str, *, start: int = 0, max_results: int = 100) -> list[ArxivPaper]:
+    self.requests += 1
+    return self.feed[start : start + max_results]
+
+
+def _drain(client: ArxivClient, watermark: Watermark, **kwargs) -> list[str]:
+  async def collect() -> list[str]:
+    return [paper.source_id async for paper in client.iter_incremental(watermark, **kwargs)]
+
+  return asyncio.run(collect())
+
+
+def test_incremental_stops_at_watermark_and_resumes_an_interrupted_run() -> None:
+  old = [_paper(f"old{i}", -i) for i in range(50)]
+  watermark = Watermark(search_query="cat:cs.LG", last_updated_at=old[0].updated_at, seen_ids={"old0"})
+  new = [_paper(f"new{i}", 10 - i) for i in range(5)]
+  client = FeedClient(new + old)
+
+  async def interrupted() -> list[str]:
+    taken: list[str] = []
+    async with aclosing(client.iter_incremental(watermark, page_size=2)) as papers:
+      async for paper in papers:
+        taken.append(paper.source_id)
+        if len(taken) == 3:
+          break
+    return taken
+
+  assert asyncio.run(interrupted()) == ["new0", "new1", "new2"]
+  # The run was closed before new2 was acknowledged, so it resumes from there.
+  assert watermark.cursor_start == 2
+  assert watermark.last_updated_at == old[0].updated_at
+
+  # Two more papers land on top before the interrupted run resumes.
+  client.feed = [_paper("newer0", 20), _paper("newer1", 19)] + new + old
+  assert _drain(client, watermark, page_size=2) == ["new2", "new3", "new4"]
+  assert watermark.cursor_start is None
+  assert watermark.last_updated_at == new[0].updated_at
+  assert watermark.seen_ids == {"new0"}
+
+  assert _drain(client, watermark, page_size=2) == ["newer0", "newer1"]
+  assert client.requests < 12
+
+
+def test_incremental_completes_when_the_quota_is_reached() -> None:
+  old = [_paper(f"old{i}", -i) for i in range(50)]
+  watermark = Watermark(search_query="cat:cs.LG", last_updated_at=old[0].updated_at, seen_ids={"old0"})
+  new = [_paper(f"new{i}", 10 - i) for i in range(5)]
+  client = FeedClient(new + old)
+
+  assert _drain(client, watermark, max_results=3, page_size=2) == ["new0", "new1", "new2"]
+  assert not watermark.resuming
+  assert watermark.last_updated_at == new[0].updated_at
+
+  # The next run starts from the head instead of draining the remainder below the quota.
+  client.feed = [_paper("newer0", 20), _paper("newer1", 19)] + new + old
+  assert _drain(client, watermark, max_results=3, page_size=2) == ["newer0", "newer1"]
+  assert watermark.seen_ids == {"newer0"}
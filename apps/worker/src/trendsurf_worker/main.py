@@ -1,7 +1,8 @@
+import atexit
 import os
 import signal
 import structlog
-from rq import Connection, Worker
+from rq import Connection, SimpleWorker, Worker
 from redis import Redis
 
 logger = structlog.get_logger()
@@ -12,13 +13,28 @@ def run() -> None:
   redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
   queue_names = [os.getenv("RQ_QUEUE", "default")]
   redis_conn = Redis.from_url(redis_url)
+  # Forking per job throws away pooled HTTP connections; opt out to keep them warm.
+  worker_class = Worker if os.getenv("RQ_WORKER_FORK", "1") != "0" else SimpleWorker
+  atexit.register(_close_shared_resources)
 
   with Connection(redis_conn):
-    worker = Worker(queue_names)
-    logger.info("worker.start", queues=queue_names, redis_url=redis_url)
+    worker = worker_class(queue_names)
+    logger.info(
+      "worker.start", queues=queue_names, redis_url=redis_url, worker_class=worker_class.__name__
+    )
     worker.work(with_scheduler=True)
 
 
+def _close_shared_resources() -> None:
+  try:
+    from trendsurf_api.core.http import shutdown_http_clients
+    from trendsurf_api.parsing.executor import shutdown_parse_executor
+  except ImportError:
+    return
+  shutdown_http_clients()
+  shutdown_parse_executor()
+
+
 def main() -> None:
   run()
 